@@ -10,7 +10,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['numpy', 'tkinter', 'unittest', 'pydoc', 'doctest'],
     noarchive=False,
     optimize=0,
 )
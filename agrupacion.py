@@ -0,0 +1,310 @@
+"""
+Agrupación de tiempos por clave en streaming
+============================================
+Consume pares (clave, tiempo) o filas con una columna de clave y columnas de
+componentes, y mantiene por clave el conteo, la suma, el mínimo y el máximo
+(y con ellos la media). Cada grupo se guarda como una lista de ticks enteros,
+sin crear un `Tiempo` por valor ni por suma parcial; los `Tiempo` se crean
+solo al leer los resultados.
+
+La memoria está acotada por `limite_claves`: cuando la tabla supera ese
+número de claves, los grupos parciales se vuelcan a disco repartidos en
+particiones por hash de la clave. Al final cada partición se vuelve a cargar
+y combinar por separado, así que en memoria solo hay una partición a la vez.
+
+Uso:
+    agrupador = AgrupadorTiempos()
+    agrupador.agregar_pares(pares)
+    for clave, grupo in agrupador.resultados():
+        print(clave, grupo.conteo, grupo.suma, grupo.media)
+
+    python agrupacion.py horas.csv --clave proyecto
+"""
+
+import argparse
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+from collections import namedtuple
+
+from calctime import FORMATOS_TIEMPO, Tiempo, _redondear_ticks, formatear
+
+LIMITE_CLAVES = 1000000
+PARTICIONES = 64
+
+# Índices de los campos de cada grupo: [conteo, suma, mínimo, máximo] en ticks
+CONTEO, SUMA, MINIMO, MAXIMO = range(4)
+
+Grupo = namedtuple("Grupo", ["conteo", "suma", "minimo", "maximo", "media"])
+
+
+def _grupo(campos):
+    conteo, suma, minimo, maximo = campos
+    desde_ticks = Tiempo._desde_ticks
+    return Grupo(conteo, desde_ticks(suma), desde_ticks(minimo), desde_ticks(maximo), desde_ticks(suma) / conteo)
+
+
+def _combinar(tabla, clave, campos):
+    """Combina los campos parciales de un grupo en la tabla."""
+    actual = tabla.get(clave)
+    if actual is None:
+        tabla[clave] = list(campos)
+        return
+    actual[CONTEO] += campos[CONTEO]
+    actual[SUMA] += campos[SUMA]
+    if campos[MINIMO] < actual[MINIMO]:
+        actual[MINIMO] = campos[MINIMO]
+    if campos[MAXIMO] > actual[MAXIMO]:
+        actual[MAXIMO] = campos[MAXIMO]
+
+
+class AgrupadorTiempos:
+    """Agregación por clave de conteo, suma, mínimo, máximo y media, con volcado a disco."""
+    
+    def __init__(self, limite_claves=LIMITE_CLAVES, particiones=PARTICIONES, carpeta=None):
+        """
+        Inicializa el agrupador.
+        
+        Args:
+            limite_claves (int): Claves en memoria antes de volcar a disco (None = sin límite)
+            particiones (int): Archivos de volcado (por hash de la clave)
+            carpeta (str): Carpeta para los archivos temporales (por defecto, la del sistema)
+        """
+        self.limite_claves = limite_claves
+        self.particiones = particiones
+        self.carpeta = carpeta
+        self.volcados = 0
+        self._tabla = {}
+        self._directorio = None
+        self._archivos = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def __len__(self):
+        """Claves en memoria (sin contar las volcadas a disco)."""
+        return len(self._tabla)
+    
+    # Agregado
+    
+    def agregar(self, clave, valor):
+        """
+        Agrega un valor a un grupo.
+        
+        Args:
+            clave: Clave del grupo (cualquier valor hashable y serializable con pickle)
+            valor (Tiempo/int/float): Tiempo u horas
+        """
+        if isinstance(valor, Tiempo):
+            ticks = Tiempo._ticks_de(valor)
+        elif isinstance(valor, (int, float)):
+            ticks = valor * Tiempo.TICKS_POR_HORA
+            ticks = ticks if type(ticks) is int else _redondear_ticks(ticks)
+        else:
+            raise TypeError("Solo se pueden agrupar objetos Tiempo o números (horas)")
+        self.agregar_ticks([clave], [ticks])
+    
+    def agregar_pares(self, pares):
+        """
+        Agrega pares (clave, valor) de un iterable, consumiéndolo una sola vez.
+        
+        Returns:
+            AgrupadorTiempos: El mismo agrupador, para encadenar llamadas
+        """
+        agregar = self.agregar
+        for clave, valor in pares:
+            agregar(clave, valor)
+        return self
+    
+    def agregar_ticks(self, claves, ticks):
+        """
+        Agrega un bloque de valores dados como ticks enteros (a `Tiempo.TICKS_POR_HORA`).
+        
+        Args:
+            claves (iterable): Clave de cada valor
+            ticks (iterable): Ticks de cada valor, alineados con las claves
+            
+        Returns:
+            AgrupadorTiempos: El mismo agrupador, para encadenar llamadas
+        """
+        if hasattr(ticks, "tolist"):
+            ticks = ticks.tolist()  # Arreglo de NumPy: enteros de Python, mucho más rápidos aquí
+        tabla = self._tabla
+        limite = self.limite_claves
+        for clave, t in zip(claves, ticks):
+            grupo = tabla.get(clave)
+            if grupo is None:
+                tabla[clave] = [1, t, t, t]
+                if limite is not None and len(tabla) > limite:
+                    self._volcar()
+                    tabla = self._tabla
+            else:
+                grupo[CONTEO] += 1
+                grupo[SUMA] += t
+                if t < grupo[MINIMO]:
+                    grupo[MINIMO] = t
+                elif t > grupo[MAXIMO]:
+                    grupo[MAXIMO] = t
+        return self
+    
+    def agregar_archivo(self, origen, clave, **opciones):
+        """
+        Agrega un archivo de componentes con una columna de clave (ver ingesta.Ingesta).
+        
+        Args:
+            origen (str/file): Archivo CSV, Parquet o Arrow
+            clave (str/int): Columna de clave
+            **opciones: Opciones de Ingesta (columnas, delimitador, ...)
+            
+        Returns:
+            Ingesta: La ingesta usada (con sus contadores de filas)
+        """
+        from ingesta import Ingesta
+        ingesta = Ingesta(origen, clave=clave, **opciones)
+        for claves, ticks in ingesta.bloques_con_claves():
+            self.agregar_ticks(claves, ticks)
+        return ingesta
+    
+    def fusionar(self, otro):
+        """
+        Combina otro agrupador parcial en este (por ejemplo, de otro archivo o proceso).
+        
+        Returns:
+            AgrupadorTiempos: El mismo agrupador, para encadenar llamadas
+        """
+        for clave, campos in otro._grupos():
+            _combinar(self._tabla, clave, campos)
+            if self.limite_claves is not None and len(self._tabla) > self.limite_claves:
+                self._volcar()
+        return self
+    
+    # Volcado a disco
+    
+    def _volcar(self):
+        """Vuelca los grupos en memoria a sus particiones y vacía la tabla."""
+        if self._archivos is None:
+            self._directorio = tempfile.mkdtemp(prefix="calctime-agrupacion-", dir=self.carpeta)
+            self._archivos = [open(os.path.join(self._directorio, f"particion-{i:03d}.pkl"), "w+b")
+                              for i in range(self.particiones)]
+        lotes = [[] for _ in range(self.particiones)]
+        for clave, campos in self._tabla.items():
+            lotes[hash(clave) % self.particiones].append((clave, campos))
+        for archivo, lote in zip(self._archivos, lotes):
+            if lote:
+                pickle.dump(lote, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        self._tabla = {}
+        self.volcados += 1
+    
+    def _leer_particion(self, archivo):
+        tabla = {}
+        archivo.flush()
+        archivo.seek(0)
+        while True:
+            try:
+                lote = pickle.load(archivo)
+            except EOFError:
+                break
+            for clave, campos in lote:
+                _combinar(tabla, clave, campos)
+        return tabla
+    
+    def _grupos(self):
+        """Recorre (clave, [conteo, suma, mínimo, máximo]) de todos los grupos, una partición a la vez."""
+        if self._archivos is None:
+            yield from self._tabla.items()
+            return
+        # Los grupos que siguen en memoria se combinan con su partición al leerla
+        pendientes = [{} for _ in range(self.particiones)]
+        for clave, campos in self._tabla.items():
+            pendientes[hash(clave) % self.particiones][clave] = campos
+        for archivo, memoria in zip(self._archivos, pendientes):
+            tabla = self._leer_particion(archivo)
+            for clave, campos in memoria.items():
+                _combinar(tabla, clave, campos)
+            yield from tabla.items()
+    
+    # Resultados
+    
+    def resultados(self, ordenar=False):
+        """
+        Recorre los grupos con sus estadísticas.
+        
+        Sin volcados a disco, los grupos se recorren en el orden en que
+        apareció cada clave; con volcados, partición por partición.
+        
+        Args:
+            ordenar (bool): Ordenar por clave (requiere cargar todas las claves en memoria)
+        
+        Yields:
+            tuple: (clave, Grupo) con conteo (int) y suma, mínimo, máximo y media (Tiempo)
+        """
+        grupos = self._grupos()
+        if ordenar:
+            grupos = sorted(grupos, key=lambda par: par[0])
+        for clave, campos in grupos:
+            yield clave, _grupo(campos)
+    
+    def grupo(self, clave):
+        """
+        Estadísticas de una clave.
+        
+        Returns:
+            Grupo: Estadísticas del grupo (None si la clave no apareció)
+        """
+        if self._archivos is None:
+            campos = self._tabla.get(clave)
+        else:
+            tabla = self._leer_particion(self._archivos[hash(clave) % self.particiones])
+            if clave in self._tabla:
+                _combinar(tabla, clave, self._tabla[clave])
+            campos = tabla.get(clave)
+        return None if campos is None else _grupo(campos)
+    
+    def close(self):
+        """Elimina los archivos de volcado."""
+        if self._archivos is not None:
+            for archivo in self._archivos:
+                archivo.close()
+            shutil.rmtree(self._directorio, ignore_errors=True)
+            self._archivos = None
+            self._directorio = None
+            self._tabla = {}
+
+
+def main(argv=None):
+    """Punto de entrada de la agrupación."""
+    from ingesta import FILAS_POR_BLOQUE
+    parser = argparse.ArgumentParser(description="Agrupación de tiempos por clave")
+    parser.add_argument("archivo", help="archivo CSV, Parquet o Arrow ('-' para CSV por stdin)")
+    parser.add_argument("--clave", required=True, help="columna de clave (nombre, o índice sin encabezado)")
+    parser.add_argument("--delimitador", default=",", help="separador de campos del CSV")
+    parser.add_argument("--sin-encabezado", action="store_true", help="el CSV no tiene fila de encabezado")
+    parser.add_argument("--bloque", type=int, default=FILAS_POR_BLOQUE, help="filas por bloque")
+    parser.add_argument("--limite-claves", type=int, default=LIMITE_CLAVES, help="claves en memoria antes de volcar a disco")
+    parser.add_argument("--ordenar", action="store_true", help="ordenar la salida por clave")
+    parser.add_argument("--formato", choices=tuple(FORMATOS_TIEMPO), default="texto", help="formato de los tiempos")
+    args = parser.parse_args(argv)
+    
+    clave = int(args.clave) if args.sin_encabezado and args.clave.isdigit() else args.clave
+    with AgrupadorTiempos(args.limite_claves) as agrupador:
+        try:
+            agrupador.agregar_archivo(sys.stdin if args.archivo == "-" else args.archivo, clave,
+                                      delimitador=args.delimitador, encabezado=not args.sin_encabezado,
+                                      filas_por_bloque=args.bloque)
+        except (ValueError, ArithmeticError, ImportError, OSError) as e:  # ErrorIngesta es un ValueError
+            print(f"❌ {e}", file=sys.stderr)
+            return 2
+        print("\t".join(("clave", "conteo", "suma", "media", "minimo", "maximo")))
+        for valor, grupo in agrupador.resultados(args.ordenar):
+            tiempos = (formatear(t, args.formato) for t in (grupo.suma, grupo.media, grupo.minimo, grupo.maximo))
+            print("\t".join((str(valor), str(grupo.conteo), *tiempos)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
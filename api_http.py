@@ -0,0 +1,257 @@
+"""
+API HTTP/JSON de CalcTime
+=========================
+Servicio HTTP/1.1 mínimo (solo biblioteca estándar, asyncio) que expone la
+aritmética, las comparaciones y los formatos de `Tiempo` con el mismo
+protocolo JSON que el demonio local (ver protocolo.py). Así las
+herramientas internas no necesitan incrustar calctime.py ni copiar sus
+constantes de conversión.
+
+Rutas:
+    POST /v1/calcular   Una petición JSON o una lista de peticiones (lote)
+    GET  /v1/salud      Estado del servicio
+
+Las conexiones son persistentes (keep-alive) salvo que el cliente envíe
+"Connection: close" o use HTTP/1.0 sin "Connection: keep-alive", y se
+pueden encadenar varias peticiones por conexión.
+
+Uso:
+    python api_http.py --puerto 8765
+    curl -s localhost:8765/v1/calcular -d '[{"op":"sumar","a":"1y","b":"6m"},{"op":"comparar","a":"1m","b":"30d"}]'
+"""
+
+import argparse
+import asyncio
+import json
+import signal
+import sys
+
+from protocolo import atender_documento
+
+LIMITE_CABECERAS = 64 * 1024
+LIMITE_CUERPO = 16 * 1024 * 1024
+ESPERA_INACTIVA = 60
+
+RUTA_CALCULAR = "/v1/calcular"
+RUTA_SALUD = "/v1/salud"
+
+MOTIVOS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    408: "Request Timeout", 411: "Length Required", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+    500: "Internal Server Error", 501: "Not Implemented",
+}
+
+
+class ErrorHTTP(Exception):
+    """Error que se responde con un código HTTP y cierra la conexión."""
+    
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def _respuesta(estado, cuerpo, mantener):
+    """
+    Construye una respuesta HTTP/1.1 completa.
+    
+    Args:
+        estado (int): Código HTTP
+        cuerpo (str): Documento JSON
+        mantener (bool): Si la conexión sigue abierta
+        
+    Returns:
+        bytes: Respuesta lista para enviar
+    """
+    datos = cuerpo.encode("utf-8")
+    cabeceras = (
+        f"HTTP/1.1 {estado} {MOTIVOS[estado]}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(datos)}\r\n"
+        f"Connection: {'keep-alive' if mantener else 'close'}\r\n"
+        "\r\n"
+    )
+    return cabeceras.encode("ascii") + datos
+
+
+def _error(mensaje):
+    return json.dumps({"ok": False, "error": mensaje}, ensure_ascii=False)
+
+
+async def _leer_peticion(reader, writer):
+    """
+    Lee una petición HTTP.
+    
+    Si el cliente envía "Expect: 100-continue", se le responde
+    "100 Continue" antes de leer el cuerpo.
+    
+    Returns:
+        tuple: (método, ruta, versión, cabeceras, cuerpo) o None si el cliente cerró
+        
+    Raises:
+        ErrorHTTP: Si la petición no es válida
+    """
+    try:
+        bloque = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), ESPERA_INACTIVA)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise ErrorHTTP(400, "petición incompleta") from None
+    except asyncio.LimitOverrunError:
+        raise ErrorHTTP(431, "cabeceras demasiado grandes") from None
+    except asyncio.TimeoutError:
+        return None
+    
+    lineas = bloque.decode("latin-1").split("\r\n")
+    try:
+        metodo, ruta, version = lineas[0].split(" ")
+    except ValueError:
+        raise ErrorHTTP(400, "línea de petición no válida") from None
+    if version not in ("HTTP/1.1", "HTTP/1.0"):
+        raise ErrorHTTP(400, f"versión {version} no soportada")
+    cabeceras = {}
+    for linea in lineas[1:]:
+        if linea:
+            nombre, separador, valor = linea.partition(":")
+            if not separador:
+                raise ErrorHTTP(400, "cabecera no válida")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+    
+    if "chunked" in cabeceras.get("transfer-encoding", "").lower():
+        raise ErrorHTTP(501, "Transfer-Encoding chunked no soportado; envíe Content-Length")
+    cuerpo = b""
+    if "content-length" in cabeceras:
+        try:
+            largo = int(cabeceras["content-length"])
+        except ValueError:
+            raise ErrorHTTP(400, "Content-Length no válido") from None
+        if largo < 0:
+            raise ErrorHTTP(400, "Content-Length no válido")
+        if largo > LIMITE_CUERPO:
+            raise ErrorHTTP(413, "cuerpo demasiado grande")
+        if largo and version == "HTTP/1.1" and cabeceras.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+            await writer.drain()
+        try:
+            cuerpo = await asyncio.wait_for(reader.readexactly(largo), ESPERA_INACTIVA)
+        except asyncio.IncompleteReadError:
+            raise ErrorHTTP(400, "cuerpo incompleto") from None
+        except asyncio.TimeoutError:
+            raise ErrorHTTP(408, "tiempo de espera agotado al leer el cuerpo") from None
+    elif metodo == "POST":
+        raise ErrorHTTP(411, "falta Content-Length")
+    return metodo, ruta.split("?", 1)[0], version, cabeceras, cuerpo
+
+
+def atender_http(metodo, ruta, cuerpo):
+    """
+    Resuelve una petición HTTP ya leída.
+    
+    Args:
+        metodo (str): Método HTTP
+        ruta (str): Ruta sin parámetros
+        cuerpo (bytes): Cuerpo de la petición
+        
+    Returns:
+        tuple: (código HTTP, documento JSON)
+    """
+    if ruta == RUTA_SALUD:
+        if metodo != "GET":
+            return 405, _error("use GET")
+        return 200, json.dumps({"ok": True})
+    if ruta == RUTA_CALCULAR:
+        if metodo != "POST":
+            return 405, _error("use POST")
+        try:
+            documento = json.loads(cuerpo)
+        except ValueError as e:
+            return 400, _error(f"JSON no válido: {e}")
+        except RecursionError:
+            return 400, _error("JSON no válido: demasiado anidado")
+        # Los errores de cada operación van dentro de la respuesta (200)
+        return 200, json.dumps(atender_documento(documento), ensure_ascii=False)
+    return 404, _error(f"ruta '{ruta}' desconocida")
+
+
+async def _atender_conexion(reader, writer):
+    """Atiende peticiones de una conexión en orden hasta que alguna de las partes la cierre."""
+    try:
+        while True:
+            try:
+                peticion = await _leer_peticion(reader, writer)
+            except ErrorHTTP as e:
+                writer.write(_respuesta(e.estado, _error(str(e)), False))
+                break
+            if peticion is None:
+                break
+            metodo, ruta, version, cabeceras, cuerpo = peticion
+            conexion = cabeceras.get("connection", "").lower()
+            mantener = conexion == "keep-alive" if version == "HTTP/1.0" else conexion != "close"
+            try:
+                estado, documento = atender_http(metodo, ruta, cuerpo)
+            except Exception as e:
+                # Un error inesperado responde 500 y cierra, en lugar de cortar la conexión sin respuesta
+                estado, documento, mantener = 500, _error(f"error interno: {e}"), False
+            writer.write(_respuesta(estado, documento, mantener))
+            await writer.drain()
+            if not mantener:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _servir(host, puerto, al_iniciar=None):
+    bucle = asyncio.get_running_loop()
+    servidor = await asyncio.start_server(_atender_conexion, host, puerto, limit=LIMITE_CABECERAS)
+    fin = bucle.create_future()
+    
+    def detener():
+        if not fin.done():
+            fin.set_result(None)
+    
+    for señal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            bucle.add_signal_handler(señal, detener)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Fuera del hilo principal (o en Windows) no se pueden instalar manejadores de señales
+            pass
+    if al_iniciar is not None:
+        puerto_real = servidor.sockets[0].getsockname()[1]
+        al_iniciar(puerto_real, lambda: bucle.call_soon_threadsafe(detener))
+    async with servidor:
+        await fin
+
+
+def servir(host="127.0.0.1", puerto=8765, al_iniciar=None):
+    """
+    Inicia la API y bloquea hasta recibir SIGINT o SIGTERM.
+    
+    Args:
+        host (str): Dirección de escucha (por defecto solo local)
+        puerto (int): Puerto TCP (0 = uno libre)
+        al_iniciar (callable): Se llama al aceptar conexiones con (puerto, detener),
+            donde detener() detiene el servicio desde cualquier hilo
+    """
+    try:
+        asyncio.run(_servir(host, puerto, al_iniciar))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    """Punto de entrada de la API HTTP."""
+    parser = argparse.ArgumentParser(description="API HTTP/JSON de CalcTime")
+    parser.add_argument("--host", default="127.0.0.1", help="dirección de escucha (por defecto 127.0.0.1)")
+    parser.add_argument("--puerto", type=int, default=8765, help="puerto TCP (por defecto 8765)")
+    args = parser.parse_args(argv)
+    
+    def anunciar(puerto, detener):
+        print(f"🌐 API de CalcTime escuchando en http://{args.host}:{puerto}{RUTA_CALCULAR}")
+    
+    servir(args.host, args.puerto, anunciar)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
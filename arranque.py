@@ -0,0 +1,112 @@
+"""
+Informe de tiempos de arranque
+==============================
+Versión integrada de `python -X importtime` para la CLI y la app de
+escritorio, que también funciona en el ejecutable de PyInstaller (donde no
+se pueden pasar opciones al intérprete). Se activa con la variable de
+entorno CALCTIME_IMPORTTIME=1: mide cuánto tarda en ejecutarse cada módulo
+importado a partir de ese momento (propio y acumulado, con el mismo formato
+que -X importtime) y los hitos marcados con `marcar()`, como el primer
+frame de la UI. El informe se escribe en stderr al salir.
+
+Uso:
+    CALCTIME_IMPORTTIME=1 python gui_windows/main_win.py
+    CALCTIME_IMPORTTIME=1 CalcTime.exe --batch operaciones.txt
+"""
+
+import atexit
+import sys
+import time
+
+_inicio = None
+_pila = []
+_importaciones = []
+_hitos = []
+
+
+class _CargadorMedido:
+    """Envuelve el cargador de un módulo para medir su ejecución."""
+    
+    def __init__(self, cargador, nombre):
+        self._cargador = cargador
+        self._nombre = nombre
+    
+    def __getattr__(self, atributo):
+        return getattr(self._cargador, atributo)
+    
+    def create_module(self, spec):
+        return self._cargador.create_module(spec)
+    
+    def exec_module(self, modulo):
+        inicio = time.perf_counter_ns()
+        _pila.append(0)
+        try:
+            self._cargador.exec_module(modulo)
+        finally:
+            hijos = _pila.pop()
+            acumulado = time.perf_counter_ns() - inicio
+            if _pila:
+                _pila[-1] += acumulado
+            _importaciones.append((acumulado - hijos, acumulado, len(_pila), self._nombre))
+
+
+class _BuscadorMedido:
+    """Buscador de sys.meta_path que delega en los demás y mide los módulos que encuentran."""
+    
+    def find_spec(self, nombre, ruta, objetivo=None):
+        for buscador in sys.meta_path:
+            if buscador is self or not hasattr(buscador, "find_spec"):
+                continue
+            spec = buscador.find_spec(nombre, ruta, objetivo)
+            if spec is not None:
+                if hasattr(spec.loader, "exec_module"):
+                    spec.loader = _CargadorMedido(spec.loader, nombre)
+                return spec
+        return None
+
+
+def activar(salida=None):
+    """
+    Empieza a medir importaciones e hitos (solo la primera llamada tiene efecto).
+    
+    Args:
+        salida (file): Flujo donde escribir el informe al salir (por defecto stderr)
+    """
+    global _inicio
+    if _inicio is not None:
+        return
+    _inicio = time.perf_counter_ns()
+    sys.meta_path.insert(0, _BuscadorMedido())
+    atexit.register(lambda: (salida or sys.stderr).write(informe()))
+
+
+def activo():
+    """bool: Si la medición está activa."""
+    return _inicio is not None
+
+
+def marcar(nombre):
+    """
+    Registra un hito del arranque (sin efecto si la medición no está activa).
+    
+    Args:
+        nombre (str): Descripción del hito, por ejemplo "primer frame"
+    """
+    if _inicio is not None:
+        _hitos.append((time.perf_counter_ns() - _inicio, nombre))
+
+
+def informe():
+    """
+    Genera el informe de arranque.
+    
+    Returns:
+        str: Importaciones en orden de finalización (como -X importtime) e hitos
+    """
+    lineas = ["import time: self [us] | cumulative | imported package"]
+    for propio, acumulado, nivel, nombre in _importaciones:
+        lineas.append(f"import time: {propio // 1000:>9} | {acumulado // 1000:>10} | {'  ' * nivel}{nombre}")
+    if _hitos:
+        lineas.append("Hitos de arranque [ms desde la activación]:")
+        lineas.extend(f"  {ns / 1e6:>10.1f}  {nombre}" for ns, nombre in _hitos)
+    return "\n".join(lineas) + "\n"
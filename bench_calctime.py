@@ -0,0 +1,303 @@
+"""
+Benchmarks de la Calculadora de Años, Meses y Días
+===================================================
+Mide el rendimiento (operaciones por segundo y latencia por operación) de
+las operaciones de `Tiempo` y de los caminos críticos de la app de
+escritorio (carga y guardado del historial) con historiales de 10 a
+1.000.000 de entradas. Los resultados se escriben en JSON y pueden
+compararse con una línea base guardada, con umbrales de regresión
+configurables.
+
+Uso:
+    python bench_calctime.py --salida bench.json
+    python bench_calctime.py --guardar-baseline bench_baseline.json
+    python bench_calctime.py --baseline bench_baseline.json --umbral 0.2 --umbral-caso tiempo.__str__=0.5
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from calctime import Tiempo
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui_windows"))
+from history_store import open_history_store  # noqa: E402
+
+TAMAÑOS_RAPIDOS = (10, 100, 1000, 10000)
+TAMAÑOS_COMPLETOS = (10, 100, 1000, 10000, 100000, 1000000)
+
+
+def medir(funcion, duracion_min=0.2, lote=None):
+    """
+    Mide el rendimiento y la latencia de una función sin argumentos.
+    
+    La función se ejecuta en lotes para que el costo del reloj no domine las
+    operaciones rápidas; cada lote aporta una muestra de latencia por operación.
+    
+    Args:
+        funcion (callable): Operación a medir
+        duracion_min (float): Segundos mínimos de medición
+        lote (int): Operaciones por muestra (se calibra si es None)
+        
+    Returns:
+        dict: ops_por_seg, lat_p50_ns, lat_p95_ns, lat_p99_ns y operaciones
+    """
+    reloj = time.perf_counter_ns
+    if lote is None:
+        # Calibrar para que cada lote dure ~1 ms
+        inicio = reloj()
+        funcion()
+        unitario = max(reloj() - inicio, 1)
+        lote = max(1, min(10000, 1_000_000 // unitario))
+    
+    muestras = []
+    total_ns = 0
+    limite_ns = duracion_min * 1e9
+    while total_ns < limite_ns or len(muestras) < 5:
+        inicio = reloj()
+        for _ in range(lote):
+            funcion()
+        transcurrido = reloj() - inicio
+        total_ns += transcurrido
+        muestras.append(transcurrido / lote)
+    
+    muestras.sort()
+    def percentil(p):
+        return muestras[min(len(muestras) - 1, int(p * len(muestras)))]
+    operaciones = lote * len(muestras)
+    return {
+        "ops_por_seg": operaciones / (total_ns / 1e9),
+        "lat_p50_ns": percentil(0.50),
+        "lat_p95_ns": percentil(0.95),
+        "lat_p99_ns": percentil(0.99),
+        "operaciones": operaciones,
+    }
+
+
+def casos_tiempo():
+    """
+    Casos de las operaciones de la clase Tiempo.
+    
+    Returns:
+        dict: nombre -> función sin argumentos
+    """
+    t1 = Tiempo(años=2, meses=5, dias=10, horas=3.5)
+    t2 = Tiempo(años=1, meses=3, dias=15)
+    return {
+        "tiempo.__init__": lambda: Tiempo(años=2, meses=5, dias=10, horas=3.5),
+        "tiempo.__add__": lambda: t1 + t2,
+        "tiempo.__sub__": lambda: t1 - t2,
+        "tiempo.__mul__": lambda: t1 * 1.5,
+        "tiempo.__truediv__": lambda: t1 / 3,
+        "tiempo.__eq__": lambda: t1 == t2,
+        "tiempo.__lt__": lambda: t1 < t2,
+        "tiempo.__le__": lambda: t1 <= t2,
+        "tiempo.__gt__": lambda: t1 > t2,
+        "tiempo.__ge__": lambda: t1 >= t2,
+        "tiempo.obtener_componentes": t1.obtener_componentes,
+        "tiempo.__str__": t1.__str__,
+        "tiempo.__repr__": t1.__repr__,
+    }
+
+
+def _poblar_historial(carpeta, backend, tamaño):
+    """Crea un historial con `tamaño` entradas usando el backend indicado."""
+    store = open_history_store(carpeta, backend)
+    store.load()
+    entrada = {"timestamp": "2026-01-01 08:00:00", "entry": "2 años, 5 meses + 1 año = 3 años, 5 meses",
+               "operator": "+", "left_hours": 20880.0, "operand": 8640.0, "result_hours": 29520.0}
+    if hasattr(store, "import_items"):
+        store.import_items(entrada for _ in range(tamaño))
+    else:
+        with open(store.path, "wb") as f:
+            linea = store._encode({"op": "add", **entrada})
+            for _ in range(tamaño):
+                f.write(linea)
+    if hasattr(store, "close"):
+        store.close()
+    return entrada
+
+
+def _app_sin_ui(carpeta, backend):
+    """
+    Obtiene load_data/save_data de CalcTimeWin sin construir la UI.
+    
+    La carga mide load_data seguido de load_history (que la app hace en
+    segundo plano tras el primer frame). Si Flet no está instalado se usa una
+    réplica con la misma lógica (configuración + store de historial), que es
+    lo que domina el costo.
+    """
+    app = SimpleNamespace(base_path=carpeta, config_path=os.path.join(carpeta, "config.json"),
+                          settings={"darkMode": True, "historyBackend": backend}, history_store=None,
+                          history_ready=threading.Event(), history_lock=threading.Lock(), pending_history=[],
+                          history_overlay=SimpleNamespace(current=None))
+    try:
+        from main_win import CalcTimeWin
+        def load_data():
+            CalcTimeWin.load_data(app)
+            CalcTimeWin.load_history(app)
+        return app, load_data, lambda: CalcTimeWin.save_data(app)
+    except ImportError:
+        def load_data():
+            with open(app.config_path, "r") as f:
+                app.settings = json.load(f)
+            app.history_store = open_history_store(carpeta, app.settings.get("historyBackend", "journal"))
+            app.history_store.load()
+        def save_data():
+            with open(app.config_path, "w") as f:
+                json.dump(app.settings, f)
+        return app, load_data, save_data
+
+
+def casos_historial(tamaños, backends=("journal", "sqlite"), filtro=None):
+    """
+    Genera los casos de carga y guardado del historial para cada tamaño.
+    
+    Args:
+        tamaños (iterable): Cantidades de entradas del historial
+        backends (iterable): Backends de history_store a medir
+        filtro (str): Solo se generan los casos cuyo nombre contenga este texto
+    
+    Yields:
+        tuple: (nombre, función, duración mínima)
+    """
+    for backend in backends:
+        for tamaño in tamaños:
+            nombres = {caso: f"app.{caso}[{backend}][{tamaño}]" for caso in ("load_data", "save_data", "append_history")}
+            if filtro is not None and not any(filtro in nombre for nombre in nombres.values()):
+                continue
+            with tempfile.TemporaryDirectory() as carpeta:
+                entrada = _poblar_historial(carpeta, backend, tamaño)
+                app, load_data, save_data = _app_sin_ui(carpeta, backend)
+                save_data()
+                load_data()
+                
+                def cargar():
+                    if hasattr(app.history_store, "close"):
+                        app.history_store.close()
+                    load_data()
+                casos = [
+                    (nombres["load_data"], cargar, 0.5),
+                    (nombres["save_data"], save_data, 0.2),
+                    (nombres["append_history"], lambda: app.history_store.append(entrada), 0.2),
+                ]
+                for nombre, funcion, duracion in casos:
+                    if filtro is None or filtro in nombre:
+                        yield nombre, funcion, duracion
+                app.history_store.wait()
+                if hasattr(app.history_store, "close"):
+                    app.history_store.close()
+
+
+def ejecutar(tamaños=TAMAÑOS_RAPIDOS, filtro=None):
+    """
+    Ejecuta todos los benchmarks.
+    
+    Args:
+        tamaños (iterable): Tamaños de historial a medir
+        filtro (str): Solo se ejecutan los casos cuyo nombre contenga este texto
+        
+    Returns:
+        dict: Documento JSON con metadatos y resultados por caso
+    """
+    resultados = {}
+    for nombre, funcion in casos_tiempo().items():
+        if filtro is None or filtro in nombre:
+            resultados[nombre] = medir(funcion)
+            print(f"  {nombre:45s} {resultados[nombre]['ops_por_seg']:>14,.0f} ops/s")
+    for nombre, funcion, duracion in casos_historial(tamaños, filtro=filtro):
+        resultados[nombre] = medir(funcion, duracion_min=duracion)
+        print(f"  {nombre:45s} {resultados[nombre]['ops_por_seg']:>14,.2f} ops/s")
+    return {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar_con_baseline(actual, baseline, umbral=0.2, umbrales_caso=None):
+    """
+    Compara los resultados con una línea base.
+    
+    Un caso es una regresión si su rendimiento (ops/s) cae más que el umbral
+    relativo respecto de la línea base.
+    
+    Args:
+        actual (dict): Documento de resultados actual
+        baseline (dict): Documento de resultados de referencia
+        umbral (float): Caída relativa tolerada (0.2 = 20 %)
+        umbrales_caso (dict): Umbrales específicos por nombre de caso
+        
+    Returns:
+        list: Regresiones como dicts con caso, baseline, actual, cambio y umbral
+    """
+    umbrales_caso = umbrales_caso or {}
+    regresiones = []
+    for caso, referencia in baseline["resultados"].items():
+        medido = actual["resultados"].get(caso)
+        if medido is None:
+            continue
+        limite = umbrales_caso.get(caso, umbral)
+        cambio = medido["ops_por_seg"] / referencia["ops_por_seg"] - 1
+        if cambio < -limite:
+            regresiones.append({"caso": caso, "baseline": referencia["ops_por_seg"],
+                                "actual": medido["ops_por_seg"], "cambio": cambio, "umbral": limite})
+    return regresiones
+
+
+def _umbral_caso(texto):
+    caso, _, valor = texto.rpartition("=")
+    if not caso:
+        raise argparse.ArgumentTypeError(f"'{texto}' debe tener el formato caso=umbral")
+    return caso, float(valor)
+
+
+def main(argv=None):
+    """Punto de entrada de los benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmarks de CalcTime")
+    parser.add_argument("--salida", help="archivo JSON donde escribir los resultados")
+    parser.add_argument("--baseline", help="archivo JSON de referencia para detectar regresiones")
+    parser.add_argument("--guardar-baseline", metavar="ARCHIVO", help="guarda los resultados como nueva referencia")
+    parser.add_argument("--umbral", type=float, default=0.2, help="caída relativa tolerada (por defecto 0.2)")
+    parser.add_argument("--umbral-caso", type=_umbral_caso, action="append", default=[],
+                        metavar="CASO=UMBRAL", help="umbral específico para un caso")
+    parser.add_argument("--completo", action="store_true", help="incluye historiales de 100.000 y 1.000.000")
+    parser.add_argument("--filtro", help="solo ejecuta los casos cuyo nombre contenga este texto")
+    args = parser.parse_args(argv)
+    
+    print("\n" + "="*60)
+    print("  BENCHMARKS - CALCULADORA DE TIEMPO")
+    print("="*60)
+    documento = ejecutar(TAMAÑOS_COMPLETOS if args.completo else TAMAÑOS_RAPIDOS, args.filtro)
+    
+    for ruta in (args.salida, args.guardar_baseline):
+        if ruta:
+            with open(ruta, "w", encoding="utf-8") as f:
+                json.dump(documento, f, indent=2, ensure_ascii=False)
+    
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regresiones = comparar_con_baseline(documento, baseline, args.umbral, dict(args.umbral_caso))
+        if regresiones:
+            print("\n❌ REGRESIONES DE RENDIMIENTO:")
+            for r in regresiones:
+                print(f"  {r['caso']}: {r['baseline']:,.0f} -> {r['actual']:,.0f} ops/s "
+                      f"({r['cambio']:+.1%}, umbral -{r['umbral']:.0%})")
+            return 1
+        print("\n✅ Sin regresiones respecto de la línea base")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
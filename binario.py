@@ -0,0 +1,223 @@
+"""
+Formato binario de tiempos para archivos grandes
+================================================
+Guarda secuencias de tiempos en un archivo compacto que se abre con `mmap`
+y se lee sin parsear texto ni copiar datos: los valores quedan expuestos
+como un `memoryview` sobre el propio mapa del archivo.
+
+Estructura (little-endian):
+
+    +--------+---------+------+--------+----------------+--------+-----------+
+    | magic  | versión | tipo | (rsv)  | ticks por hora | conteo | (relleno) |
+    | 4 B    | uint16  | 1 B  | 1 B    | uint32         | uint64 | 12 B      |
+    +--------+---------+------+--------+----------------+--------+-----------+
+    | conteo valores de 8 bytes: int64 (ticks) o float64 (horas)              |
+    +-------------------------------------------------------------------------+
+
+La cabecera ocupa 32 bytes para que los valores queden alineados a 8 bytes.
+Con `tipo = "q"` cada valor son ticks enteros a la resolución indicada en la
+cabecera (exacto); con `tipo = "d"` son horas en coma flotante.
+
+Uso:
+    escribir_binario("archivo.ctb", tiempos)
+    with ArchivoTiempos("archivo.ctb") as archivo:
+        total = archivo.acumular().suma
+        arr = archivo.como_array()   # TiempoArray sin copia (requiere NumPy)
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+
+from calctime import AcumuladorTiempo, Tiempo, TiempoArray, _numpy
+
+MAGIC = b"CTIM"
+VERSION = 1
+TIPO_TICKS = "q"
+TIPO_HORAS = "d"
+CABECERA = struct.Struct("<4sHcxIQ12x")
+BLOQUE_ESCRITURA = 65536
+
+
+def _a_little_endian(valores):
+    """Convierte un array nativo a little-endian (sin efecto en la mayoría de plataformas)."""
+    if sys.byteorder != "little":
+        valores.byteswap()
+    return valores
+
+
+def escribir_binario(ruta, tiempos, tipo=TIPO_TICKS):
+    """
+    Escribe una secuencia de tiempos en formato binario.
+    
+    Los valores se escriben por bloques, así que `tiempos` puede ser un
+    generador de cualquier tamaño. Un TiempoArray se vuelca directamente
+    desde su buffer.
+    
+    Args:
+        ruta (str): Archivo de destino
+        tiempos (iterable/TiempoArray): Objetos Tiempo u horas (int/float)
+        tipo (str): TIPO_TICKS (int64, exacto) o TIPO_HORAS (float64)
+        
+    Returns:
+        int: Cantidad de valores escritos
+        
+    Raises:
+        ValueError: Si el tipo no es válido
+    """
+    if tipo not in (TIPO_TICKS, TIPO_HORAS):
+        raise ValueError(f"Tipo '{tipo}' no válido (use '{TIPO_TICKS}' o '{TIPO_HORAS}')")
+    tph = Tiempo.TICKS_POR_HORA
+    
+    def convertir(valor):
+        if isinstance(valor, Tiempo):
+            return Tiempo._ticks_de(valor) if tipo == TIPO_TICKS else valor._horas_totales
+        return round(valor * tph) if tipo == TIPO_TICKS else float(valor)
+    
+    conteo = 0
+    with open(ruta, "wb") as f:
+        f.write(CABECERA.pack(MAGIC, VERSION, tipo.encode(), tph, 0))
+        if isinstance(tiempos, TiempoArray):
+            valores = tiempos._ticks if tipo == TIPO_TICKS else tiempos.horas_totales
+            f.write(valores.astype("<" + tipo, copy=False).tobytes())
+            conteo = len(tiempos)
+        else:
+            bloque = array(tipo)
+            for valor in tiempos:
+                bloque.append(convertir(valor))
+                if len(bloque) >= BLOQUE_ESCRITURA:
+                    f.write(_a_little_endian(bloque).tobytes())
+                    conteo += len(bloque)
+                    bloque = array(tipo)
+            f.write(_a_little_endian(bloque).tobytes())
+            conteo += len(bloque)
+        # El conteo se conoce al final: se completa la cabecera
+        f.seek(0)
+        f.write(CABECERA.pack(MAGIC, VERSION, tipo.encode(), tph, conteo))
+    return conteo
+
+
+class ArchivoTiempos:
+    """
+    Lector de un archivo binario de tiempos mapeado en memoria.
+    
+    Los valores no se leen ni se copian al abrir: `valores` es un memoryview
+    sobre el mapa del archivo y el sistema operativo carga las páginas a
+    demanda. Se puede indexar como una secuencia de Tiempo.
+    """
+    
+    def __init__(self, ruta):
+        """
+        Abre y valida el archivo.
+        
+        Args:
+            ruta (str): Archivo binario de tiempos
+            
+        Raises:
+            ValueError: Si el archivo no tiene el formato esperado
+        """
+        self.ruta = ruta
+        with open(ruta, "rb") as f:
+            tamaño = f.seek(0, 2)
+            if tamaño < CABECERA.size:
+                raise ValueError(f"'{ruta}' no es un archivo binario de tiempos (demasiado corto)")
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version, tipo, self.ticks_por_hora, self.conteo = CABECERA.unpack_from(self._mapa)
+        self.tipo = tipo.decode("ascii", "replace")
+        if magic != MAGIC:
+            self._mapa.close()
+            raise ValueError(f"'{ruta}' no es un archivo binario de tiempos")
+        if version != VERSION or self.tipo not in (TIPO_TICKS, TIPO_HORAS):
+            self._mapa.close()
+            raise ValueError(f"Versión ({version}) o tipo ('{self.tipo}') no soportados en '{ruta}'")
+        fin = CABECERA.size + 8 * self.conteo
+        if tamaño < fin:
+            self._mapa.close()
+            raise ValueError(f"'{ruta}' está truncado: se esperaban {self.conteo} valores")
+        
+        if sys.byteorder == "little":
+            self.valores = memoryview(self._mapa)[CABECERA.size:fin].cast(self.tipo)
+        else:
+            copia = array(self.tipo, self._mapa[CABECERA.size:fin])
+            copia.byteswap()
+            self.valores = memoryview(copia)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        """
+        Libera la vista y el mapa del archivo.
+        
+        Si todavía existen arreglos obtenidos con `como_array()`, el mapa se
+        cierra cuando se liberen.
+        """
+        self.valores.release()
+        try:
+            self._mapa.close()
+        except BufferError:
+            pass
+    
+    def __len__(self):
+        return self.conteo
+    
+    def _ticks(self, valor):
+        """Convierte un valor crudo a ticks de Tiempo."""
+        if self.tipo == TIPO_HORAS:
+            return round(valor * Tiempo.TICKS_POR_HORA)
+        if self.ticks_por_hora == Tiempo.TICKS_POR_HORA:
+            return valor
+        return round(valor * Tiempo.TICKS_POR_HORA / self.ticks_por_hora)
+    
+    def __getitem__(self, indice):
+        """
+        Args:
+            indice (int/slice): Posición o rango
+            
+        Returns:
+            Tiempo o list: Tiempo en la posición, o lista de Tiempo para un rango
+        """
+        if isinstance(indice, slice):
+            return [Tiempo._desde_ticks(self._ticks(v)) for v in self.valores[indice]]
+        return Tiempo._desde_ticks(self._ticks(self.valores[indice]))
+    
+    def __iter__(self):
+        for valor in self.valores:
+            yield Tiempo._desde_ticks(self._ticks(valor))
+    
+    def acumular(self):
+        """
+        Reduce todos los valores en una pasada (suma, media, mínimo, máximo, varianza).
+        
+        Returns:
+            AcumuladorTiempo: Estadísticas del archivo
+        """
+        acumulador = AcumuladorTiempo()
+        if self.tipo == TIPO_HORAS:
+            return acumulador.agregar_todos(self.valores)
+        if self.ticks_por_hora == Tiempo.TICKS_POR_HORA:
+            return acumulador.agregar_ticks(self.valores)
+        return acumulador.agregar_ticks(self._ticks(v) for v in self.valores)
+    
+    def como_array(self):
+        """
+        Expone los valores como TiempoArray (requiere NumPy).
+        
+        Con ticks a la misma resolución que Tiempo el arreglo comparte la
+        memoria del archivo (solo lectura, sin copia); en otro caso se convierte.
+        
+        Returns:
+            TiempoArray: Arreglo de tiempos
+        """
+        np = _numpy()
+        crudo = np.frombuffer(self.valores, dtype="<" + self.tipo)
+        if self.tipo == TIPO_HORAS:
+            return TiempoArray(crudo)
+        if self.ticks_por_hora == Tiempo.TICKS_POR_HORA:
+            return TiempoArray._desde_ticks(crudo)
+        return TiempoArray._desde_ticks(np.rint(crudo * (Tiempo.TICKS_POR_HORA / self.ticks_por_hora)).astype(np.int64))
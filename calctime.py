@@ -1,14 +1,61 @@
+import math
 import os
+import sys
+
+if os.environ.get("CALCTIME_IMPORTTIME"):
+    import arranque
+    arranque.activar()
+
+# NumPy es opcional y se importa recién al crear el primer TiempoArray (ver
+# _numpy), para no sumar su costo al arranque de la CLI
+np = None
+
+
+def _numpy():
+    """
+    Importa NumPy la primera vez que se necesita.
+    
+    Returns:
+        module: El módulo numpy
+        
+    Raises:
+        ImportError: Si NumPy no está instalado
+    """
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("TiempoArray requiere NumPy (pip install numpy)") from None
+        np = numpy
+    return np
+
+
+def _redondear_ticks(ticks):
+    """
+    Redondea ticks flotantes al tick más cercano.
+    
+    Raises:
+        ValueError: Si el valor es infinito o NaN (round() lanzaría OverflowError o ValueError)
+    """
+    if not math.isfinite(ticks):
+        raise ValueError("El tiempo debe ser un valor finito")
+    return round(ticks)
 
 
 class Tiempo:
     """
     Clase que representa una cantidad de tiempo en años, meses, días y horas.
     
-    Internamente almacena el tiempo en horas para facilitar las operaciones
-    aritméticas y evitar problemas de precisión.
+    Internamente almacena el tiempo como un número entero de "ticks" (por
+    defecto segundos) para que las operaciones aritméticas sean exactas y no
+    acumulen error de punto flotante. La resolución se configura con
+    `TICKS_POR_HORA` en una subclase (por ejemplo, 60 para contar minutos).
     """
     
+    # _componentes guarda (ticks, componentes) de la última descomposición
+    __slots__ = ("_ticks", "_componentes")
+    
     # Constantes de conversión
     HORAS_POR_DIA = 24
     DIAS_POR_MES = 30
@@ -18,7 +65,10 @@ class Tiempo:
     HORAS_POR_MES = HORAS_POR_DIA * DIAS_POR_MES  # 720 horas
     HORAS_POR_AÑO = HORAS_POR_MES * MESES_POR_AÑO  # 8640 horas
     
-    def __init__(self, años=0, meses=0, dias=0, horas=0):
+    # Resolución interna (3600 ticks por hora = 1 tick por segundo)
+    TICKS_POR_HORA = 3600
+    
+    def __init__(self, años=0, meses=0, dias=0, horas=0, minutos=0):
         """
         Inicializa un objeto Tiempo.
         
@@ -27,55 +77,105 @@ class Tiempo:
             meses (int/float): Cantidad de meses
             dias (int/float): Cantidad de días
             horas (int/float): Cantidad de horas
+            minutos (int/float): Cantidad de minutos
         """
-        self._horas_totales = self._a_horas(años, meses, dias, horas)
+        self._ticks = self._a_ticks(años, meses, dias, horas, minutos)
     
-    def _a_horas(self, años, meses, dias, horas):
+    def _a_ticks(self, años, meses, dias, horas, minutos=0):
         """
-        Convierte años, meses, días y horas a horas totales.
+        Convierte años, meses, días, horas y minutos a ticks totales.
         
         Args:
             años (int/float): Cantidad de años
             meses (int/float): Cantidad de meses
             dias (int/float): Cantidad de días
             horas (int/float): Cantidad de horas
+            minutos (int/float): Cantidad de minutos
+            
+        Returns:
+            int: Total de ticks (redondeado a la resolución de la clase)
+        """
+        total = (años * self.HORAS_POR_AÑO + meses * self.HORAS_POR_MES
+                 + dias * self.HORAS_POR_DIA + horas) * self.TICKS_POR_HORA
+        if minutos:
+            total += minutos * self.TICKS_POR_HORA / 60
+        return total if type(total) is int else _redondear_ticks(total)
+    
+    @classmethod
+    def _desde_ticks(cls, ticks):
+        """
+        Crea un objeto a partir de ticks ya calculados, sin pasar por __init__.
+        
+        Args:
+            ticks (int): Total de ticks en la resolución de la clase
             
         Returns:
-            float: Total de horas
+            Tiempo: Nuevo objeto
+        """
+        resultado = object.__new__(cls)
+        resultado._ticks = ticks
+        return resultado
+    
+    @classmethod
+    def _ticks_de(cls, otro):
+        """Obtiene los ticks de otro Tiempo expresados en la resolución de la clase."""
+        if otro.TICKS_POR_HORA == cls.TICKS_POR_HORA:
+            return otro._ticks
+        return round(otro._ticks * cls.TICKS_POR_HORA / otro.TICKS_POR_HORA)
+    
+    @property
+    def _horas_totales(self):
+        """float: Total de horas (derivado de los ticks)."""
+        return self._ticks / self.TICKS_POR_HORA
+    
+    @_horas_totales.setter
+    def _horas_totales(self, horas):
+        self._ticks = _redondear_ticks(horas * self.TICKS_POR_HORA)
+    
+    def congelar(self):
+        """
+        Returns:
+            TiempoInmutable: Copia inmutable y hashable con el mismo valor
         """
-        total = 0
-        total += años * self.HORAS_POR_AÑO
-        total += meses * self.HORAS_POR_MES
-        total += dias * self.HORAS_POR_DIA
-        total += horas
-        return total
+        return TiempoInmutable._desde_ticks(TiempoInmutable._ticks_de(self))
     
     def obtener_componentes(self):
         """
-        Convierte las horas totales a años, meses, días y horas.
+        Convierte los ticks totales a años, meses, días y horas.
+        
+        El resultado se guarda junto con los ticks de los que proviene, así
+        que las llamadas repetidas (por ejemplo, __str__ y __repr__) no
+        vuelven a descomponer y cualquier cambio de valor lo invalida.
         
         Returns:
             tuple: (años, meses, días, horas)
         """
-        horas_restantes = abs(self._horas_totales)
-        signo = -1 if self._horas_totales < 0 else 1
-        
-        # Calcular años
-        años = int(horas_restantes // self.HORAS_POR_AÑO)
-        horas_restantes %= self.HORAS_POR_AÑO
+        ticks = self._ticks
+        try:
+            ticks_cache, componentes = self._componentes
+            if ticks_cache == ticks:
+                return componentes
+        except AttributeError:
+            pass
         
-        # Calcular meses
-        meses = int(horas_restantes // self.HORAS_POR_MES)
-        horas_restantes %= self.HORAS_POR_MES
+        ticks_restantes = abs(ticks)
+        signo = -1 if ticks < 0 else 1
+        tph = self.TICKS_POR_HORA
         
-        # Calcular días
-        dias = int(horas_restantes // self.HORAS_POR_DIA)
-        horas_restantes %= self.HORAS_POR_DIA
+        # Calcular años, meses y días con aritmética entera exacta
+        años, ticks_restantes = divmod(ticks_restantes, self.HORAS_POR_AÑO * tph)
+        meses, ticks_restantes = divmod(ticks_restantes, self.HORAS_POR_MES * tph)
+        dias, ticks_restantes = divmod(ticks_restantes, self.HORAS_POR_DIA * tph)
         
         # Horas restantes (pueden tener decimales)
-        horas = horas_restantes
+        horas, fraccion = divmod(ticks_restantes, tph)
+        if fraccion:
+            horas = ticks_restantes / tph
         
-        return (signo * años, signo * meses, signo * dias, signo * horas)
+        componentes = (signo * años, signo * meses, signo * dias, signo * horas)
+        # object.__setattr__ para que también funcione en TiempoInmutable
+        object.__setattr__(self, "_componentes", (ticks, componentes))
+        return componentes
     
     def __str__(self):
         """
@@ -84,25 +184,19 @@ class Tiempo:
         Returns:
             str: Representación legible del tiempo
         """
-        años, meses, dias, horas = self.obtener_componentes()
-        
-        # Construir la representación
-        partes = []
-        
-        if años != 0:
-            partes.append(f"{años} año{'s' if abs(años) != 1 else ''}")
-        if meses != 0:
-            partes.append(f"{meses} mes{'es' if abs(meses) != 1 else ''}")
-        if dias != 0:
-            partes.append(f"{dias} día{'s' if abs(dias) != 1 else ''}")
-        if horas != 0 or len(partes) == 0:
-            # Formatear horas con 2 decimales si hay decimales
-            if horas % 1 == 0:
-                partes.append(f"{int(horas)} hora{'s' if abs(horas) != 1 else ''}")
-            else:
-                partes.append(f"{horas:.2f} horas")
+        return _formato_texto(*self.obtener_componentes())
+    
+    def formatear(self, formato="texto"):
+        """
+        Formatea el tiempo con un formato registrado (ver FORMATOS_TIEMPO).
         
-        return ", ".join(partes)
+        Args:
+            formato (str): "texto", "corto", "iso", "componentes" u otro registrado
+            
+        Returns:
+            str: Tiempo formateado
+        """
+        return _obtener_formato(formato)(*self.obtener_componentes())
     
     def __repr__(self):
         """Representación técnica del objeto."""
@@ -121,12 +215,12 @@ class Tiempo:
         Returns:
             Tiempo: Resultado de la suma
         """
+        if isinstance(otro, TiempoArray):
+            return NotImplemented
         if not isinstance(otro, Tiempo):
             raise TypeError("Solo se puede sumar con otro objeto Tiempo")
         
-        resultado = Tiempo()
-        resultado._horas_totales = self._horas_totales + otro._horas_totales
-        return resultado
+        return self._desde_ticks(self._ticks + self._ticks_de(otro))
     
     def __sub__(self, otro):
         """
@@ -138,12 +232,12 @@ class Tiempo:
         Returns:
             Tiempo: Resultado de la resta
         """
+        if isinstance(otro, TiempoArray):
+            return NotImplemented
         if not isinstance(otro, Tiempo):
             raise TypeError("Solo se puede restar con otro objeto Tiempo")
         
-        resultado = Tiempo()
-        resultado._horas_totales = self._horas_totales - otro._horas_totales
-        return resultado
+        return self._desde_ticks(self._ticks - self._ticks_de(otro))
     
     def __mul__(self, escalar):
         """
@@ -153,14 +247,30 @@ class Tiempo:
             escalar (int/float): Número por el cual multiplicar
             
         Returns:
-            Tiempo: Resultado de la multiplicación
+            Tiempo: Resultado de la multiplicación (redondeado al tick)
         """
         if not isinstance(escalar, (int, float)):
             raise TypeError("Solo se puede multiplicar por un número")
         
-        resultado = Tiempo()
-        resultado._horas_totales = self._horas_totales * escalar
-        return resultado
+        try:
+            ticks = self._ticks * escalar
+        except OverflowError:
+            raise ValueError("El tiempo debe ser un valor finito") from None
+        return self._desde_ticks(ticks if type(ticks) is int else _redondear_ticks(ticks))
+    
+    def __radd__(self, otro):
+        """
+        Suma inversa con el cero inicial, para que funcione sum(tiempos).
+        
+        Args:
+            otro (int): Cero (valor inicial de sum)
+            
+        Returns:
+            Tiempo: Copia de este tiempo
+        """
+        if isinstance(otro, (int, float)) and otro == 0:
+            return self._desde_ticks(self._ticks)
+        raise TypeError("Solo se puede sumar con otro objeto Tiempo")
     
     def __rmul__(self, escalar):
         """
@@ -182,7 +292,7 @@ class Tiempo:
             escalar (int/float): Número por el cual dividir
             
         Returns:
-            Tiempo: Resultado de la división
+            Tiempo: Resultado de la división (redondeado al tick)
             
         Raises:
             ZeroDivisionError: Si se intenta dividir por cero
@@ -193,37 +303,709 @@ class Tiempo:
         if escalar == 0:
             raise ZeroDivisionError("No se puede dividir por cero")
         
-        resultado = Tiempo()
-        resultado._horas_totales = self._horas_totales / escalar
-        return resultado
+        if type(escalar) is int and self._ticks % escalar == 0:
+            return self._desde_ticks(self._ticks // escalar)
+        try:
+            ticks = self._ticks / escalar
+        except OverflowError:
+            raise ValueError("El tiempo debe ser un valor finito") from None
+        return self._desde_ticks(_redondear_ticks(ticks))
     
-    # Métodos de comparación
+    # Métodos de comparación (exactos sobre los ticks)
     
     def __eq__(self, otro):
         """Verifica si dos tiempos son iguales."""
+        if isinstance(otro, TiempoArray):
+            return NotImplemented
         if not isinstance(otro, Tiempo):
             return False
-        return abs(self._horas_totales - otro._horas_totales) < 1e-9
+        if otro.TICKS_POR_HORA == self.TICKS_POR_HORA:
+            return self._ticks == otro._ticks
+        return self._ticks * otro.TICKS_POR_HORA == otro._ticks * self.TICKS_POR_HORA
     
     def __lt__(self, otro):
         """Verifica si este tiempo es menor que otro."""
+        if isinstance(otro, TiempoArray):
+            return NotImplemented
         if not isinstance(otro, Tiempo):
             raise TypeError("Solo se puede comparar con otro objeto Tiempo")
-        return self._horas_totales < otro._horas_totales
+        return self._ticks * otro.TICKS_POR_HORA < otro._ticks * self.TICKS_POR_HORA
     
     def __le__(self, otro):
         """Verifica si este tiempo es menor o igual que otro."""
-        return self == otro or self < otro
+        if isinstance(otro, TiempoArray):
+            return NotImplemented
+        if not isinstance(otro, Tiempo):
+            raise TypeError("Solo se puede comparar con otro objeto Tiempo")
+        return self._ticks * otro.TICKS_POR_HORA <= otro._ticks * self.TICKS_POR_HORA
     
     def __gt__(self, otro):
         """Verifica si este tiempo es mayor que otro."""
+        if isinstance(otro, TiempoArray):
+            return NotImplemented
         if not isinstance(otro, Tiempo):
             raise TypeError("Solo se puede comparar con otro objeto Tiempo")
-        return self._horas_totales > otro._horas_totales
+        return self._ticks * otro.TICKS_POR_HORA > otro._ticks * self.TICKS_POR_HORA
     
     def __ge__(self, otro):
         """Verifica si este tiempo es mayor o igual que otro."""
-        return self == otro or self > otro
+        if isinstance(otro, TiempoArray):
+            return NotImplemented
+        if not isinstance(otro, Tiempo):
+            raise TypeError("Solo se puede comparar con otro objeto Tiempo")
+        return self._ticks * otro.TICKS_POR_HORA >= otro._ticks * self.TICKS_POR_HORA
+
+
+class TiempoInmutable(Tiempo):
+    """
+    Variante inmutable y hashable de Tiempo.
+    
+    Se puede usar como clave de diccionario, en conjuntos o como argumento
+    de `functools.lru_cache`. El hash es coherente con la igualdad, incluso
+    entre resoluciones distintas: dos tiempos iguales tienen el mismo hash.
+    Las operaciones aritméticas devuelven también objetos inmutables.
+    
+    `internar()` devuelve una instancia compartida para cada valor
+    (flyweight), útil para valores repetidos como días o meses enteros.
+    """
+    
+    __slots__ = ()
+    
+    # Caché de instancias internadas: (clase, ticks) -> instancia
+    _internados = {}
+    LIMITE_INTERNADOS = 4096
+    
+    def __init__(self, años=0, meses=0, dias=0, horas=0, minutos=0):
+        object.__setattr__(self, "_ticks", self._a_ticks(años, meses, dias, horas, minutos))
+    
+    @classmethod
+    def _desde_ticks(cls, ticks):
+        resultado = object.__new__(cls)
+        object.__setattr__(resultado, "_ticks", ticks)
+        return resultado
+    
+    def __setattr__(self, nombre, valor):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+    
+    def __delattr__(self, nombre):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+    
+    def __hash__(self):
+        # La división entera->float está correctamente redondeada, así que
+        # valores iguales en cualquier resolución producen el mismo hash
+        return hash(self._ticks / self.TICKS_POR_HORA)
+    
+    def __reduce__(self):
+        return (type(self)._desde_ticks, (self._ticks,))
+    
+    @classmethod
+    def internar(cls, valor):
+        """
+        Devuelve la instancia compartida para un valor.
+        
+        Args:
+            valor (Tiempo): Tiempo a internar (de cualquier resolución)
+            
+        Returns:
+            TiempoInmutable: Instancia única para ese valor mientras haya lugar en la caché
+        """
+        clave = (cls, cls._ticks_de(valor))
+        internado = cls._internados.get(clave)
+        if internado is None:
+            internado = valor if type(valor) is cls else cls._desde_ticks(clave[1])
+            if len(cls._internados) < cls.LIMITE_INTERNADOS:
+                cls._internados[clave] = internado
+        return internado
+    
+    @classmethod
+    def limpiar_internados(cls):
+        """Vacía la caché de instancias internadas."""
+        cls._internados.clear()
+    
+    def mutable(self):
+        """
+        Returns:
+            Tiempo: Copia mutable con el mismo valor
+        """
+        return Tiempo._desde_ticks(Tiempo._ticks_de(self))
+
+
+class TiempoArray:
+    """
+    Colección columnar de tiempos respaldada por un arreglo de NumPy.
+    
+    Almacena los ticks de millones de tiempos (con la misma resolución que
+    `Tiempo.TICKS_POR_HORA`) en un único buffer contiguo de int64 y aplica
+    las operaciones de `Tiempo` de forma vectorizada, sin crear un objeto
+    `Tiempo` por elemento.
+    """
+    
+    def __init__(self, horas=()):
+        """
+        Inicializa un TiempoArray a partir de horas totales.
+        
+        Args:
+            horas (array-like): Secuencia de horas totales
+            
+        Raises:
+            ImportError: Si NumPy no está instalado
+        """
+        _numpy()
+        horas = np.asarray(horas, dtype=np.float64).reshape(-1)
+        self._ticks = np.rint(horas * Tiempo.TICKS_POR_HORA).astype(np.int64)
+    
+    @classmethod
+    def desde_componentes(cls, años=0, meses=0, dias=0, horas=0):
+        """
+        Construye un TiempoArray a partir de columnas de componentes.
+        
+        Args:
+            años (array-like/número): Columna de años
+            meses (array-like/número): Columna de meses
+            dias (array-like/número): Columna de días
+            horas (array-like/número): Columna de horas
+            
+        Returns:
+            TiempoArray: Arreglo con los tiempos de cada fila
+        """
+        _numpy()
+        total = (np.asarray(años, dtype=np.float64) * Tiempo.HORAS_POR_AÑO
+                 + np.asarray(meses, dtype=np.float64) * Tiempo.HORAS_POR_MES
+                 + np.asarray(dias, dtype=np.float64) * Tiempo.HORAS_POR_DIA
+                 + np.asarray(horas, dtype=np.float64))
+        return cls(total)
+    
+    @classmethod
+    def desde_tiempos(cls, tiempos):
+        """
+        Construye un TiempoArray a partir de un iterable de objetos Tiempo.
+        
+        Args:
+            tiempos (iterable): Objetos Tiempo
+            
+        Returns:
+            TiempoArray: Arreglo con los tiempos dados
+        """
+        _numpy()
+        ticks = np.fromiter((Tiempo._ticks_de(t) for t in tiempos), dtype=np.int64)
+        return cls._desde_ticks(ticks)
+    
+    @classmethod
+    def _desde_ticks(cls, ticks):
+        """Envuelve un arreglo de ticks ya calculado sin copiarlo."""
+        resultado = cls.__new__(cls)
+        resultado._ticks = ticks
+        return resultado
+    
+    @property
+    def horas_totales(self):
+        """numpy.ndarray: Horas totales de cada elemento."""
+        return self._ticks / Tiempo.TICKS_POR_HORA
+    
+    def __len__(self):
+        return len(self._ticks)
+    
+    def __iter__(self):
+        desde_ticks = Tiempo._desde_ticks
+        for ticks in self._ticks.tolist():
+            yield desde_ticks(ticks)
+    
+    def __getitem__(self, indice):
+        """
+        Obtiene un elemento (como Tiempo) o un sub-arreglo (como TiempoArray).
+        
+        Args:
+            indice (int/slice/array-like): Índice, rebanada o máscara booleana
+            
+        Returns:
+            Tiempo/TiempoArray: Elemento o sub-arreglo seleccionado
+        """
+        valor = self._ticks[indice]
+        if np.ndim(valor) == 0:
+            return Tiempo._desde_ticks(int(valor))
+        return TiempoArray._desde_ticks(valor)
+    
+    def obtener_componentes(self):
+        """
+        Convierte los ticks totales a años, meses, días y horas (vectorizado).
+        
+        Returns:
+            tuple: (años, meses, días, horas) como arreglos de NumPy
+        """
+        tph = Tiempo.TICKS_POR_HORA
+        ticks_restantes = np.abs(self._ticks)
+        signo = np.where(self._ticks < 0, -1, 1)
+        
+        años, ticks_restantes = np.divmod(ticks_restantes, Tiempo.HORAS_POR_AÑO * tph)
+        meses, ticks_restantes = np.divmod(ticks_restantes, Tiempo.HORAS_POR_MES * tph)
+        dias, ticks_restantes = np.divmod(ticks_restantes, Tiempo.HORAS_POR_DIA * tph)
+        
+        return (signo * años, signo * meses, signo * dias, signo * (ticks_restantes / tph))
+    
+    def total(self):
+        """
+        Suma todos los elementos del arreglo.
+        
+        Returns:
+            Tiempo: Suma de todos los tiempos
+        """
+        return Tiempo._desde_ticks(int(self._ticks.sum()))
+    
+    def __repr__(self):
+        """Representación técnica del objeto."""
+        return f"TiempoArray(n={len(self)}, horas={self.horas_totales!r})"
+    
+    def _ticks_de(self, otro, operacion):
+        """Obtiene los ticks de un operando Tiempo o TiempoArray."""
+        if isinstance(otro, TiempoArray):
+            return otro._ticks
+        if isinstance(otro, Tiempo):
+            return Tiempo._ticks_de(otro)
+        raise TypeError(f"Solo se puede {operacion} con Tiempo o TiempoArray")
+    
+    @staticmethod
+    def _escalar_de(escalar, operacion):
+        """Valida un escalar (número o arreglo numérico) para multiplicar o dividir."""
+        if isinstance(escalar, (int, float)):
+            return escalar
+        if isinstance(escalar, np.ndarray) and np.issubdtype(escalar.dtype, np.number):
+            return escalar
+        raise TypeError(f"Solo se puede {operacion} por un número")
+    
+    # Operaciones aritméticas
+    
+    def __add__(self, otro):
+        """Suma elemento a elemento con un Tiempo o TiempoArray."""
+        return TiempoArray._desde_ticks(self._ticks + self._ticks_de(otro, "sumar"))
+    
+    def __radd__(self, otro):
+        """Suma inversa (permite Tiempo + TiempoArray)."""
+        return self.__add__(otro)
+    
+    def __sub__(self, otro):
+        """Resta elemento a elemento un Tiempo o TiempoArray."""
+        return TiempoArray._desde_ticks(self._ticks - self._ticks_de(otro, "restar"))
+    
+    def __rsub__(self, otro):
+        """Resta inversa (permite Tiempo - TiempoArray)."""
+        return TiempoArray._desde_ticks(self._ticks_de(otro, "restar") - self._ticks)
+    
+    def __mul__(self, escalar):
+        """Multiplica cada tiempo por un escalar o por un arreglo de escalares."""
+        ticks = self._ticks * self._escalar_de(escalar, "multiplicar")
+        if ticks.dtype != np.int64:
+            ticks = np.rint(ticks).astype(np.int64)
+        return TiempoArray._desde_ticks(ticks)
+    
+    def __rmul__(self, escalar):
+        """Multiplicación inversa (permite escalar * TiempoArray)."""
+        return self.__mul__(escalar)
+    
+    def __truediv__(self, escalar):
+        """
+        Divide cada tiempo por un escalar o por un arreglo de escalares.
+        
+        Raises:
+            ZeroDivisionError: Si algún divisor es cero
+        """
+        escalar = self._escalar_de(escalar, "dividir")
+        if np.any(np.asarray(escalar) == 0):
+            raise ZeroDivisionError("No se puede dividir por cero")
+        return TiempoArray._desde_ticks(np.rint(self._ticks / escalar).astype(np.int64))
+    
+    # Métodos de comparación (devuelven máscaras booleanas)
+    
+    __hash__ = None
+    
+    def __eq__(self, otro):
+        """Compara elemento a elemento con la misma semántica exacta que Tiempo."""
+        if not isinstance(otro, (Tiempo, TiempoArray)):
+            return np.zeros(len(self), dtype=bool)
+        return self._ticks == self._ticks_de(otro, "comparar")
+    
+    def __ne__(self, otro):
+        return ~self.__eq__(otro)
+    
+    def __lt__(self, otro):
+        return self._ticks < self._ticks_de(otro, "comparar")
+    
+    def __le__(self, otro):
+        return self._ticks <= self._ticks_de(otro, "comparar")
+    
+    def __gt__(self, otro):
+        return self._ticks > self._ticks_de(otro, "comparar")
+    
+    def __ge__(self, otro):
+        return self._ticks >= self._ticks_de(otro, "comparar")
+
+
+class AcumuladorTiempo:
+    """
+    Reductor de una sola pasada sobre tiempos, con memoria O(1).
+    
+    Acumula conteo, suma, media, mínimo, máximo y varianza de un flujo de
+    objetos Tiempo o de valores en horas, sin crear un Tiempo por elemento.
+    Los Tiempo se suman exactamente sobre sus ticks enteros; los valores en
+    horas (float) se suman con compensación de Neumaier (Kahan mejorado)
+    para no acumular error de redondeo en millones de elementos.
+    """
+    
+    __slots__ = ("conteo", "_ticks", "_suma_horas", "_compensacion", "_media", "_m2", "_minimo", "_maximo")
+    
+    def __init__(self, valores=()):
+        """
+        Inicializa el acumulador.
+        
+        Args:
+            valores (iterable): Tiempos u horas a acumular de inmediato (opcional)
+        """
+        self.conteo = 0
+        self._ticks = 0
+        self._suma_horas = 0.0
+        self._compensacion = 0.0
+        self._media = 0.0
+        self._m2 = 0.0
+        self._minimo = None
+        self._maximo = None
+        self.agregar_todos(valores)
+    
+    def agregar(self, valor):
+        """
+        Agrega un valor al acumulado.
+        
+        Args:
+            valor (Tiempo/int/float): Tiempo u horas
+            
+        Raises:
+            TypeError: Si el valor no es un Tiempo ni un número
+        """
+        if isinstance(valor, Tiempo):
+            ticks = Tiempo._ticks_de(valor)
+            self._ticks += ticks
+            horas = ticks / Tiempo.TICKS_POR_HORA
+        elif isinstance(valor, (int, float)):
+            horas = valor
+            # Suma compensada de Neumaier
+            total = self._suma_horas + horas
+            if abs(self._suma_horas) >= abs(horas):
+                self._compensacion += (self._suma_horas - total) + horas
+            else:
+                self._compensacion += (horas - total) + self._suma_horas
+            self._suma_horas = total
+        else:
+            raise TypeError("Solo se pueden acumular objetos Tiempo o números (horas)")
+        
+        # Media y varianza de Welford
+        self.conteo += 1
+        delta = horas - self._media
+        self._media += delta / self.conteo
+        self._m2 += delta * (horas - self._media)
+        
+        if self._minimo is None or horas < self._minimo:
+            self._minimo = horas
+        if self._maximo is None or horas > self._maximo:
+            self._maximo = horas
+    
+    def agregar_todos(self, valores):
+        """
+        Agrega todos los valores de un iterable (consumiéndolo una sola vez).
+        
+        Args:
+            valores (iterable): Tiempos u horas
+            
+        Returns:
+            AcumuladorTiempo: El mismo acumulador, para encadenar llamadas
+        """
+        agregar = self.agregar
+        for valor in valores:
+            agregar(valor)
+        return self
+    
+    def agregar_ticks(self, ticks):
+        """
+        Agrega valores dados directamente como ticks enteros (a `Tiempo.TICKS_POR_HORA`).
+        
+        Evita crear un Tiempo por elemento al reducir buffers de ticks, por
+        ejemplo una vista de un archivo binario (ver binario.py). Un arreglo
+        de NumPy se reduce de forma vectorizada y se fusiona como un bloque.
+        
+        Args:
+            ticks (iterable/numpy.ndarray): Ticks enteros
+            
+        Returns:
+            AcumuladorTiempo: El mismo acumulador, para encadenar llamadas
+        """
+        tph = Tiempo.TICKS_POR_HORA
+        if hasattr(ticks, "dtype"):
+            # Arreglo de NumPy (si llega uno, NumPy ya está instalado aunque aún no se haya importado aquí)
+            np = _numpy()
+            if len(ticks) == 0:
+                return self
+            horas = ticks / tph
+            bloque = AcumuladorTiempo()
+            bloque.conteo = len(ticks)
+            # La suma en int64 puede desbordar sin aviso: si no cabe con seguridad, se suma en enteros de Python
+            if float(np.abs(horas).max()) * tph * len(ticks) < 2 ** 62:
+                bloque._ticks = int(ticks.sum(dtype=np.int64))
+            else:
+                bloque._ticks = sum(ticks.tolist())
+            bloque._media = float(horas.mean())
+            bloque._m2 = float(np.square(horas - bloque._media).sum())
+            bloque._minimo = float(horas.min())
+            bloque._maximo = float(horas.max())
+            return self.fusionar(bloque)
+        conteo, media, m2 = self.conteo, self._media, self._m2
+        minimo, maximo = self._minimo, self._maximo
+        suma = 0
+        for t in ticks:
+            t = int(t)
+            suma += t
+            horas = t / tph
+            conteo += 1
+            delta = horas - media
+            media += delta / conteo
+            m2 += delta * (horas - media)
+            if minimo is None or horas < minimo:
+                minimo = horas
+            if maximo is None or horas > maximo:
+                maximo = horas
+        self.conteo, self._media, self._m2 = conteo, media, m2
+        self._minimo, self._maximo = minimo, maximo
+        self._ticks += suma
+        return self
+    
+    def fusionar(self, otro):
+        """
+        Combina otro acumulador parcial en este (por ejemplo, de otro bloque o proceso).
+        
+        Args:
+            otro (AcumuladorTiempo): Acumulador a incorporar
+            
+        Returns:
+            AcumuladorTiempo: El mismo acumulador, para encadenar llamadas
+        """
+        if otro.conteo == 0:
+            return self
+        if self.conteo == 0:
+            for campo in self.__slots__:
+                setattr(self, campo, getattr(otro, campo))
+            return self
+        
+        conteo = self.conteo + otro.conteo
+        delta = otro._media - self._media
+        self._m2 += otro._m2 + delta * delta * self.conteo * otro.conteo / conteo
+        self._media += delta * otro.conteo / conteo
+        self.conteo = conteo
+        self._ticks += otro._ticks
+        total = self._suma_horas + otro._suma_horas
+        if abs(self._suma_horas) >= abs(otro._suma_horas):
+            self._compensacion += (self._suma_horas - total) + otro._suma_horas
+        else:
+            self._compensacion += (otro._suma_horas - total) + self._suma_horas
+        self._compensacion += otro._compensacion
+        self._suma_horas = total
+        self._minimo = min(self._minimo, otro._minimo)
+        self._maximo = max(self._maximo, otro._maximo)
+        return self
+    
+    @staticmethod
+    def _a_tiempo(horas):
+        return Tiempo._desde_ticks(round(horas * Tiempo.TICKS_POR_HORA))
+    
+    @property
+    def suma(self):
+        """Tiempo: Suma de todos los valores."""
+        return Tiempo._desde_ticks(self._ticks + round((self._suma_horas + self._compensacion) * Tiempo.TICKS_POR_HORA))
+    
+    @property
+    def media(self):
+        """Tiempo: Media de los valores (None si no hay valores)."""
+        return self.suma / self.conteo if self.conteo else None
+    
+    @property
+    def minimo(self):
+        """Tiempo: Menor valor (None si no hay valores)."""
+        return self._a_tiempo(self._minimo) if self.conteo else None
+    
+    @property
+    def maximo(self):
+        """Tiempo: Mayor valor (None si no hay valores)."""
+        return self._a_tiempo(self._maximo) if self.conteo else None
+    
+    @property
+    def varianza(self):
+        """float: Varianza poblacional en horas² (None si no hay valores)."""
+        return self._m2 / self.conteo if self.conteo else None
+    
+    @property
+    def desviacion(self):
+        """float: Desviación estándar poblacional en horas (None si no hay valores)."""
+        return self.varianza ** 0.5 if self.conteo else None
+    
+    def __repr__(self):
+        """Representación técnica del objeto."""
+        return f"AcumuladorTiempo(conteo={self.conteo}, suma={self.suma!r})"
+
+
+def sumar_tiempos(valores):
+    """
+    Suma un iterable de tiempos u horas en una pasada, sin crear un Tiempo por elemento.
+    
+    Args:
+        valores (iterable): Tiempos u horas
+        
+    Returns:
+        Tiempo: Suma total
+    """
+    return AcumuladorTiempo(valores).suma
+
+
+def media_tiempos(valores):
+    """
+    Calcula la media de un iterable de tiempos u horas en una pasada.
+    
+    Args:
+        valores (iterable): Tiempos u horas
+        
+    Returns:
+        Tiempo: Media (None si el iterable está vacío)
+    """
+    return AcumuladorTiempo(valores).media
+
+
+def estadisticas_tiempos(valores):
+    """
+    Calcula conteo, suma, media, mínimo, máximo y varianza en una pasada.
+    
+    Args:
+        valores (iterable): Tiempos u horas
+        
+    Returns:
+        AcumuladorTiempo: Acumulador con todas las estadísticas
+    """
+    return AcumuladorTiempo(valores)
+
+
+# Formatos de salida
+
+FORMATOS_TIEMPO = {}
+
+# Plantillas precompiladas (singular, plural) de la forma larga
+_PLANTILLAS_TEXTO = (
+    ("{} año".format, "{} años".format),
+    ("{} mes".format, "{} meses".format),
+    ("{} día".format, "{} días".format),
+)
+_PLANTILLA_CORTO = "{}Y {}M {}D {:.2f}H".format
+
+
+def registrar_formato(nombre, funcion):
+    """
+    Registra un formato de salida.
+    
+    Args:
+        nombre (str): Nombre del formato
+        funcion (callable): Recibe (años, meses, días, horas) y devuelve un str
+        
+    Returns:
+        callable: La misma función
+    """
+    FORMATOS_TIEMPO[nombre] = funcion
+    return funcion
+
+
+def _obtener_formato(formato):
+    try:
+        return FORMATOS_TIEMPO[formato]
+    except KeyError:
+        raise ValueError(f"Formato '{formato}' desconocido (disponibles: {', '.join(FORMATOS_TIEMPO)})") from None
+
+
+def _formato_texto(años, meses, dias, horas):
+    """Forma larga en español: "2 años, 5 meses, 10 días, 3.50 horas"."""
+    partes = []
+    for valor, (singular, plural) in zip((años, meses, dias), _PLANTILLAS_TEXTO):
+        if valor != 0:
+            partes.append(singular(valor) if abs(valor) == 1 else plural(valor))
+    if horas != 0 or not partes:
+        # Formatear horas con 2 decimales si hay decimales
+        if horas % 1 == 0:
+            partes.append(f"{int(horas)} hora{'s' if abs(horas) != 1 else ''}")
+        else:
+            partes.append(f"{horas:.2f} horas")
+    return ", ".join(partes)
+
+
+def _formato_corto(años, meses, dias, horas):
+    """Forma corta de la app de escritorio: "2Y 5M 10D 3.50H"."""
+    return _PLANTILLA_CORTO(años, meses, dias, horas)
+
+
+def _formato_iso(años, meses, dias, horas):
+    """Duración ISO-8601: "P2Y5M10DT3.5H" (con "-" delante si es negativa)."""
+    signo = "-" if años < 0 or meses < 0 or dias < 0 or horas < 0 else ""
+    fecha = "".join(f"{abs(valor)}{unidad}" for valor, unidad in ((años, "Y"), (meses, "M"), (dias, "D")) if valor)
+    if horas % 1 == 0:
+        hora = f"T{abs(int(horas))}H" if horas else ""
+    else:
+        hora = f"T{round(abs(horas), 6)!r}H"
+    return f"{signo}P{fecha}{hora}" if fecha or hora else "PT0H"
+
+
+def _formato_componentes(años, meses, dias, horas):
+    """Componentes separados por comas, reutilizables como entrada del modo por lotes."""
+    return f"{años},{meses},{dias},{horas:g}"
+
+
+registrar_formato("texto", _formato_texto)
+registrar_formato("componentes", _formato_componentes)
+registrar_formato("corto", _formato_corto)
+registrar_formato("iso", _formato_iso)
+
+
+def formatear(tiempo, formato="texto"):
+    """
+    Formatea un tiempo con un formato registrado.
+    
+    Args:
+        tiempo (Tiempo): Tiempo a formatear
+        formato (str): Nombre del formato (ver FORMATOS_TIEMPO)
+        
+    Returns:
+        str: Tiempo formateado
+    """
+    return _obtener_formato(formato)(*tiempo.obtener_componentes())
+
+
+def formatear_muchos(tiempos, formato="texto"):
+    """
+    Formatea una secuencia completa de tiempos en una sola llamada.
+    
+    Un TiempoArray se descompone de forma vectorizada; en otro caso, los
+    valores repetidos se formatean una sola vez.
+    
+    Args:
+        tiempos (iterable/TiempoArray): Tiempos a formatear
+        formato (str): Nombre del formato (ver FORMATOS_TIEMPO)
+        
+    Returns:
+        list: Cadenas formateadas, en el mismo orden
+    """
+    funcion = _obtener_formato(formato)
+    if isinstance(tiempos, TiempoArray):
+        componentes = zip(*(c.tolist() for c in tiempos.obtener_componentes()))
+        return [funcion(*c) for c in componentes]
+    
+    memo = {}
+    resultado = []
+    agregar = resultado.append
+    for tiempo in tiempos:
+        clave = (tiempo._ticks, tiempo.TICKS_POR_HORA)
+        texto = memo.get(clave)
+        if texto is None:
+            texto = memo[clave] = funcion(*tiempo.obtener_componentes())
+        agregar(texto)
+    return resultado
 
 
 def limpiar_pantalla():
@@ -542,5 +1324,192 @@ def main():
             input("\nPresione Enter para continuar...")
 
 
+# Modo por lotes (no interactivo)
+
+OPERADORES_LOTE = {"+": "+", "-": "-", "*": "*", "×": "*", "x": "*", "/": "/", "÷": "/"}
+FORMATOS_LOTE = tuple(FORMATOS_TIEMPO)
+
+
+def parsear_tiempo_lote(texto):
+    """
+    Convierte un tiempo escrito como "años,meses,días,horas" en un objeto Tiempo.
+    
+    Los componentes finales pueden omitirse (por ejemplo, "1,6" = 1 año, 6 meses).
+    
+    Args:
+        texto (str): Tiempo en formato separado por comas
+        
+    Returns:
+        Tiempo: Objeto Tiempo equivalente
+        
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    partes = texto.split(",")
+    if len(partes) > 4:
+        raise ValueError(f"'{texto}' tiene más de 4 componentes (años,meses,días,horas)")
+    try:
+        valores = [float(p) if p.strip() else 0 for p in partes]
+    except ValueError:
+        raise ValueError(f"'{texto}' no es un tiempo válido (años,meses,días,horas)") from None
+    return Tiempo(*valores)
+
+
+def evaluar_linea(linea):
+    """
+    Evalúa una línea del modo por lotes.
+    
+    Una línea contiene un tiempo seguido de cero o más pares "operador operando",
+    evaluados de izquierda a derecha como en el modo recursivo. Suma y resta
+    reciben tiempos; multiplicación y división reciben escalares.
+    Ejemplo: "2,5,10,0 + 1,3,15,0 * 2".
+    
+    Args:
+        linea (str): Línea a evaluar
+        
+    Returns:
+        Tiempo: Resultado de la operación
+        
+    Raises:
+        ValueError: Si la línea no es válida
+        ZeroDivisionError: Si se intenta dividir por cero
+    """
+    tokens = linea.split()
+    if len(tokens) % 2 == 0:
+        raise ValueError("se esperaba 'tiempo [operador operando]...'")
+    
+    resultado = parsear_tiempo_lote(tokens[0])
+    for i in range(1, len(tokens), 2):
+        operador = OPERADORES_LOTE.get(tokens[i])
+        operando = tokens[i + 1]
+        if operador is None:
+            raise ValueError(f"operador '{tokens[i]}' no soportado (use +, -, *, /)")
+        if operador == "+":
+            resultado = resultado + parsear_tiempo_lote(operando)
+        elif operador == "-":
+            resultado = resultado - parsear_tiempo_lote(operando)
+        else:
+            try:
+                escalar = float(operando)
+            except ValueError:
+                raise ValueError(f"'{operando}' no es un escalar válido") from None
+            resultado = resultado * escalar if operador == "*" else resultado / escalar
+    return resultado
+
+
+def formatear_resultado_lote(tiempo, formato="texto"):
+    """
+    Formatea un resultado del modo por lotes.
+    
+    Args:
+        tiempo (Tiempo): Resultado a formatear
+        formato (str): "texto" (legible), "componentes" (años,meses,días,horas,
+            reutilizable como entrada de otro lote), "corto" o "iso"
+        
+    Returns:
+        str: Resultado formateado
+    """
+    return formatear(tiempo, formato)
+
+
+def procesar_lote(lineas, formato="texto"):
+    """
+    Procesa un flujo de líneas y genera un resultado por operación, en orden.
+    
+    Es un generador: consume las líneas de forma perezosa, por lo que la memoria
+    usada no depende del tamaño de la entrada. Se omiten las líneas vacías y los
+    comentarios (#); las líneas inválidas producen "ERROR: <mensaje>".
+    
+    Args:
+        lineas (iterable): Líneas de entrada
+        formato (str): Formato de salida (ver formatear_resultado_lote)
+        
+    Yields:
+        str: Resultado formateado de cada operación
+    """
+    for linea in lineas:
+        linea = linea.strip()
+        if not linea or linea.startswith("#"):
+            continue
+        try:
+            yield formatear_resultado_lote(evaluar_linea(linea), formato)
+        except (ValueError, ArithmeticError) as e:
+            yield f"ERROR: {e}"
+
+
+def ejecutar_lote(entrada, salida, formato="texto"):
+    """
+    Ejecuta el modo por lotes sobre flujos de texto abiertos.
+    
+    Args:
+        entrada (iterable): Flujo de entrada (archivo o sys.stdin)
+        salida (file): Flujo de salida (archivo o sys.stdout)
+        formato (str): Formato de salida
+        
+    Returns:
+        int: Cantidad de líneas con error
+    """
+    errores = 0
+    for resultado in procesar_lote(entrada, formato):
+        if resultado.startswith("ERROR:"):
+            errores += 1
+        salida.write(resultado + "\n")
+    return errores
+
+
+def cli(argv=None):
+    """
+    Punto de entrada de la línea de comandos.
+    
+    Sin argumentos inicia el menú interactivo; con --batch procesa un archivo
+    (o la entrada estándar con "-") sin interacción. Con --jobs N > 1 el lote
+    se evalúa en N procesos (ver paralelo.py).
+    
+    Args:
+        argv (list): Argumentos de la línea de comandos (por defecto sys.argv)
+        
+    Returns:
+        int: Código de salida
+    """
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Calculadora de años, meses, días y horas")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="ARCHIVO",
+                        help="procesa una operación por línea desde ARCHIVO o stdin ('-')")
+    parser.add_argument("--formato", choices=FORMATOS_LOTE, default="texto",
+                        help="formato de salida del modo por lotes")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="procesos para evaluar el modo por lotes en paralelo")
+    args = parser.parse_args(argv)
+    
+    if args.batch is None:
+        main()
+        return 0
+    
+    if args.jobs > 1:
+        from paralelo import evaluar_paralelo
+        ejecutar = lambda entrada, salida, formato: evaluar_paralelo(entrada, salida, args.jobs, formato=formato)
+    else:
+        ejecutar = ejecutar_lote
+    
+    if args.batch == "-":
+        errores = ejecutar(sys.stdin, sys.stdout, args.formato)
+    else:
+        with open(args.batch, "r", encoding="utf-8") as entrada:
+            errores = ejecutar(entrada, sys.stdout, args.formato)
+    return 1 if errores else 0
+
+
+# Instrumentación opcional (ver instrumentacion.py): los métodos de Tiempo
+# solo se envuelven si alguna de sus variables de entorno está definida
+if os.environ.get("CALCTIME_INSTRUMENTAR") or os.environ.get("CALCTIME_PERFIL") or os.environ.get("CALCTIME_MUESTREO"):
+    import instrumentacion
+    if instrumentacion.activar_desde_entorno():
+        instrumentacion.instrumentar(Tiempo, instrumentacion.METODOS_TIEMPO)
+
 if __name__ == "__main__":
-    main()
+    if getattr(sys, "frozen", False):
+        # Ejecutable de PyInstaller: los procesos de --jobs relanzan el .exe
+        import multiprocessing
+        multiprocessing.freeze_support()
+    sys.exit(cli())
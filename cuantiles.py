@@ -0,0 +1,256 @@
+"""
+Resumen de cuantiles en streaming para distribuciones de tiempos
+================================================================
+Estima percentiles (p50, p95, p99, ...) de cientos de millones de tiempos
+sin ordenarlos en memoria, con un sketch KLL (Karnin, Lang y Liberty, 2016):
+
+- Memoria acotada: O(k · log(n / k)) valores, sin importar cuántos se agreguen.
+- Error de rango del orden de 1 / k (con k = 200, típicamente menos de 1 %).
+- Combinable: los resúmenes parciales de distintos procesos o archivos se
+  unen con `fusionar()` y el resultado es equivalente a un único resumen.
+
+Los valores se guardan como ticks enteros de `Tiempo`, por lo que el mínimo y
+el máximo son exactos y los percentiles devuelven tiempos existentes.
+La compactación usa un generador aleatorio con semilla, así que dos
+ejecuciones con los mismos datos y la misma semilla dan el mismo resultado.
+
+Uso:
+    resumen = ResumenCuantiles(tiempos)
+    p50, p95, p99 = resumen.percentiles(50, 95, 99)
+"""
+
+import math
+import random
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from calctime import Tiempo, _redondear_ticks
+
+K_POR_DEFECTO = 200
+# Factor de reducción de la capacidad de cada nivel respecto del superior
+FACTOR_CAPACIDAD = 2 / 3
+
+
+class ResumenCuantiles:
+    """Sketch KLL de cuantiles sobre tiempos, combinable y con memoria acotada."""
+    
+    def __init__(self, valores=(), k=K_POR_DEFECTO, semilla=0):
+        """
+        Inicializa el resumen.
+        
+        Args:
+            valores (iterable): Tiempos u horas a agregar de inmediato (opcional)
+            k (int): Precisión (a mayor k, menor error y más memoria)
+            semilla (int): Semilla de la compactación aleatoria
+        """
+        if k < 8:
+            raise ValueError("k debe ser al menos 8")
+        self.k = k
+        self.conteo = 0
+        self._azar = random.Random(semilla)
+        self._niveles = []
+        self._tamaño = 0
+        self._capacidad_total = 0
+        self._minimo = None
+        self._maximo = None
+        self._ordenado = None
+        self._crecer()
+        self.agregar_todos(valores)
+    
+    def _capacidad(self, nivel):
+        """Capacidad de un nivel: los niveles altos (más pesados) tienen más lugar."""
+        profundidad = len(self._niveles) - nivel - 1
+        return int(math.ceil(self.k * FACTOR_CAPACIDAD ** profundidad)) + 1
+    
+    def _crecer(self):
+        self._niveles.append([])
+        self._capacidad_total = sum(self._capacidad(h) for h in range(len(self._niveles)))
+    
+    def _compactar(self):
+        """Compacta niveles llenos: ordena y promueve la mitad (peso doble) al nivel siguiente."""
+        for nivel in range(len(self._niveles)):
+            items = self._niveles[nivel]
+            if len(items) < self._capacidad(nivel):
+                continue
+            if nivel + 1 == len(self._niveles):
+                self._crecer()
+            items.sort()
+            # Si hay una cantidad impar, el último elemento se queda en el nivel
+            resto = [items.pop()] if len(items) % 2 else []
+            self._niveles[nivel + 1].extend(items[self._azar.getrandbits(1)::2])
+            self._niveles[nivel] = resto
+            self._tamaño = sum(len(n) for n in self._niveles)
+            if self._tamaño < self._capacidad_total:
+                break
+    
+    def agregar(self, valor):
+        """
+        Agrega un valor al resumen.
+        
+        Args:
+            valor (Tiempo/int/float): Tiempo u horas
+        """
+        if isinstance(valor, Tiempo):
+            ticks = Tiempo._ticks_de(valor)
+        elif isinstance(valor, (int, float)):
+            ticks = valor * Tiempo.TICKS_POR_HORA
+            ticks = ticks if type(ticks) is int else _redondear_ticks(ticks)
+        else:
+            raise TypeError("Solo se pueden agregar objetos Tiempo o números (horas)")
+        self._niveles[0].append(ticks)
+        self.conteo += 1
+        self._tamaño += 1
+        self._ordenado = None
+        if self._minimo is None or ticks < self._minimo:
+            self._minimo = ticks
+        if self._maximo is None or ticks > self._maximo:
+            self._maximo = ticks
+        if self._tamaño >= self._capacidad_total:
+            self._compactar()
+    
+    def agregar_todos(self, valores):
+        """
+        Agrega todos los valores de un iterable (consumiéndolo una sola vez).
+        
+        Returns:
+            ResumenCuantiles: El mismo resumen, para encadenar llamadas
+        """
+        agregar = self.agregar
+        for valor in valores:
+            agregar(valor)
+        return self
+    
+    def fusionar(self, otro):
+        """
+        Combina otro resumen parcial en este.
+        
+        Args:
+            otro (ResumenCuantiles): Resumen a incorporar
+            
+        Returns:
+            ResumenCuantiles: El mismo resumen, para encadenar llamadas
+        """
+        if otro.conteo == 0:
+            return self
+        while len(self._niveles) < len(otro._niveles):
+            self._crecer()
+        for nivel, items in enumerate(otro._niveles):
+            self._niveles[nivel].extend(items)
+        self.conteo += otro.conteo
+        self._tamaño = sum(len(n) for n in self._niveles)
+        self._minimo = otro._minimo if self._minimo is None else min(self._minimo, otro._minimo)
+        self._maximo = otro._maximo if self._maximo is None else max(self._maximo, otro._maximo)
+        self._ordenado = None
+        while self._tamaño >= self._capacidad_total:
+            self._compactar()
+        return self
+    
+    def _valores_ponderados(self):
+        """Valores ordenados y sus pesos acumulados (se recalcula solo si hubo cambios)."""
+        if self._ordenado is None:
+            pares = sorted((valor, 1 << nivel) for nivel, items in enumerate(self._niveles) for valor in items)
+            self._ordenado = ([v for v, _ in pares], list(accumulate(p for _, p in pares)))
+        return self._ordenado
+    
+    def cuantil(self, q):
+        """
+        Estima el cuantil q.
+        
+        Args:
+            q (float): Fracción entre 0 y 1 (0.95 = p95)
+            
+        Returns:
+            Tiempo: Tiempo estimado en ese cuantil (None si el resumen está vacío)
+            
+        Raises:
+            ValueError: Si q está fuera de [0, 1]
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("El cuantil debe estar entre 0 y 1")
+        if self.conteo == 0:
+            return None
+        if q == 0:
+            return Tiempo._desde_ticks(self._minimo)
+        if q == 1:
+            return Tiempo._desde_ticks(self._maximo)
+        valores, acumulados = self._valores_ponderados()
+        # Menor valor cuyo peso acumulado alcanza q del total
+        i = min(bisect_left(acumulados, q * acumulados[-1]), len(valores) - 1)
+        return Tiempo._desde_ticks(valores[i])
+    
+    def percentiles(self, *ps):
+        """
+        Estima varios percentiles a la vez.
+        
+        Args:
+            *ps (int/float): Percentiles entre 0 y 100 (por defecto 50, 95 y 99)
+            
+        Returns:
+            list: Tiempos estimados, en el mismo orden
+        """
+        return [self.cuantil(p / 100) for p in (ps or (50, 95, 99))]
+    
+    def contar_hasta(self, tiempo):
+        """
+        Estima cuántos valores son menores o iguales que un tiempo.
+        
+        Args:
+            tiempo (Tiempo): Tiempo de referencia
+            
+        Returns:
+            int: Cantidad estimada de valores <= tiempo
+        """
+        if self.conteo == 0:
+            return 0
+        valores, acumulados = self._valores_ponderados()
+        i = bisect_right(valores, Tiempo._ticks_de(tiempo))
+        return acumulados[i - 1] if i else 0
+    
+    @property
+    def minimo(self):
+        """Tiempo: Menor valor exacto (None si está vacío)."""
+        return None if self._minimo is None else Tiempo._desde_ticks(self._minimo)
+    
+    @property
+    def maximo(self):
+        """Tiempo: Mayor valor exacto (None si está vacío)."""
+        return None if self._maximo is None else Tiempo._desde_ticks(self._maximo)
+    
+    @property
+    def memoria(self):
+        """int: Cantidad de valores retenidos por el resumen."""
+        return self._tamaño
+    
+    def exportar(self):
+        """
+        Serializa el resumen a un diccionario compatible con JSON.
+        
+        Returns:
+            dict: Estado del resumen (ver importar())
+        """
+        return {"k": self.k, "ticks_por_hora": Tiempo.TICKS_POR_HORA, "conteo": self.conteo,
+                "minimo": self._minimo, "maximo": self._maximo, "niveles": [list(n) for n in self._niveles]}
+    
+    @classmethod
+    def importar(cls, datos, semilla=0):
+        """
+        Reconstruye un resumen exportado (por ejemplo, leído de un archivo JSON).
+        
+        Args:
+            datos (dict): Resultado de exportar()
+            semilla (int): Semilla para las compactaciones siguientes
+            
+        Returns:
+            ResumenCuantiles: Resumen equivalente
+        """
+        if datos["ticks_por_hora"] != Tiempo.TICKS_POR_HORA:
+            raise ValueError("El resumen se exportó con otra resolución de ticks")
+        resumen = cls(k=datos["k"], semilla=semilla)
+        while len(resumen._niveles) < len(datos["niveles"]):
+            resumen._crecer()
+        resumen._niveles = [list(n) for n in datos["niveles"]]
+        resumen._tamaño = sum(len(n) for n in resumen._niveles)
+        resumen.conteo = datos["conteo"]
+        resumen._minimo = datos["minimo"]
+        resumen._maximo = datos["maximo"]
+        return resumen
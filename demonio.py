@@ -0,0 +1,305 @@
+"""
+Demonio local de CalcTime
+=========================
+Servidor de larga duración sobre un socket Unix que mantiene `Tiempo`, el
+parser de expresiones y su caché ya cargados, para que los scripts no paguen
+el arranque del intérprete y la importación de módulos en cada cálculo.
+
+El protocolo es JSON delimitado por saltos de línea (NDJSON, ver
+protocolo.py): una petición por línea y una respuesta por línea, en el mismo
+orden. Los clientes pueden enviar muchas peticiones seguidas sin esperar
+cada respuesta (pipelining).
+
+Uso:
+    python demonio.py servir &
+    python demonio.py cliente "2y 5m + 1y 3m" "3d * 2.5"
+    printf '{"op":"sumar","a":"1y","b":"6m"}\\n' | python demonio.py cliente
+    printf '{"op":"sumar","a":"1y","b":"6m"}\\n' | socat - UNIX-CONNECT:$CALCTIME_SOCKET
+
+El cliente solo importa la biblioteca estándar; en scripts con muchas
+llamadas conviene mantener un único cliente abierto y enviarle todas las
+peticiones por stdin.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# Límite de una línea (una petición o una lista de peticiones)
+LIMITE_LINEA = 16 * 1024 * 1024
+# Peticiones enviadas por el cliente antes de leer sus respuestas
+VENTANA_CLIENTE = 1000
+
+
+def ruta_socket_por_defecto():
+    """
+    Ruta del socket: $CALCTIME_SOCKET o un archivo por usuario en el directorio temporal.
+    
+    Returns:
+        str: Ruta del socket Unix
+    """
+    if os.environ.get("CALCTIME_SOCKET"):
+        return os.environ["CALCTIME_SOCKET"]
+    carpeta = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    usuario = os.getuid() if hasattr(os, "getuid") else os.getlogin()
+    return os.path.join(carpeta, f"calctime-{usuario}.sock")
+
+
+def _verificar_soporte():
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Este sistema no admite sockets Unix")
+
+
+# Servidor
+
+async def _atender_conexion(reader, writer):
+    """Atiende una conexión: responde cada línea en orden hasta que el cliente cierre."""
+    from protocolo import atender_json
+    try:
+        while True:
+            linea = await reader.readline()
+            if not linea:
+                break
+            if not linea.strip():
+                continue
+            writer.write(atender_json(linea).encode("utf-8") + b"\n")
+            # drain() solo espera si el cliente no está leyendo las respuestas
+            await writer.drain()
+    except (ConnectionError, ValueError):
+        # ValueError: línea más larga que LIMITE_LINEA
+        pass
+    finally:
+        writer.close()
+
+
+async def _servir(ruta, al_iniciar=None):
+    import asyncio
+    import signal
+    
+    bucle = asyncio.get_running_loop()
+    # El socket se crea ya con permisos 0600: un chmod posterior dejaría una ventana abierta a otros usuarios
+    mascara = os.umask(0o177)
+    try:
+        servidor = await asyncio.start_unix_server(_atender_conexion, path=ruta, limit=LIMITE_LINEA)
+    finally:
+        os.umask(mascara)
+    fin = bucle.create_future()
+    
+    def detener():
+        if not fin.done():
+            fin.set_result(None)
+    
+    for señal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            bucle.add_signal_handler(señal, detener)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Fuera del hilo principal no se pueden instalar manejadores de señales
+            pass
+    if al_iniciar is not None:
+        al_iniciar(lambda: bucle.call_soon_threadsafe(detener))
+    async with servidor:
+        await fin
+
+
+def servir(ruta=None, al_iniciar=None):
+    """
+    Inicia el demonio y bloquea hasta recibir SIGINT o SIGTERM.
+    
+    Args:
+        ruta (str): Ruta del socket (por defecto, ruta_socket_por_defecto())
+        al_iniciar (callable): Se llama cuando el socket acepta conexiones con
+            una función sin argumentos que detiene el demonio desde cualquier hilo
+            
+    Raises:
+        OSError: Si ya hay un demonio escuchando en la ruta
+    """
+    import asyncio
+    
+    # Importar y calentar antes de aceptar conexiones
+    import protocolo
+    protocolo.atender({"op": "evaluar", "expr": "1y 1m 1d 1h + 1h"})
+    
+    _verificar_soporte()
+    ruta = ruta or ruta_socket_por_defecto()
+    if os.path.exists(ruta):
+        prueba = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            prueba.connect(ruta)
+        except OSError:
+            os.unlink(ruta)  # Socket huérfano de un demonio anterior
+        else:
+            raise OSError(f"Ya hay un demonio de CalcTime escuchando en {ruta}")
+        finally:
+            prueba.close()
+    try:
+        asyncio.run(_servir(ruta, al_iniciar))
+    finally:
+        if os.path.exists(ruta):
+            os.unlink(ruta)
+
+
+# Cliente
+
+class Cliente:
+    """Cliente del demonio con conexión persistente y envío en pipeline."""
+    
+    def __init__(self, ruta=None, timeout=None):
+        """
+        Args:
+            ruta (str): Ruta del socket (por defecto, ruta_socket_por_defecto())
+            timeout (float): Segundos de espera por operación de red (None = sin límite)
+        """
+        _verificar_soporte()
+        self.ruta = ruta or ruta_socket_por_defecto()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(self.ruta)
+        self._lector = self._socket.makefile("rb")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        """Cierra la conexión."""
+        self._lector.close()
+        self._socket.close()
+    
+    def enviar_lineas(self, lineas):
+        """
+        Envía peticiones ya codificadas (una por línea) y devuelve sus respuestas.
+        
+        Las peticiones se envían en ventanas de VENTANA_CLIENTE sin esperar
+        cada respuesta, y las respuestas se leen en el mismo orden.
+        
+        Args:
+            lineas (iterable): Peticiones JSON (str, sin salto de línea)
+        
+        Yields:
+            str: Respuesta JSON de cada petición, en orden
+        """
+        ventana = []
+        for linea in lineas:
+            ventana.append(linea)
+            if len(ventana) >= VENTANA_CLIENTE:
+                yield from self._intercambiar(ventana)
+                ventana = []
+        if ventana:
+            yield from self._intercambiar(ventana)
+    
+    def _intercambiar(self, lineas):
+        self._socket.sendall("".join(linea + "\n" for linea in lineas).encode("utf-8"))
+        for _ in lineas:
+            respuesta = self._lector.readline()
+            if not respuesta:
+                raise ConnectionError("El demonio cerró la conexión")
+            yield respuesta.decode("utf-8").rstrip("\n")
+    
+    def canalizar(self, entrada, salida):
+        """
+        Reenvía peticiones NDJSON de un flujo a otro a medida que llegan.
+        
+        Cada línea se envía apenas se lee y un hilo escribe las respuestas a
+        medida que el demonio las devuelve, así que sirve tanto para archivos
+        como para un coproceso que envía una petición y espera su respuesta.
+        
+        Args:
+            entrada (file): Flujo de peticiones (una por línea)
+            salida (file): Flujo donde escribir las respuestas
+            
+        Returns:
+            int: Cantidad de respuestas con error
+        """
+        import threading
+        
+        errores = 0
+        
+        def escribir_respuestas():
+            nonlocal errores
+            for respuesta in self._lector:
+                datos = json.loads(respuesta)
+                errores += any(not r.get("ok") for r in (datos if isinstance(datos, list) else [datos]))
+                salida.write(respuesta.decode("utf-8"))
+                salida.flush()
+        
+        hilo = threading.Thread(target=escribir_respuestas, daemon=True)
+        hilo.start()
+        for linea in entrada:
+            if linea.strip():
+                self._socket.sendall(linea.strip().encode("utf-8") + b"\n")
+        self._socket.shutdown(socket.SHUT_WR)
+        hilo.join()
+        return errores
+    
+    def enviar_muchos(self, peticiones):
+        """
+        Envía varias peticiones en pipeline.
+        
+        Args:
+            peticiones (iterable): Peticiones (dict)
+            
+        Returns:
+            list: Respuestas (dict), en el mismo orden
+        """
+        lineas = (json.dumps(p, ensure_ascii=False) for p in peticiones)
+        return [json.loads(r) for r in self.enviar_lineas(lineas)]
+    
+    def enviar(self, peticion):
+        """
+        Envía una petición y espera su respuesta.
+        
+        Args:
+            peticion (dict/list): Petición o lista de peticiones
+            
+        Returns:
+            dict/list: Respuesta
+        """
+        return self.enviar_muchos([peticion])[0]
+
+
+def main(argv=None):
+    """Punto de entrada del demonio y de su cliente."""
+    parser = argparse.ArgumentParser(description="Demonio local de CalcTime")
+    parser.add_argument("--socket", help="ruta del socket Unix (por defecto $CALCTIME_SOCKET)")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    subcomandos.add_parser("servir", help="inicia el demonio")
+    cliente = subcomandos.add_parser("cliente", help="envía peticiones al demonio")
+    cliente.add_argument("expresiones", nargs="*",
+                         help="expresiones a evaluar; sin expresiones, lee peticiones NDJSON de stdin")
+    args = parser.parse_args(argv)
+    
+    if args.comando == "servir":
+        try:
+            servir(args.socket)
+        except OSError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        return 0
+    
+    errores = 0
+    try:
+        with Cliente(args.socket) as conexion:
+            if args.expresiones:
+                peticiones = [{"op": "evaluar", "expr": e} for e in args.expresiones]
+                for respuesta in conexion.enviar_muchos(peticiones):
+                    if respuesta["ok"]:
+                        resultado = respuesta["resultado"]
+                        print(resultado["texto"] if isinstance(resultado, dict) else resultado)
+                    else:
+                        errores += 1
+                        print(f"ERROR: {respuesta['error']}")
+            else:
+                errores = conexion.canalizar(sys.stdin, sys.stdout)
+    except OSError as e:
+        print(f"❌ No se pudo conectar con el demonio: {e}", file=sys.stderr)
+        return 2
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""
+Lenguaje de expresiones de duración para CalcTime
+==================================================
+Permite escribir operaciones con tiempos en una sola línea, por ejemplo
+"2y 5m 10d + 1y 3m - 36h" o "(3d 4h) * 2.5". Cada expresión se analiza
+a un árbol sintáctico (AST), se compila a una clausura de evaluación y se
+guarda en una caché LRU indexada por el texto de la expresión, de modo que
+las plantillas repetidas no se vuelven a analizar.
+
+Unidades (sin distinguir mayúsculas): y/a/año/años, m/mes/meses,
+d/dia/día/dias/días, h/hora/horas, min/minuto/minutos.
+Las expresiones pueden usar variables por nombre (por ejemplo "turno * 5"),
+cuyos valores se pasan al evaluar.
+"""
+
+import operator
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from calctime import Tiempo
+
+
+class ErrorExpresion(ValueError):
+    """Error de sintaxis o de evaluación en una expresión de duración."""
+
+
+# Nodos del árbol sintáctico
+Literal = namedtuple("Literal", ["valor"])
+Variable = namedtuple("Variable", ["nombre"])
+Unario = namedtuple("Unario", ["operador", "operando"])
+Binario = namedtuple("Binario", ["operador", "izquierda", "derecha"])
+
+UNIDADES = {
+    "y": "años", "a": "años", "año": "años", "años": "años",
+    "m": "meses", "mes": "meses", "meses": "meses",
+    "d": "dias", "dia": "dias", "día": "dias", "dias": "dias", "días": "dias",
+    "h": "horas", "hora": "horas", "horas": "horas",
+    "min": "minutos", "minuto": "minutos", "minutos": "minutos",
+}
+
+OPERACIONES = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<numero>\d+(?:\.\d*)?|\.\d+)(?P<unidad>[^\W\d_]+)?
+      | (?P<nombre>[^\W\d]\w*)
+      | (?P<simbolo>[-+*/×÷()])
+      | (?P<invalido>\S)
+    )""", re.VERBOSE)
+
+_SIMBOLOS = {"×": "*", "÷": "/"}
+
+
+def _tokenizar(texto):
+    """
+    Divide una expresión en tokens.
+    
+    Args:
+        texto (str): Expresión a dividir
+        
+    Returns:
+        list: Tuplas (tipo, valor, posición); el último token es ("fin", None, n)
+    """
+    tokens = []
+    for m in _TOKEN.finditer(texto):
+        posicion = m.end() - len(m.group().lstrip())
+        if m.group("numero") is not None:
+            numero = m.group("numero")
+            valor = float(numero) if "." in numero else int(numero)
+            unidad = m.group("unidad")
+            if unidad is None:
+                tokens.append(("numero", valor, posicion))
+            elif unidad.lower() in UNIDADES:
+                tokens.append(("duracion", Tiempo(**{UNIDADES[unidad.lower()]: valor}), posicion))
+            else:
+                raise ErrorExpresion(f"unidad '{unidad}' desconocida en la posición {posicion}")
+        elif m.group("nombre") is not None:
+            tokens.append(("nombre", m.group("nombre"), posicion))
+        elif m.group("simbolo") is not None:
+            simbolo = m.group("simbolo")
+            tokens.append((_SIMBOLOS.get(simbolo, simbolo), None, posicion))
+        elif m.group("invalido") is not None:
+            raise ErrorExpresion(f"carácter '{m.group('invalido')}' inesperado en la posición {posicion}")
+    tokens.append(("fin", None, len(texto)))
+    return tokens
+
+
+class _Parser:
+    """Analizador descendente recursivo de expresiones de duración."""
+    
+    def __init__(self, texto):
+        self.tokens = _tokenizar(texto)
+        self.indice = 0
+    
+    def _actual(self):
+        return self.tokens[self.indice]
+    
+    def _avanzar(self):
+        token = self.tokens[self.indice]
+        self.indice += 1
+        return token
+    
+    def analizar(self):
+        if self._actual()[0] == "fin":
+            raise ErrorExpresion("la expresión está vacía")
+        nodo = self._expresion()
+        tipo, _, posicion = self._actual()
+        if tipo != "fin":
+            raise ErrorExpresion(f"token inesperado en la posición {posicion}")
+        return nodo
+    
+    def _expresion(self):
+        # expresion := termino (("+" | "-") termino)*
+        nodo = self._termino()
+        while self._actual()[0] in ("+", "-"):
+            operador = self._avanzar()[0]
+            nodo = Binario(operador, nodo, self._termino())
+        return nodo
+    
+    def _termino(self):
+        # termino := unario (("*" | "/") unario)*
+        nodo = self._unario()
+        while self._actual()[0] in ("*", "/"):
+            operador = self._avanzar()[0]
+            nodo = Binario(operador, nodo, self._unario())
+        return nodo
+    
+    def _unario(self):
+        # unario := ("+" | "-") unario | primario
+        if self._actual()[0] in ("+", "-"):
+            operador = self._avanzar()[0]
+            operando = self._unario()
+            return operando if operador == "+" else Unario("-", operando)
+        return self._primario()
+    
+    def _primario(self):
+        # primario := duracion+ | numero | nombre | "(" expresion ")"
+        tipo, valor, posicion = self._avanzar()
+        if tipo == "duracion":
+            # Las duraciones yuxtapuestas se suman: "2y 5m 10d"
+            while self._actual()[0] == "duracion":
+                valor = valor + self._avanzar()[1]
+            return Literal(valor)
+        if tipo == "numero":
+            return Literal(valor)
+        if tipo == "nombre":
+            return Variable(valor)
+        if tipo == "(":
+            nodo = self._expresion()
+            if self._avanzar()[0] != ")":
+                raise ErrorExpresion(f"falta ')' para el '(' de la posición {posicion}")
+            return nodo
+        if tipo == "fin":
+            raise ErrorExpresion("la expresión termina de forma inesperada")
+        raise ErrorExpresion(f"token inesperado en la posición {posicion}")
+
+
+def parsear(texto):
+    """
+    Analiza una expresión de duración y devuelve su árbol sintáctico.
+    
+    Args:
+        texto (str): Expresión, por ejemplo "2y 5m 10d + 1y 3m - 36h"
+        
+    Returns:
+        Literal/Variable/Unario/Binario: Nodo raíz del AST
+        
+    Raises:
+        ErrorExpresion: Si la expresión no es válida
+    """
+    return _Parser(texto).analizar()
+
+
+def _aplicar(operador, izquierda, derecha):
+    """Aplica un operador binario traduciendo los errores de tipo."""
+    try:
+        return OPERACIONES[operador](izquierda, derecha)
+    except TypeError:
+        raise ErrorExpresion(
+            f"operación no válida: {type(izquierda).__name__} {operador} {type(derecha).__name__}"
+        ) from None
+
+
+def _negar(valor):
+    """Cambia el signo de un tiempo o de un número."""
+    return valor * -1 if isinstance(valor, Tiempo) else -valor
+
+
+def _compilar_nodo(nodo, variables):
+    """
+    Compila un nodo del AST a una clausura `f(valores) -> resultado`.
+    
+    Los subárboles sin variables se evalúan una sola vez al compilar
+    (plegado de constantes) y se devuelven como Literal.
+    
+    Args:
+        nodo: Nodo del AST
+        variables (set): Conjunto donde se registran las variables usadas
+        
+    Returns:
+        Literal/function: Valor constante o clausura de evaluación
+    """
+    if isinstance(nodo, Literal):
+        return nodo
+    
+    if isinstance(nodo, Variable):
+        nombre = nodo.nombre
+        variables.add(nombre)
+        
+        def leer_variable(valores):
+            try:
+                return valores[nombre]
+            except (KeyError, TypeError):
+                raise ErrorExpresion(f"variable '{nombre}' no definida") from None
+        return leer_variable
+    
+    if isinstance(nodo, Unario):
+        operando = _compilar_nodo(nodo.operando, variables)
+        if isinstance(operando, Literal):
+            return Literal(_negar(operando.valor))
+        return lambda valores: _negar(operando(valores))
+    
+    izquierda = _compilar_nodo(nodo.izquierda, variables)
+    derecha = _compilar_nodo(nodo.derecha, variables)
+    operador = nodo.operador
+    if isinstance(izquierda, Literal) and isinstance(derecha, Literal):
+        try:
+            return Literal(_aplicar(operador, izquierda.valor, derecha.valor))
+        except ErrorExpresion:
+            raise
+        except (ValueError, ArithmeticError):
+            # División por cero, desborde o tiempo no finito: se deja que el
+            # error ocurra al evaluar, como en Tiempo
+            izquierda, derecha = izquierda.valor, derecha.valor
+            return lambda valores: _aplicar(operador, izquierda, derecha)
+    if isinstance(derecha, Literal):
+        constante = derecha.valor
+        return lambda valores: _aplicar(operador, izquierda(valores), constante)
+    if isinstance(izquierda, Literal):
+        constante = izquierda.valor
+        return lambda valores: _aplicar(operador, constante, derecha(valores))
+    return lambda valores: _aplicar(operador, izquierda(valores), derecha(valores))
+
+
+class ExpresionCompilada:
+    """
+    Expresión de duración lista para evaluarse repetidamente.
+    
+    Attributes:
+        texto (str): Texto original de la expresión
+        ast: Árbol sintáctico de la expresión
+        variables (frozenset): Nombres de las variables que usa
+    """
+    
+    __slots__ = ("texto", "ast", "variables", "_evaluar")
+    
+    def __init__(self, texto):
+        self.texto = texto
+        self.ast = parsear(texto)
+        variables = set()
+        compilado = _compilar_nodo(self.ast, variables)
+        self.variables = frozenset(variables)
+        if isinstance(compilado, Literal) and isinstance(compilado.valor, Tiempo):
+            # compilar() guarda la expresión en caché: cada evaluación devuelve
+            # un Tiempo nuevo para que modificar un resultado no altere los siguientes
+            ticks, desde_ticks = compilado.valor._ticks, type(compilado.valor)._desde_ticks
+            self._evaluar = lambda valores: desde_ticks(ticks)
+        elif isinstance(compilado, Literal):
+            constante = compilado.valor
+            self._evaluar = lambda valores: constante
+        else:
+            self._evaluar = compilado
+    
+    def __call__(self, valores=None):
+        """
+        Evalúa la expresión.
+        
+        Args:
+            valores (dict): Valores (Tiempo o número) de las variables
+            
+        Returns:
+            Tiempo/float: Resultado de la expresión
+            
+        Raises:
+            ErrorExpresion: Si falta una variable o la operación no es válida
+            ZeroDivisionError: Si se divide por cero
+        """
+        return self._evaluar(valores)
+    
+    def __repr__(self):
+        return f"ExpresionCompilada({self.texto!r})"
+
+
+@lru_cache(maxsize=1024)
+def compilar(texto):
+    """
+    Compila una expresión, reutilizando la versión en caché si ya se compiló.
+    
+    Args:
+        texto (str): Expresión de duración
+        
+    Returns:
+        ExpresionCompilada: Expresión lista para evaluar
+        
+    Raises:
+        ErrorExpresion: Si la expresión no es válida
+    """
+    return ExpresionCompilada(texto)
+
+
+def evaluar(texto, valores=None):
+    """
+    Evalúa una expresión de duración usando la caché de expresiones compiladas.
+    
+    Args:
+        texto (str): Expresión de duración
+        valores (dict): Valores (Tiempo o número) de las variables
+        
+    Returns:
+        Tiempo/float: Resultado de la expresión
+    """
+    return compilar(texto)(valores)
@@ -1,64 +1,3 @@
-/**
- * Lógica de Tiempo para CalcTime GUI
- * Almacena el tiempo internamente en MINUTOS para mayor precisión.
- */
-class Tiempo {
-    static MINUTOS_POR_HORA = 60;
-    static HORAS_POR_DIA = 24;
-    static DIAS_POR_MES = 30;
-    static MESES_POR_AÑO = 12;
-
-    static MINUTOS_POR_DIA = Tiempo.MINUTOS_POR_HORA * Tiempo.HORAS_POR_DIA; // 1440
-    static MINUTOS_POR_MES = Tiempo.MINUTOS_POR_DIA * Tiempo.DIAS_POR_MES; // 43200
-    static MINUTOS_POR_AÑO = Tiempo.MINUTOS_POR_MES * Tiempo.MESES_POR_AÑO; // 518400
-
-    constructor(años = 0, meses = 0, dias = 0, horas = 0, minutos = 0) {
-        this.totalMinutos = (años * Tiempo.MINUTOS_POR_AÑO) +
-                            (meses * Tiempo.MINUTOS_POR_MES) +
-                            (dias * Tiempo.MINUTOS_POR_DIA) +
-                            (horas * Tiempo.MINUTOS_POR_HORA) +
-                            minutos;
-    }
-
-    obtenerComponentes() {
-        let mins = Math.abs(this.totalMinutos);
-        const signo = this.totalMinutos < 0 ? -1 : 1;
-
-        const años = Math.floor(mins / Tiempo.MINUTOS_POR_AÑO);
-        mins %= Tiempo.MINUTOS_POR_AÑO;
-
-        const meses = Math.floor(mins / Tiempo.MINUTOS_POR_MES);
-        mins %= Tiempo.MINUTOS_POR_MES;
-
-        const dias = Math.floor(mins / Tiempo.MINUTOS_POR_DIA);
-        mins %= Tiempo.MINUTOS_POR_DIA;
-
-        const horas = Math.floor(mins / Tiempo.MINUTOS_POR_HORA);
-        const minutos = mins % Tiempo.MINUTOS_POR_HORA;
-
-        return {
-            años: años * signo,
-            meses: meses * signo,
-            dias: dias * signo,
-            horas: horas * signo,
-            minutos: minutos * signo
-        };
-    }
-
-    toString() {
-        const comp = this.obtenerComponentes();
-        const partes = [];
-        
-        if (comp.años !== 0) partes.push(`${comp.años}a`);
-        if (comp.meses !== 0) partes.push(`${comp.meses}m`);
-        if (comp.dias !== 0) partes.push(`${comp.dias}d`);
-        if (comp.horas !== 0) partes.push(`${comp.horas}h`);
-        if (comp.minutos !== 0 || partes.length === 0) partes.push(`${comp.minutos}min`);
-
-        return partes.join(' ');
-    }
-}
-
 /**
  * Gestor de la Calculadora
  */
@@ -71,7 +10,15 @@ const Calculator = {
     
     // Estado interno para construir el objeto Tiempo actual
     tempValues: { años: 0, meses: 0, dias: 0, horas: 0, minutos: 0 },
-    history: [],
+    historyReady: null,
+    historyCursor: null,
+    historyDone: false,
+    historyLoading: false,
+    historyGeneration: 0,
+    historyWorker: null,
+    jobs: {},
+    nextJobId: 1,
+    HISTORY_PAGE: 50,
     settings: {
         darkMode: true,
         font: "'Inter', sans-serif"
@@ -85,19 +32,28 @@ const Calculator = {
         this.loadData();
         this.applySettings();
         this.addEventListeners();
-        this.renderHistory();
+        this.historyReady = this.openHistory();
+        this.historyReady.then(() => this.renderHistory());
     },
 
-    loadData() {
-        const savedHistory = localStorage.getItem('calcTime_history');
-        if (savedHistory) this.history = JSON.parse(savedHistory);
+    // El historial vive en IndexedDB (ver history_db.js); en memoria si no está disponible
+    async openHistory() {
+        try {
+            const store = await HistoryStore.open();
+            await store.migrateLegacy(localStorage);
+            return store;
+        } catch (err) {
+            console.warn('Historial sin persistencia:', err);
+            return new MemoryHistoryStore();
+        }
+    },
 
+    loadData() {
         const savedSettings = localStorage.getItem('calcTime_settings');
         if (savedSettings) this.settings = JSON.parse(savedSettings);
     },
 
     saveData() {
-        localStorage.setItem('calcTime_history', JSON.stringify(this.history));
         localStorage.setItem('calcTime_settings', JSON.stringify(this.settings));
     },
 
@@ -139,15 +95,21 @@ const Calculator = {
         };
 
         // Acciones de Historial
-        document.getElementById('clear-history').onclick = () => {
+        document.getElementById('clear-history').onclick = async () => {
             if (confirm('¿Vaciar todo el historial?')) {
-                this.history = [];
+                await (await this.historyReady).clear();
                 this.renderHistory();
-                this.saveData();
             }
         };
 
         document.getElementById('export-btn').onclick = () => this.exportHistory();
+        document.getElementById('recompute-btn').onclick = () => this.recomputeHistory();
+
+        // Paginación: la siguiente página se lee al acercarse al final de la lista
+        this.historyList.addEventListener('scroll', () => {
+            const list = this.historyList;
+            if (list.scrollTop + list.clientHeight >= list.scrollHeight - 200) this.loadMoreHistory();
+        });
 
         // Soporte de teclado básico
         document.addEventListener('keydown', (e) => {
@@ -221,11 +183,13 @@ const Calculator = {
                     this.tempValues.horas, this.tempValues.minutos
                 );
                 if (this.lastResult && this.operator) {
-                    const prevStr = this.lastResult.toString();
+                    const leftMinutes = this.lastResult.totalMinutos;
+                    const operand = ['+', '-'].includes(this.operator)
+                        ? finalT.totalMinutos
+                        : parseFloat(this.currentValue) || 1;
                     this.calculateIntermediate(finalT);
-                    const resultStr = this.lastResult.toString();
                     
-                    this.addToHistory(`${prevStr} ${this.operator} ${finalT.toString()} = ${resultStr}`);
+                    this.addToHistory(leftMinutes, this.operator, operand);
                     
                     this.expression = '';
                     this.operator = null;
@@ -274,29 +238,129 @@ const Calculator = {
         this.currentValue = '0';
     },
 
-    addToHistory(entry) {
-        const timestamp = new Date().toLocaleString();
-        this.history.unshift({ entry, timestamp });
-        if (this.history.length > 50) this.history.pop();
-        this.renderHistory();
-        this.saveData();
+    // Cada cálculo se agrega como un registro propio; no se reescribe el historial
+    async addToHistory(leftMinutes, operator, operand) {
+        const { resultMinutes, text } = HistoryJobs.describe(leftMinutes, operator, operand);
+        const item = {
+            entry: text, timestamp: new Date().toLocaleString(),
+            leftMinutes, operator, operand, resultMinutes
+        };
+        item.id = await (await this.historyReady).append(item);
+        if (!this.historyList.querySelector('.history-item')) this.historyList.innerHTML = '';
+        this.historyList.prepend(this.historyItemNode(item));
+    },
+
+    historyItemNode(item) {
+        const node = document.createElement('div');
+        node.className = 'history-item';
+        const timestamp = document.createElement('div');
+        timestamp.style.cssText = 'font-size:0.7rem; color:var(--text-secondary); margin-bottom:5px;';
+        timestamp.textContent = item.timestamp;
+        const entry = document.createElement('div');
+        entry.textContent = item.entry;
+        node.append(timestamp, entry);
+        return node;
     },
 
     renderHistory() {
-        this.historyList.innerHTML = this.history.length === 0 
-            ? '<p style="text-align:center; opacity:0.5; margin-top:20px;">No hay historial</p>'
-            : this.history.map(item => `
-                <div class="history-item">
-                    <div style="font-size:0.7rem; color:var(--text-secondary); margin-bottom:5px;">${item.timestamp}</div>
-                    <div>${item.entry}</div>
-                </div>
-            `).join('');
+        this.historyList.innerHTML = '';
+        this.historyGeneration++;
+        this.historyCursor = null;
+        this.historyDone = false;
+        this.historyLoading = false;
+        return this.loadMoreHistory();
+    },
+
+    // Lee la siguiente página (más antigua) con un cursor y la agrega al final de la lista
+    async loadMoreHistory() {
+        if (this.historyLoading || this.historyDone) return;
+        this.historyLoading = true;
+        const generation = this.historyGeneration;
+        const cursor = this.historyCursor;
+        const items = await (await this.historyReady).page(cursor, this.HISTORY_PAGE);
+        // Si la lista se reinició mientras se leía, esta página ya no corresponde
+        if (generation !== this.historyGeneration) return;
+        this.historyLoading = false;
+        this.historyDone = items.length < this.HISTORY_PAGE;
+        if (items.length) this.historyCursor = items[items.length - 1].id;
+        if (cursor === null && items.length === 0) {
+            this.historyList.innerHTML = '<p style="text-align:center; opacity:0.5; margin-top:20px;">No hay historial</p>';
+            return;
+        }
+        this.historyList.append(...items.map(item => this.historyItemNode(item)));
+    },
+
+    /**
+     * Ejecuta un trabajo masivo de HistoryJobs en el Web Worker. Sin Worker
+     * (por ejemplo, al abrir la página como file:// en Chrome) o sin
+     * IndexedDB, se ejecuta en la página por lotes.
+     */
+    async runJob(job, onProgress) {
+        const store = await this.historyReady;
+        if (!(store instanceof HistoryStore) || !this.getWorker()) return HistoryJobs[job](store, onProgress);
+        return new Promise((resolve, reject) => {
+            const id = this.nextJobId++;
+            this.jobs[id] = { job, resolve, reject, onProgress };
+            this.historyWorker.postMessage({ id, job });
+        });
+    },
+
+    getWorker() {
+        if (this.historyWorker === null) {
+            try {
+                this.historyWorker = new Worker('history_worker.js');
+                this.historyWorker.onmessage = (e) => this.onJobMessage(e.data);
+                this.historyWorker.onerror = (e) => this.onWorkerError(e);
+            } catch (err) {
+                console.warn('Web Worker no disponible:', err);
+                this.historyWorker = false;
+            }
+        }
+        return this.historyWorker || null;
     },
 
-    exportHistory() {
-        if (this.history.length === 0) return alert('No hay historial para exportar');
+    onJobMessage({ id, progress, result, error }) {
+        const pending = this.jobs[id];
+        if (!pending) return;
+        if (progress !== undefined) {
+            if (pending.onProgress) pending.onProgress(progress);
+            return;
+        }
+        delete this.jobs[id];
+        if (error !== undefined) pending.reject(new Error(error));
+        else pending.resolve(result);
+    },
+
+    // Si el Worker no pudo cargarse, los trabajos pendientes se ejecutan en la página
+    async onWorkerError(e) {
+        e.preventDefault();
+        console.warn('Error en el Web Worker del historial:', e.message);
+        this.historyWorker.terminate();
+        this.historyWorker = false;
+        const store = await this.historyReady;
+        Object.entries(this.jobs).forEach(([id, pending]) => {
+            delete this.jobs[id];
+            HistoryJobs[pending.job](store, pending.onProgress).then(pending.resolve, pending.reject);
+        });
+    },
+
+    // Muestra el progreso de un trabajo en el texto de su botón mientras corre
+    async withProgress(buttonId, job) {
+        const button = document.getElementById(buttonId);
+        const label = button.textContent;
+        button.disabled = true;
+        try {
+            return await this.runJob(job, done => { button.textContent = `${done}…`; });
+        } finally {
+            button.textContent = label;
+            button.disabled = false;
+        }
+    },
+
+    async exportHistory() {
+        if (await (await this.historyReady).count() === 0) return alert('No hay historial para exportar');
         
-        const content = this.history.map(h => `[${h.timestamp}] ${h.entry}`).join('\n');
+        const content = await this.withProgress('export-btn', 'export');
         const blob = new Blob([content], { type: 'text/plain' });
         const url = URL.createObjectURL(blob);
         const a = document.createElement('a');
@@ -308,6 +372,11 @@ const Calculator = {
         URL.revokeObjectURL(url);
     },
 
+    async recomputeHistory() {
+        const { updated } = await this.withProgress('recompute-btn', 'recompute');
+        if (updated) this.renderHistory();
+    },
+
     updateDisplay(showResult = false) {
         this.exprView.textContent = this.expression;
         if (showResult && this.lastResult) {
@@ -0,0 +1,226 @@
+/**
+ * Historial de CalcTime en IndexedDB
+ * Cada cálculo se guarda como un registro propio (sin reescribir todo el
+ * historial) y las lecturas se paginan con cursores, del más reciente al
+ * más antiguo. Lo comparten la página y el Web Worker (history_worker.js).
+ *
+ * Cada entrada tiene "entry" (texto) y "timestamp", más los campos
+ * estructurados leftMinutes, operator, operand y resultMinutes con los que
+ * se puede recalcular.
+ */
+class HistoryStore {
+    static DB_NAME = 'calcTime';
+    static STORE = 'history';
+    static VERSION = 1;
+    static LEGACY_KEY = 'calcTime_history';
+
+    constructor(db) {
+        this.db = db;
+    }
+
+    /**
+     * Abre (o crea) la base de datos del historial.
+     * @returns {Promise<HistoryStore>}
+     */
+    static open() {
+        return new Promise((resolve, reject) => {
+            if (typeof indexedDB === 'undefined') return reject(new Error('IndexedDB no disponible'));
+            const req = indexedDB.open(HistoryStore.DB_NAME, HistoryStore.VERSION);
+            req.onupgradeneeded = () => {
+                req.result.createObjectStore(HistoryStore.STORE, { keyPath: 'id', autoIncrement: true });
+            };
+            req.onsuccess = () => resolve(new HistoryStore(req.result));
+            req.onerror = () => reject(req.error);
+            req.onblocked = () => reject(new Error('Base de datos bloqueada por otra pestaña'));
+        });
+    }
+
+    // Ejecuta fn(store) en una transacción y resuelve con su resultado al confirmarse
+    transaction(mode, fn) {
+        return new Promise((resolve, reject) => {
+            const tx = this.db.transaction(HistoryStore.STORE, mode);
+            let result;
+            const req = fn(tx.objectStore(HistoryStore.STORE));
+            if (req) req.onsuccess = () => { result = req.result; };
+            tx.oncomplete = () => resolve(result);
+            tx.onerror = () => reject(tx.error);
+            tx.onabort = () => reject(tx.error);
+        });
+    }
+
+    /**
+     * Agrega una entrada.
+     * @returns {Promise<number>} Id asignado
+     */
+    append(item) {
+        return this.transaction('readwrite', store => store.add(item));
+    }
+
+    /**
+     * Lee una página de entradas, de la más reciente a la más antigua.
+     * @param {number|null} before Id a partir del cual seguir (exclusivo); null = desde el principio
+     * @param {number} limit Cantidad máxima de entradas
+     * @returns {Promise<Array>} Entradas con su "id"
+     */
+    page(before = null, limit = 50) {
+        const items = [];
+        return this.transaction('readonly', store => {
+            const range = before === null ? null : IDBKeyRange.upperBound(before, true);
+            const req = store.openCursor(range, 'prev');
+            req.onsuccess = () => {
+                const cursor = req.result;
+                if (!cursor) return;
+                items.push(cursor.value);
+                if (items.length < limit) cursor.continue();
+            };
+        }).then(() => items);
+    }
+
+    /** Reemplaza entradas existentes (con su "id") en una sola transacción. */
+    putMany(items) {
+        return this.transaction('readwrite', store => { items.forEach(item => store.put(item)); });
+    }
+
+    count() {
+        return this.transaction('readonly', store => store.count());
+    }
+
+    clear() {
+        return this.transaction('readwrite', store => store.clear());
+    }
+
+    /**
+     * Importa una sola vez el historial antiguo de localStorage (arreglo JSON, más reciente primero).
+     * @returns {Promise<number>} Entradas importadas
+     */
+    async migrateLegacy(storage) {
+        const saved = storage.getItem(HistoryStore.LEGACY_KEY);
+        if (!saved) return 0;
+        let items = [];
+        try { items = JSON.parse(saved); } catch (e) { console.warn('Historial antiguo ilegible', e); }
+        // Del más antiguo al más reciente, para que los ids conserven el orden
+        await this.transaction('readwrite', store => { items.slice().reverse().forEach(item => store.add(item)); });
+        storage.removeItem(HistoryStore.LEGACY_KEY);
+        return items.length;
+    }
+}
+
+/**
+ * Historial en memoria con la misma interfaz, para navegadores sin IndexedDB.
+ */
+class MemoryHistoryStore {
+    constructor() {
+        this.items = [];
+        this.nextId = 1;
+    }
+
+    async append(item) {
+        this.items.push({ ...item, id: this.nextId });
+        return this.nextId++;
+    }
+
+    async page(before = null, limit = 50) {
+        const newest = this.items.slice().reverse();
+        const start = before === null ? 0 : newest.findIndex(item => item.id < before);
+        return start < 0 ? [] : newest.slice(start, start + limit);
+    }
+
+    async putMany(items) {
+        items.forEach(item => {
+            const i = this.items.findIndex(existing => existing.id === item.id);
+            if (i >= 0) this.items[i] = item;
+        });
+    }
+
+    async count() {
+        return this.items.length;
+    }
+
+    async clear() {
+        this.items = [];
+    }
+
+    async migrateLegacy() {
+        return 0;
+    }
+}
+
+/**
+ * Trabajos masivos sobre el historial. Recorren el historial por lotes (una
+ * transacción por lote) y se ejecutan en el Web Worker, o en la página si
+ * no hay Worker disponible.
+ */
+const HistoryJobs = {
+    BATCH: 500,
+
+    // Llama a fn(lote) con cada lote, del más reciente al más antiguo
+    async forEachBatch(store, fn, onProgress) {
+        let before = null;
+        let done = 0;
+        for (;;) {
+            const batch = await store.page(before, HistoryJobs.BATCH);
+            if (batch.length === 0) break;
+            await fn(batch);
+            done += batch.length;
+            if (onProgress) onProgress(done);
+            before = batch[batch.length - 1].id;
+        }
+        return done;
+    },
+
+    /**
+     * Genera el texto de exportación ("[fecha] entrada" por línea).
+     * @returns {Promise<string>}
+     */
+    async export(store, onProgress) {
+        const lines = [];
+        await HistoryJobs.forEachBatch(store, batch => {
+            batch.forEach(h => lines.push(`[${h.timestamp}] ${h.entry}`));
+        }, onProgress);
+        return lines.join('\n');
+    },
+
+    /**
+     * Recalcula resultado y texto de cada entrada a partir de sus operandos.
+     * Las entradas antiguas, sin campos estructurados, se dejan como están.
+     * @returns {Promise<{total: number, updated: number}>}
+     */
+    async recompute(store, onProgress) {
+        let updated = 0;
+        const total = await HistoryJobs.forEachBatch(store, async batch => {
+            const changed = [];
+            batch.forEach(h => {
+                if (h.leftMinutes === undefined) return;
+                const entry = HistoryJobs.describe(h.leftMinutes, h.operator, h.operand);
+                if (entry.resultMinutes !== h.resultMinutes || entry.text !== h.entry) {
+                    changed.push({ ...h, entry: entry.text, resultMinutes: entry.resultMinutes });
+                }
+            });
+            if (changed.length) await store.putMany(changed);
+            updated += changed.length;
+        }, onProgress);
+        return { total, updated };
+    },
+
+    /**
+     * Calcula una operación y su texto para el historial.
+     * @param {number} leftMinutes Operando izquierdo en minutos
+     * @param {string} operator Operador (+, -, ×, ÷)
+     * @param {number} operand Minutos (+, -) o escalar (×, ÷)
+     * @returns {{resultMinutes: number, text: string}}
+     */
+    describe(leftMinutes, operator, operand) {
+        const left = new Tiempo(0, 0, 0, 0, leftMinutes);
+        const result = new Tiempo(0, 0, 0, 0, leftMinutes);
+        let right;
+        if (operator === '+' || operator === '-') {
+            right = new Tiempo(0, 0, 0, 0, operand).toString();
+            result.totalMinutos += operator === '+' ? operand : -operand;
+        } else {
+            right = String(operand);
+            if (operator === '×') result.totalMinutos *= operand;
+            else if (operand !== 0) result.totalMinutos /= operand;
+        }
+        return { resultMinutes: result.totalMinutos, text: `${left} ${operator} ${right} = ${result}` };
+    }
+};
@@ -0,0 +1,24 @@
+/**
+ * Web Worker del historial de CalcTime
+ * Ejecuta los trabajos masivos (exportar, recalcular) fuera del hilo
+ * principal, para que la página siga respondiendo al teclado.
+ *
+ * Mensaje: { id, job }  ->  { id, progress } ... { id, result } | { id, error }
+ */
+importScripts('tiempo.js', 'history_db.js');
+
+const JOBS = ['export', 'recompute'];
+let storePromise = null;
+
+self.onmessage = async (e) => {
+    const { id, job } = e.data;
+    try {
+        if (!JOBS.includes(job)) throw new Error(`Trabajo desconocido: ${job}`);
+        storePromise = storePromise || HistoryStore.open();
+        const store = await storePromise;
+        const result = await HistoryJobs[job](store, done => self.postMessage({ id, progress: done }));
+        self.postMessage({ id, result });
+    } catch (err) {
+        self.postMessage({ id, error: String(err) });
+    }
+};
@@ -0,0 +1,60 @@
+/**
+ * Lógica de Tiempo para CalcTime GUI
+ * Almacena el tiempo internamente en MINUTOS para mayor precisión.
+ */
+class Tiempo {
+    static MINUTOS_POR_HORA = 60;
+    static HORAS_POR_DIA = 24;
+    static DIAS_POR_MES = 30;
+    static MESES_POR_AÑO = 12;
+
+    static MINUTOS_POR_DIA = Tiempo.MINUTOS_POR_HORA * Tiempo.HORAS_POR_DIA; // 1440
+    static MINUTOS_POR_MES = Tiempo.MINUTOS_POR_DIA * Tiempo.DIAS_POR_MES; // 43200
+    static MINUTOS_POR_AÑO = Tiempo.MINUTOS_POR_MES * Tiempo.MESES_POR_AÑO; // 518400
+
+    constructor(años = 0, meses = 0, dias = 0, horas = 0, minutos = 0) {
+        this.totalMinutos = (años * Tiempo.MINUTOS_POR_AÑO) +
+                            (meses * Tiempo.MINUTOS_POR_MES) +
+                            (dias * Tiempo.MINUTOS_POR_DIA) +
+                            (horas * Tiempo.MINUTOS_POR_HORA) +
+                            minutos;
+    }
+
+    obtenerComponentes() {
+        let mins = Math.abs(this.totalMinutos);
+        const signo = this.totalMinutos < 0 ? -1 : 1;
+
+        const años = Math.floor(mins / Tiempo.MINUTOS_POR_AÑO);
+        mins %= Tiempo.MINUTOS_POR_AÑO;
+
+        const meses = Math.floor(mins / Tiempo.MINUTOS_POR_MES);
+        mins %= Tiempo.MINUTOS_POR_MES;
+
+        const dias = Math.floor(mins / Tiempo.MINUTOS_POR_DIA);
+        mins %= Tiempo.MINUTOS_POR_DIA;
+
+        const horas = Math.floor(mins / Tiempo.MINUTOS_POR_HORA);
+        const minutos = mins % Tiempo.MINUTOS_POR_HORA;
+
+        return {
+            años: años * signo,
+            meses: meses * signo,
+            dias: dias * signo,
+            horas: horas * signo,
+            minutos: minutos * signo
+        };
+    }
+
+    toString() {
+        const comp = this.obtenerComponentes();
+        const partes = [];
+        
+        if (comp.años !== 0) partes.push(`${comp.años}a`);
+        if (comp.meses !== 0) partes.push(`${comp.meses}m`);
+        if (comp.dias !== 0) partes.push(`${comp.dias}d`);
+        if (comp.horas !== 0) partes.push(`${comp.horas}h`);
+        if (comp.minutos !== 0 || partes.length === 0) partes.push(`${comp.minutos}min`);
+
+        return partes.join(' ');
+    }
+}
@@ -0,0 +1,245 @@
+"""
+Portapapeles de la aplicación de escritorio.
+
+Copiar al portapapeles puede bloquear cientos de milisegundos (por ejemplo,
+al lanzar PowerShell), así que las copias se ejecutan en un hilo de trabajo
+y `Clipboard.copy` vuelve de inmediato. Hay varios backends con la misma
+interfaz (name, available, copy):
+
+- PyperclipBackend: la biblioteca pyperclip, si está instalada.
+- CommandBackend: una herramienta del sistema que lee el texto por stdin
+  (clip/PowerShell en Windows, pbcopy en macOS, wl-copy/xclip/xsel en Linux).
+- PageBackend: el portapapeles de Flet (último recurso).
+- StubBackend: guarda el texto en memoria, para pruebas y sistemas sin
+  portapapeles.
+
+El mejor backend disponible se detecta una sola vez (en el hilo de trabajo,
+en la primera copia) y se reutiliza. Si un backend falla, se descarta y la
+copia se reintenta con el siguiente.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PyperclipBackend:
+    """Backend basado en pyperclip."""
+    
+    name = "pyperclip"
+    
+    def available(self):
+        try:
+            import pyperclip  # noqa: F401
+        except ImportError:
+            return False
+        return True
+    
+    def copy(self, text):
+        import pyperclip
+        pyperclip.copy(text)
+
+
+class CommandBackend:
+    """Backend que envía el texto por stdin a una herramienta del sistema."""
+    
+    def __init__(self, name, argv, encoding="utf-8", platforms=None, env_var=None, timeout=5):
+        """
+        Args:
+            name (str): Nombre del backend
+            argv (list): Comando a ejecutar
+            encoding (str): Codificación del texto enviado por stdin
+            platforms (tuple): Prefijos de sys.platform donde aplica (None = todos)
+            env_var (str): Variable de entorno requerida (por ejemplo, WAYLAND_DISPLAY)
+            timeout (float): Segundos máximos de espera del comando
+        """
+        self.name = name
+        self.argv = argv
+        self.encoding = encoding
+        self.platforms = platforms
+        self.env_var = env_var
+        self.timeout = timeout
+    
+    def available(self):
+        if self.platforms and not sys.platform.startswith(self.platforms):
+            return False
+        if self.env_var and not os.environ.get(self.env_var):
+            return False
+        return shutil.which(self.argv[0]) is not None
+    
+    def copy(self, text):
+        subprocess.run(self.argv, input=text.encode(self.encoding), check=True, timeout=self.timeout,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class PageBackend:
+    """Backend basado en el portapapeles de la página de Flet."""
+    
+    name = "flet"
+    
+    def __init__(self, page):
+        self.page = page
+    
+    def available(self):
+        return self.page is not None
+    
+    def copy(self, text):
+        if hasattr(self.page, "set_clipboard"): self.page.set_clipboard(text)
+        else: self.page.clipboard = text
+
+
+class StubBackend:
+    """Backend en memoria: conserva lo copiado en `copied`."""
+    
+    name = "stub"
+    
+    def __init__(self):
+        self.copied = []
+    
+    def available(self):
+        return True
+    
+    def copy(self, text):
+        self.copied.append(text)
+    
+    @property
+    def text(self):
+        """str: Último texto copiado (None si no se copió nada)."""
+        return self.copied[-1] if self.copied else None
+
+
+def system_backends():
+    """
+    Backends de herramientas del sistema, en orden de preferencia.
+    
+    Returns:
+        list: Backends CommandBackend (sin comprobar disponibilidad)
+    """
+    return [
+        # clip.exe interpreta UTF-16 con BOM; PowerShell lee stdin sin interpolar el texto,
+        # en UTF-8 (por defecto usaría la página de códigos OEM de la consola)
+        CommandBackend("clip", ["clip"], encoding="utf-16", platforms=("win",)),
+        CommandBackend("powershell", ["powershell", "-NoProfile", "-Command",
+                                      "[Console]::InputEncoding = [Text.Encoding]::UTF8; "
+                                      "[Console]::In.ReadToEnd() | Set-Clipboard"], platforms=("win",)),
+        CommandBackend("pbcopy", ["pbcopy"], platforms=("darwin",)),
+        CommandBackend("wl-copy", ["wl-copy"], env_var="WAYLAND_DISPLAY"),
+        CommandBackend("xclip", ["xclip", "-selection", "clipboard"], env_var="DISPLAY"),
+        CommandBackend("xsel", ["xsel", "--clipboard", "--input"], env_var="DISPLAY"),
+    ]
+
+
+class Clipboard:
+    """Copia texto en un hilo de trabajo con el mejor backend disponible."""
+    
+    def __init__(self, backends):
+        """
+        Args:
+            backends (list): Backends candidatos, en orden de preferencia
+        """
+        self._candidates = list(backends)
+        self._backend = None
+        self._lock = threading.Lock()
+        self._executor = None
+    
+    @property
+    def backend(self):
+        """Backend elegido hasta ahora (None si todavía no se detectó)."""
+        return self._backend
+    
+    def detect(self):
+        """
+        Elige el primer backend disponible (solo la primera vez; luego usa el elegido).
+        
+        Returns:
+            Backend elegido, o None si no hay ninguno disponible
+        """
+        with self._lock:
+            while self._backend is None and self._candidates:
+                candidate = self._candidates.pop(0)
+                try:
+                    if candidate.available():
+                        self._backend = candidate
+                except Exception as e: print(f"Clipboard backend {candidate.name} unavailable: {e}")
+            return self._backend
+    
+    def _discard(self, backend):
+        with self._lock:
+            if self._backend is backend:
+                self._backend = None
+    
+    def copy_now(self, text):
+        """
+        Copia en el hilo actual, pasando al siguiente backend si el elegido falla.
+        
+        Args:
+            text (str): Texto a copiar
+            
+        Returns:
+            str: Nombre del backend usado, o None si ninguno funcionó
+        """
+        while True:
+            backend = self.detect()
+            if backend is None:
+                return None
+            try:
+                backend.copy(text)
+                return backend.name
+            except Exception as e:
+                print(f"Clipboard backend {backend.name} failed: {e}")
+                self._discard(backend)
+    
+    def copy(self, text, on_done=None):
+        """
+        Copia en segundo plano y vuelve de inmediato.
+        
+        Las copias se ejecutan de a una y en orden, así que el portapapeles
+        termina con el último texto pedido.
+        
+        Args:
+            text (str): Texto a copiar
+            on_done (callable): Se llama en el hilo de trabajo con el nombre del
+                backend usado (None si la copia falló)
+                
+        Returns:
+            concurrent.futures.Future: Resultado de copy_now
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clipboard")
+        
+        def run():
+            used = self.copy_now(text)
+            if on_done is not None:
+                on_done(used)
+            return used
+        
+        return self._executor.submit(run)
+    
+    def close(self):
+        """Espera las copias pendientes y detiene el hilo de trabajo."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def open_clipboard(page=None, backend=None):
+    """
+    Crea el portapapeles configurado para la aplicación.
+    
+    Args:
+        page (ft.Page): Página de Flet para el backend de último recurso (opcional)
+        backend (str): Nombre de un backend a usar primero ("stub" = solo en memoria)
+        
+    Returns:
+        Clipboard: Portapapeles sin detectar (la detección ocurre en la primera copia)
+    """
+    if backend == "stub":
+        return Clipboard([StubBackend()])
+    backends = [PyperclipBackend(), *system_backends(), PageBackend(page)]
+    backends.sort(key=lambda b: b.name != backend)
+    return Clipboard(backends)
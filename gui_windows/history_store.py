@@ -0,0 +1,408 @@
+"""
+Almacenamiento del historial de la aplicación de escritorio.
+
+Hay dos backends con la misma interfaz (load, count, page, append, clear):
+
+- JournalHistoryStore: diario de solo-anexado (JSON Lines). Cada cálculo
+  agrega una única línea, por lo que guardar cuesta O(1) sin importar el
+  tamaño del historial. Las líneas que ya no aportan al estado (por ejemplo,
+  las anteriores a un "Clear All") se eliminan con una compactación periódica
+  que corre en segundo plano y reemplaza el archivo de forma atómica.
+- SQLiteHistoryStore: base de datos SQLite con entradas estructuradas e
+  índices por fecha y operador; las consultas se paginan en la base de datos,
+  así que el arranque y la memoria no crecen con el historial.
+
+Cada entrada es un dict con "timestamp" (fecha y hora ISO) y "entry" (texto),
+más los campos estructurados opcionales "operator", "left_hours", "operand"
+y "result_hours".
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+ENTRY_FIELDS = ("timestamp", "entry", "operator", "left_hours", "operand", "result_hours")
+
+
+def _matches(item, operator=None, since=None, until=None):
+    # Filtros de rango comunes a los backends (timestamps ISO comparables como texto)
+    if operator is not None and item.get("operator") != operator:
+        return False
+    if since is not None and item["timestamp"] < since:
+        return False
+    if until is not None and item["timestamp"] >= until:
+        return False
+    return True
+
+
+class JournalHistoryStore:
+    """Historial persistido como diario de solo-anexado con compactación en segundo plano."""
+    
+    def __init__(self, path, legacy_path=None, compact_threshold=1000):
+        """
+        Args:
+            path (str): Ruta del diario (JSON Lines)
+            legacy_path (str): Ruta del antiguo history.txt a migrar (opcional)
+            compact_threshold (int): Líneas obsoletas que disparan una compactación
+        """
+        self.path = path
+        self.legacy_path = legacy_path
+        self.compact_threshold = compact_threshold
+        self._lock = threading.Lock()
+        self._compaction = None
+        self._items = []
+        self._live = 0
+        self._dead = 0
+    
+    # Lectura
+    
+    def load(self):
+        """
+        Carga el historial reproduciendo el diario.
+        
+        Si la última línea quedó incompleta (cierre inesperado durante una
+        escritura), se descarta y el archivo se trunca al último registro válido.
+        Si el último registro es válido pero le falta el salto de línea, se
+        agrega para que el siguiente append no quede en la misma línea.
+        
+        Returns:
+            int: Cantidad de entradas cargadas
+        """
+        with self._lock:
+            if not os.path.exists(self.path):
+                self._items = self._migrate_legacy()
+                return len(self._items)
+            
+            items, valid_end, dead, missing_newline = [], 0, 0, False
+            with open(self.path, "rb") as f:
+                for raw in f:
+                    record = self._parse(raw)
+                    if record is None:
+                        if not raw.endswith(b"\n"):
+                            break  # Escritura interrumpida: se trunca más abajo
+                        dead += 1
+                    elif record.get("op") == "clear":
+                        dead += len(items) + 1
+                        items = []
+                    else:
+                        items.append({k: record[k] for k in ENTRY_FIELDS if k in record})
+                    valid_end += len(raw)
+                    missing_newline = not raw.endswith(b"\n")
+            if valid_end < os.path.getsize(self.path) or missing_newline:
+                with open(self.path, "r+b") as f:
+                    f.truncate(valid_end)
+                    if missing_newline:
+                        f.seek(valid_end)
+                        f.write(b"\n")
+            
+            self._items, self._live, self._dead = items, len(items), dead
+        self._maybe_compact()
+        return len(items)
+    
+    def count(self, **filters):
+        """
+        Cuenta las entradas que cumplen los filtros.
+        
+        Args:
+            **filters: operator, since y until (ver page)
+            
+        Returns:
+            int: Cantidad de entradas
+        """
+        if not filters:
+            return len(self._items)
+        return sum(1 for item in self._items if _matches(item, **filters))
+    
+    def page(self, offset=0, limit=50, **filters):
+        """
+        Devuelve una página del historial, de la entrada más reciente a la más antigua.
+        
+        Args:
+            offset (int): Entradas a saltar
+            limit (int): Máximo de entradas a devolver (None = todas)
+            **filters: operator (str), since/until (timestamps ISO, rango [since, until))
+            
+        Returns:
+            list: Entradas de la página
+        """
+        result, skipped = [], 0
+        for item in reversed(self._items):
+            if filters and not _matches(item, **filters):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            if limit is not None and len(result) >= limit:
+                break
+            result.append(item)
+        return result
+    
+    @staticmethod
+    def _parse(raw):
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            return None
+        if not isinstance(record, dict):
+            return None
+        if record.get("op") != "clear" and not {"timestamp", "entry"} <= record.keys():
+            return None
+        return record
+    
+    def _migrate_legacy(self):
+        # Importa el history.txt anterior ("[HH:MM] entrada", más reciente primero)
+        items = []
+        if self.legacy_path and os.path.exists(self.legacy_path):
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if "]" in line:
+                        ts, entry = line.split("]", 1)
+                        items.append({"timestamp": ts[1:], "entry": entry.strip()})
+            items.reverse()
+            self._write_atomic([self._encode({"op": "add", **item}) for item in items])
+        self._live, self._dead = len(items), 0
+        return items
+    
+    # Escritura
+    
+    @staticmethod
+    def _encode(record):
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    
+    def _append_record(self, record):
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(self._encode(record))
+            if record["op"] == "clear":
+                self._dead += self._live + 1
+                self._live = 0
+                self._items = []
+            else:
+                self._live += 1
+                self._items.append({k: record[k] for k in ENTRY_FIELDS if k in record})
+    
+    def append(self, item):
+        """
+        Agrega una entrada al final del diario (una sola línea).
+        
+        Args:
+            item (dict): Entrada con "timestamp", "entry" y campos estructurados opcionales
+        """
+        self._append_record({"op": "add", **{k: item[k] for k in ENTRY_FIELDS if k in item}})
+    
+    def clear(self):
+        """Marca el historial como vacío y programa la compactación si corresponde."""
+        self._append_record({"op": "clear"})
+        self._maybe_compact()
+    
+    # Compactación
+    
+    def _maybe_compact(self):
+        if self._dead >= self.compact_threshold and self._compaction is None:
+            self._compaction = threading.Thread(target=self.compact, name="history-compaction")
+            self._compaction.start()
+    
+    def wait(self):
+        """Espera a que termine la compactación en curso, si la hay."""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+    
+    def compact(self):
+        """
+        Reescribe el diario dejando solo las entradas vigentes.
+        
+        El archivo se lee sin bloquear las escrituras; los registros agregados
+        mientras tanto se incorporan al final antes de reemplazar el archivo.
+        """
+        try:
+            with self._lock:
+                if not os.path.exists(self.path):
+                    return
+                snapshot_end = os.path.getsize(self.path)
+            
+            with open(self.path, "rb") as f:
+                records = self._live_records(f.read(snapshot_end), [])
+            
+            with self._lock:
+                with open(self.path, "rb") as f:
+                    f.seek(snapshot_end)
+                    records = self._live_records(f.read(), records)
+                self._write_atomic(records)
+                self._live, self._dead = len(records), 0
+        finally:
+            self._compaction = None
+    
+    def _live_records(self, data, records):
+        # Aplica las líneas de `data` sobre `records` y devuelve las vigentes
+        for raw in data.splitlines(keepends=True):
+            record = self._parse(raw)
+            if record is None:
+                continue
+            if record.get("op") == "clear":
+                records = []
+            else:
+                records.append(raw if raw.endswith(b"\n") else raw + b"\n")
+        return records
+    
+    def _write_atomic(self, chunks):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.writelines(chunks)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class SQLiteHistoryStore:
+    """Historial estructurado en SQLite con índices por fecha y operador."""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            entry TEXT NOT NULL,
+            operator TEXT,
+            left_hours REAL,
+            operand REAL,
+            result_hours REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_history_operator ON history (operator, timestamp);
+    """
+    
+    def __init__(self, path, import_from=None):
+        """
+        Args:
+            path (str): Ruta de la base de datos
+            import_from: Store con la interfaz común cuyas entradas se importan
+                si la base de datos es nueva (por ejemplo, el diario anterior)
+        """
+        self.path = path
+        self.import_from = import_from
+        self._lock = threading.Lock()
+        self._conn = None
+    
+    def load(self):
+        """
+        Abre la base de datos (creando el esquema si hace falta).
+        
+        No lee las entradas: las páginas se consultan bajo demanda con page().
+        
+        Returns:
+            int: Cantidad de entradas almacenadas
+        """
+        is_new = not os.path.exists(self.path)
+        with self._lock:
+            # Los eventos de la UI pueden llegar desde distintos hilos; el lock serializa el acceso
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+        if is_new and self.import_from is not None:
+            total = self.import_from.load()
+            self.import_items(reversed(self.import_from.page(0, total)))
+        return self.count()
+    
+    @staticmethod
+    def _where(operator=None, since=None, until=None):
+        clauses, params = [], []
+        if operator is not None:
+            clauses.append("operator = ?")
+            params.append(operator)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+    
+    def count(self, **filters):
+        """
+        Cuenta las entradas que cumplen los filtros.
+        
+        Args:
+            **filters: operator, since y until (ver page)
+            
+        Returns:
+            int: Cantidad de entradas
+        """
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM history" + where, params).fetchone()[0]
+    
+    def page(self, offset=0, limit=50, **filters):
+        """
+        Devuelve una página del historial, de la entrada más reciente a la más antigua.
+        
+        Args:
+            offset (int): Entradas a saltar
+            limit (int): Máximo de entradas a devolver (None = todas)
+            **filters: operator (str), since/until (timestamps ISO, rango [since, until))
+            
+        Returns:
+            list: Entradas de la página
+        """
+        where, params = self._where(**filters)
+        query = f"SELECT {', '.join(ENTRY_FIELDS)} FROM history{where} ORDER BY id DESC LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + [-1 if limit is None else limit, offset]).fetchall()
+        return [{k: v for k, v in zip(ENTRY_FIELDS, row) if v is not None} for row in rows]
+    
+    def append(self, item):
+        """
+        Inserta una entrada.
+        
+        Args:
+            item (dict): Entrada con "timestamp", "entry" y campos estructurados opcionales
+        """
+        self.import_items([item])
+    
+    def import_items(self, items):
+        """
+        Inserta varias entradas en una sola transacción (de la más antigua a la más reciente).
+        
+        Args:
+            items (iterable): Entradas a insertar
+        """
+        rows = ([item.get(k) for k in ENTRY_FIELDS] for item in items)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO history ({', '.join(ENTRY_FIELDS)}) VALUES ({', '.join('?' * len(ENTRY_FIELDS))})",
+                rows,
+            )
+    
+    def clear(self):
+        """Elimina todas las entradas."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history")
+    
+    def wait(self):
+        """Compatibilidad con JournalHistoryStore (SQLite no compacta en segundo plano)."""
+    
+    def close(self):
+        """Cierra la conexión con la base de datos."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def open_history_store(base_path, backend="journal"):
+    """
+    Crea el store de historial configurado para la aplicación.
+    
+    Args:
+        base_path (str): Carpeta de los archivos de datos
+        backend (str): "journal" (history.jsonl) o "sqlite" (history.db)
+        
+    Returns:
+        JournalHistoryStore/SQLiteHistoryStore: Store sin cargar
+    """
+    journal = JournalHistoryStore(os.path.join(base_path, "history.jsonl"),
+                                  legacy_path=os.path.join(base_path, "history.txt"))
+    if backend == "sqlite":
+        return SQLiteHistoryStore(os.path.join(base_path, "history.db"), import_from=journal)
+    return journal
@@ -0,0 +1,81 @@
+"""
+Ventana incremental del panel de historial.
+
+Mantiene solo las filas ya visitadas del historial: al abrir el panel se
+consulta la primera página y, al acercarse al final del scroll, la siguiente.
+Las filas (controles de la UI) se guardan en un pool y se reutilizan entre
+aperturas, de modo que abrir el panel cuesta lo mismo sin importar el tamaño
+del historial. No depende de Flet: la creación y el llenado de cada fila se
+inyectan desde la aplicación.
+"""
+
+
+class HistoryWindow:
+    """Paginación incremental sobre un store de historial con pool de filas reutilizables."""
+    
+    def __init__(self, store, make_row, bind_row, page_size=40, prefetch_px=300):
+        """
+        Args:
+            store: Store de historial (interfaz count/page de history_store)
+            make_row (callable): Crea una fila vacía, make_row() -> control
+            bind_row (callable): Llena una fila con una entrada, bind_row(control, item)
+            page_size (int): Entradas por página
+            prefetch_px (int): Distancia al final del scroll que dispara la siguiente página
+        """
+        self.store = store
+        self.make_row = make_row
+        self.bind_row = bind_row
+        self.page_size = page_size
+        self.prefetch_px = prefetch_px
+        self.pool = []
+        self.loaded = 0
+        self.exhausted = False
+    
+    def reset(self):
+        """
+        Vuelve a la primera página (al abrir el panel).
+        
+        Returns:
+            list: Filas visibles, ya llenadas con la primera página
+        """
+        self.loaded = 0
+        self.exhausted = False
+        return self.load_more()
+    
+    def load_more(self):
+        """
+        Agrega la siguiente página reutilizando filas del pool.
+        
+        Returns:
+            list: Filas nuevas a agregar al final de la lista (vacía si no hay más)
+        """
+        if self.exhausted:
+            return []
+        items = self.store.page(self.loaded, self.page_size)
+        if len(items) < self.page_size:
+            self.exhausted = True
+        
+        start = self.loaded
+        while len(self.pool) < start + len(items):
+            self.pool.append(self.make_row())
+        for row, item in zip(self.pool[start:], items):
+            self.bind_row(row, item)
+        self.loaded += len(items)
+        return self.pool[start:self.loaded]
+    
+    def visible_rows(self):
+        """list: Filas cargadas actualmente, en orden."""
+        return self.pool[:self.loaded]
+    
+    def needs_more(self, pixels, max_scroll_extent):
+        """
+        Indica si el scroll está lo bastante cerca del final para cargar otra página.
+        
+        Args:
+            pixels (float): Posición actual del scroll
+            max_scroll_extent (float): Posición máxima del scroll
+            
+        Returns:
+            bool: True si hay que llamar a load_more()
+        """
+        return not self.exhausted and pixels >= max_scroll_extent - self.prefetch_px
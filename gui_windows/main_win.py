@@ -1,20 +1,27 @@
-import flet as ft
-from flet import Colors, Icons, Alignment, FontWeight, MainAxisAlignment, CrossAxisAlignment, ThemeMode, TextAlign, Margin, Padding
-import json
 import os
-from datetime import datetime
 import sys
-try:
-    import pyperclip
-except ImportError:
-    pyperclip = None
+import threading
 
-# Añadir el directorio raíz al path para importar calctime
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# calctime y arranque están en la carpeta superior: solo se toca sys.path si
+# no son importables (por ejemplo, al ejecutar el script desde gui_windows/)
 try:
-    from calctime import Tiempo
+    import arranque
 except ImportError:
-    from calctime import Tiempo
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    import arranque
+if os.environ.get("CALCTIME_IMPORTTIME"):
+    arranque.activar()
+
+import flet as ft
+from flet import Colors, Icons, Alignment, FontWeight, MainAxisAlignment, CrossAxisAlignment, ThemeMode, TextAlign, Margin, Padding
+import json
+
+from calctime import Tiempo, formatear
+import instrumentacion
+from clipboard import open_clipboard
+from history_store import open_history_store
+from history_view import HistoryWindow
+from ui_scheduler import UpdateScheduler
 
 class CalcTimeWin:
     def __init__(self, page: ft.Page):
@@ -25,15 +32,18 @@ class CalcTimeWin:
         self.page.window.resizable = False
         
         # Rutas de persistencia (Misma carpeta que el script)
-        base_path = os.path.dirname(__file__)
-        self.config_path = os.path.join(base_path, "config.json")
-        self.history_path = os.path.join(base_path, "history.txt")
+        self.base_path = os.path.dirname(__file__)
+        self.config_path = os.path.join(self.base_path, "config.json")
+        self.history_store = None
         
         # Refs y Controles Directos
         self.result_ref = ft.Ref[ft.Text]()
         self.expr_ref = ft.Ref[ft.Text]()
-        self.history_list = ft.ListView(expand=True, spacing=8)
+        self.history_list = ft.ListView(expand=True, spacing=8, on_scroll=self.on_history_scroll)
         self.history_overlay = ft.Ref[ft.Container]()
+        self.history_empty = ft.Text("No history yet.", italic=True, opacity=0.5)
+        # Actualizaciones agrupadas: solo los controles modificados, como máximo una vez por frame
+        self.ui_scheduler = UpdateScheduler(lambda controls: self.page.update(*controls))
         
         # Estado
         self.current_value = "0"
@@ -41,35 +51,67 @@ class CalcTimeWin:
         self.last_result = None
         self.operator = None
         self.temp_values = {"años": 0, "meses": 0, "dias": 0, "horas": 0, "minutos": 0}
-        self.history = []
         self.settings = {"darkMode": True}
+        self.history_ready = threading.Event()
+        # Altas y borrados pedidos mientras el historial carga (None = borrar todo)
+        self.history_lock = threading.Lock()
+        self.pending_history = []
         
         self.load_data()
+        # Portapapeles: el backend se detecta una vez, en la primera copia y fuera del hilo de la UI
+        self.clipboard = open_clipboard(self.page, self.settings.get("clipboardBackend"))
+        # Panel de historial virtualizado: solo se construyen las filas visitadas y se reutilizan
+        self.history_window = HistoryWindow(self.history_store, self.make_history_row, self.bind_history_row)
         self.setup_ui()
         self.page.on_keyboard_event = self.on_keyboard
         self.page.update()
-
+        arranque.marcar("primer frame")
+        # El historial se lee después del primer frame, sin bloquear la ventana
+        threading.Thread(target=self.load_history, daemon=True).start()
+    
     def load_data(self):
         try:
             if os.path.exists(self.config_path):
                 with open(self.config_path, "r") as f: self.settings = json.load(f)
-            if os.path.exists(self.history_path):
-                with open(self.history_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if "]" in line:
-                            ts, entry = line.split("]", 1)
-                            self.history.append({"timestamp": ts[1:], "entry": entry.strip()})
-            print(f"Loaded {len(self.history)} history items from {self.history_path}")
         except Exception as e: print(f"Load error: {e}")
-
+        # Backend de historial: "journal" (history.jsonl) o "sqlite" (history.db)
+        self.history_store = open_history_store(self.base_path, self.settings.get("historyBackend", "journal"))
+    
+    def load_history(self):
+        try:
+            total = self.history_store.load()
+            print(f"Loaded {total} history items from {self.history_store.path}")
+        except Exception as e: print(f"Load error: {e}")
+        finally:
+            # Aplicar en orden lo que llegó durante la carga y recién entonces marcarlo listo
+            with self.history_lock:
+                for item in self.pending_history:
+                    try:
+                        if item is None: self.history_store.clear()
+                        else: self.history_store.append(item)
+                    except Exception as e: print(f"Save error: {e}")
+                self.pending_history.clear()
+                self.history_ready.set()
+        arranque.marcar("historial cargado")
+        # Si el panel se abrió mientras cargaba, reemplazar el aviso por las filas
+        if self.history_overlay.current and self.history_overlay.current.visible:
+            self.show_history(None)
+    
     def save_data(self):
+        # Solo la configuración; el historial se guarda entrada por entrada en su store
         try:
             with open(self.config_path, "w") as f: json.dump(self.settings, f)
-            with open(self.history_path, "w", encoding="utf-8") as f:
-                for h in self.history: f.write(f"[{h['timestamp']}] {h['entry']}\n")
-            print(f"Saved history to {self.history_path}")
         except Exception as e: print(f"Save error: {e}")
-
+    
+    def append_history(self, item):
+        # Sin esperar a la carga: si no terminó, la entrada queda en cola
+        with self.history_lock:
+            if not self.history_ready.is_set():
+                self.pending_history.append(item)
+                return
+        try: self.history_store.append(item)
+        except Exception as e: print(f"Save error: {e}")
+    
     def setup_ui(self):
         # Pantalla
         display = ft.Container(
@@ -80,14 +122,14 @@ class CalcTimeWin:
             padding=15, bgcolor=Colors.with_opacity(0.1, Colors.BLUE_GREY_900),
             border_radius=12, margin=Margin.only(bottom=15)
         )
-
+        
         # Acciones superiores
         top_bar = ft.Row([
             ft.IconButton(Icons.HISTORY_ROUNDED, on_click=self.show_history),
             ft.IconButton(Icons.SETTINGS_ROUNDED, on_click=self.show_settings),
             ft.Button("Copy", icon=Icons.COPY_ALL, on_click=self.copy_result)
         ], alignment=MainAxisAlignment.START)
-
+        
         # Teclado
         keypad = ft.GridView(expand=True, runs_count=4, max_extent=85, child_aspect_ratio=1.1, spacing=8)
         btns = [
@@ -103,10 +145,10 @@ class CalcTimeWin:
                 alignment=Alignment.CENTER, bgcolor=col if col else Colors.with_opacity(0.05, Colors.WHITE),
                 border_radius=10, ink=True, on_click=lambda e, t=text, p=tp: self.handle_input(p, t)
             ))
-
+        
         # Unidades
         units = ft.Row([self.make_unit_btn(u) for u in ["Y", "M", "D", "H", "Min"]], alignment=MainAxisAlignment.CENTER)
-
+        
         # Capa de Historial (Manual Overlay)
         history_panel = ft.Container(
             ref=self.history_overlay,
@@ -125,7 +167,7 @@ class CalcTimeWin:
             padding=20,
             border_radius=12
         )
-
+        
         # Main Stack
         self.page.add(
             ft.Stack([
@@ -133,17 +175,15 @@ class CalcTimeWin:
                 history_panel
             ], expand=True)
         )
-        self.page.update()
-
+    
     def make_unit_btn(self, label):
         return ft.Container(
             content=ft.Text(label, size=11, weight="bold"), padding=Padding.all(8),
             bgcolor=Colors.with_opacity(0.15, Colors.CYAN_700), border_radius=6,
             on_click=lambda e: self.handle_input("unit", label)
         )
-
+    
     def handle_input(self, tp, val):
-        print(f"Input: {tp} {val}")
         if tp == "digit":
             if val == "." and "." in self.current_value: return
             self.current_value = val if self.current_value == "0" else self.current_value + val
@@ -157,24 +197,28 @@ class CalcTimeWin:
             self.expression += f"{num}{val.lower()} "
             self.current_value = "0"
         elif tp == "op":
-            t = Tiempo(**{k:self.temp_values[k] for k in ["años","meses","dias","horas"]})
-            t._horas_totales += self.temp_values["minutos"]/60
+            t = Tiempo(**self.temp_values)
             if not self.last_result: self.last_result = t
             elif self.operator: self.calculate(t)
             self.operator, self.expression, self.current_value = val, self.expression + f" {val} ", "0"
             self.temp_values = {u:0 for u in self.temp_values}
         elif tp == "calc":
-            t = Tiempo(**{k:self.temp_values[k] for k in ["años","meses","dias","horas"]})
-            t._horas_totales += self.temp_values["minutos"]/60
+            t = Tiempo(**self.temp_values)
             if self.last_result and self.operator:
-                prev = str(self.last_result)
+                prev = self.last_result
+                operand = t._horas_totales if self.operator in ["+", "-"] else float(self.current_value or 1)
                 self.calculate(t)
-                self.history.insert(0, {"timestamp": datetime.now().strftime("%H:%M"), "entry": f"{prev} {self.operator} {str(t)} = {str(self.last_result)}"})
+                from datetime import datetime
+                self.append_history({
+                    "timestamp": datetime.now().isoformat(sep=" ", timespec="seconds"),
+                    "entry": f"{prev} {self.operator} {str(t)} = {str(self.last_result)}",
+                    "operator": self.operator, "left_hours": prev._horas_totales,
+                    "operand": operand, "result_hours": self.last_result._horas_totales,
+                })
                 self.expression, self.operator, self.current_value = "", None, "0"
                 self.temp_values = {u:0 for u in self.temp_values}
-                self.save_data()
         self.update_ui()
-
+    
     def calculate(self, t):
         if self.operator == "+": self.last_result += t
         elif self.operator == "-": self.last_result -= t
@@ -182,20 +226,23 @@ class CalcTimeWin:
         elif self.operator in ["÷", "➗"]:
             div = float(self.current_value or 1)
             if div != 0: self.last_result /= div
-
+    
     def update_ui(self):
-        print(f"UI Update: {self.current_value}")
-        self.expr_ref.current.value = self.expression
+        expr_text, result_text = self.expr_ref.current, self.result_ref.current
         if self.last_result and self.current_value == "0":
-            años, meses, dias, horas = self.last_result.obtener_componentes()
-            disp = f"{años}Y {meses}M {dias}D {horas:.2f}H"
+            disp = formatear(self.last_result, "corto")
         else: disp = self.current_value
-        self.result_ref.current.value = disp[:25]
-        self.page.update()
-
+        changed = []
+        if expr_text.value != self.expression:
+            expr_text.value = self.expression
+            changed.append(expr_text)
+        if result_text.value != disp[:25]:
+            result_text.value = disp[:25]
+            changed.append(result_text)
+        self.ui_scheduler.mark_dirty(*changed)
+    
     def on_keyboard(self, e: ft.KeyboardEvent):
         key = e.key
-        print(f"Key: {key}")
         
         # Mapeo de Numpad
         if key.startswith("Numpad "):
@@ -203,7 +250,7 @@ class CalcTimeWin:
                        "Add":"+", "Subtract":"-", "Multiply":"*", "Divide":"/", "Enter":"Enter", "Decimal":"."}
             k_part = key.split(" ", 1)[1]
             if k_part in num_map: key = num_map[k_part]
-
+        
         if key in "0123456789": self.handle_input("digit", key)
         elif key in [".", ",", "Decimal"]: self.handle_input("digit", ".")
         elif key == "Backspace": self.handle_input("delete", None)
@@ -215,66 +262,78 @@ class CalcTimeWin:
         elif key in ["/", ":"]: self.handle_input("op", "÷")
         elif key.upper() in ["Y", "M", "D", "H"]: self.handle_input("unit", key.upper())
         elif key.upper() == "I": self.handle_input("unit", "Min")
-
+    
     def show_history(self, e):
-        print(f"Opening History Stack... Items: {len(self.history)}")
-        self.history_list.controls.clear()
-        if not self.history:
-            self.history_list.controls.append(ft.Text("No history yet.", italic=True, opacity=0.5))
-        for item in self.history:
-            self.history_list.controls.append(ft.Container(
-                content=ft.Column([ft.Text(item["timestamp"], size=10, color=Colors.BLUE_200), ft.Text(item["entry"], size=12)]),
-                padding=10, bgcolor=Colors.with_opacity(0.1, Colors.WHITE), border_radius=10
-            ))
+        if not self.history_ready.is_set():
+            self.history_list.controls = [ft.Text("Loading history...", italic=True, opacity=0.5)]
+            self.history_overlay.current.visible = True
+            self.page.update()
+            return
+        rows = self.history_window.reset()
+        print(f"Opening History Stack... Items: {len(rows)}")
+        self.history_list.controls = rows if rows else [self.history_empty]
         self.history_overlay.current.visible = True
         self.page.update()
+    
+    def make_history_row(self):
+        return ft.Container(
+            content=ft.Column([ft.Text("", size=10, color=Colors.BLUE_200), ft.Text("", size=12)]),
+            padding=10, bgcolor=Colors.with_opacity(0.1, Colors.WHITE), border_radius=10
+        )
+    
+    def bind_history_row(self, row, item):
+        ts_text, entry_text = row.content.controls
+        ts_text.value, entry_text.value = item["timestamp"], item["entry"]
+    
+    def on_history_scroll(self, e):
+        if self.history_window.needs_more(e.pixels, e.max_scroll_extent):
+            rows = self.history_window.load_more()
+            if rows:
+                self.history_list.controls.extend(rows)
+                self.history_list.update()
+    
     def close_drawer(self, e=None):
         if self.history_overlay.current:
             self.history_overlay.current.visible = False
             self.page.update()
-
-    def clear_history(self, e): self.history = []; self.save_data(); self.close_drawer(e)
+    
+    def clear_history(self, e):
+        with self.history_lock:
+            if not self.history_ready.is_set(): self.pending_history.append(None)
+            else:
+                try: self.history_store.clear()
+                except Exception as ex: print(f"Save error: {ex}")
+        self.close_drawer(e)
     def copy_result(self, e):
+        # Vuelve de inmediato: la copia corre en el hilo del portapapeles
         res = str(self.result_ref.current.value)
-        success = False
-        try:
-            # Estrategia 1: Pyperclip (Si está disponible)
-            if pyperclip:
-                pyperclip.copy(res)
-                print(f"Copied via Pyperclip: {res}")
-                success = True
-            
-            # Estrategia 2: PowerShell Nativo (Windows)
-            if not success:
-                import subprocess
-                subprocess.run(['powershell', '-Command', f'Set-Clipboard -Value "{res}"'], check=True)
-                print(f"Copied via PowerShell: {res}")
-                success = True
-        except Exception as e:
-            print(f"Primary clipboard methods failed: {e}")
-
-        # Estrategia 3: Flet Native (Fallback desesperado)
-        if not success:
-            try:
-                if hasattr(self.page, "set_clipboard"): self.page.set_clipboard(res)
-                else: self.page.clipboard = res
-                success = True
-            except Exception as ex: print(f"Flet clipboard also failed: {ex}")
-
-        if success:
-            snack = ft.SnackBar(ft.Text(f"Copied: {res}"), duration=2000)
-            self.page.overlay.append(snack)
-            snack.open = True
+        self.clipboard.copy(res, on_done=lambda backend: self.on_copied(res, backend))
+    
+    def on_copied(self, res, backend):
+        if backend is None:
+            print("Clipboard copy failed: no backend available")
+            return
+        print(f"Copied via {backend}: {res}")
+        snack = ft.SnackBar(ft.Text(f"Copied: {res}"), duration=2000)
+        self.page.overlay.append(snack)
+        snack.open = True
         self.page.update()
-
+    
     def show_settings(self, e):
         print("Opening Settings...")
-        def toggle(e): self.page.theme_mode = ThemeMode.DARK if e.control.value else ThemeMode.LIGHT; self.page.update()
-        dlg = ft.AlertDialog(title=ft.Text("Settings"), content=ft.Switch(label="Dark Mode", value=True, on_change=toggle))
+        def toggle(e):
+            self.page.theme_mode = ThemeMode.DARK if e.control.value else ThemeMode.LIGHT
+            self.settings["darkMode"] = e.control.value
+            self.save_data()
+            self.page.update()
+        dlg = ft.AlertDialog(title=ft.Text("Settings"), content=ft.Switch(label="Dark Mode", value=self.settings.get("darkMode", True), on_change=toggle))
         self.page.overlay.append(dlg)
         dlg.open = True
         self.page.update()
 
+# Latencia de los manejadores (solo con CALCTIME_INSTRUMENTAR y afines; ver instrumentacion.py)
+instrumentacion.instrumentar(CalcTimeWin, instrumentacion.METODOS_GUI)
+
 def main(page: ft.Page): 
     try:
         CalcTimeWin(page)
@@ -0,0 +1,62 @@
+"""
+Planificador de actualizaciones de la UI.
+
+Cada pulsación de tecla cambia uno o dos controles (expresión y resultado).
+En lugar de actualizar la página completa en cada evento, los controles
+modificados se marcan como "sucios" y se envían juntos como máximo una vez
+por frame. Así, las ráfagas de teclado (o una app servida de forma remota,
+donde cada actualización es un viaje de ida y vuelta) generan una sola
+actualización por frame con solo los controles que cambiaron.
+"""
+
+import threading
+
+
+class UpdateScheduler:
+    """Agrupa los controles modificados y los actualiza como máximo una vez por frame."""
+    
+    def __init__(self, flush_controls, frame_interval=1 / 60, timer_factory=threading.Timer):
+        """
+        Args:
+            flush_controls (callable): Recibe la lista de controles a actualizar
+            frame_interval (float): Segundos por frame
+            timer_factory (callable): Crea el temporizador, timer_factory(segundos, función)
+        """
+        self.flush_controls = flush_controls
+        self.frame_interval = frame_interval
+        self.timer_factory = timer_factory
+        self._lock = threading.Lock()
+        self._dirty = {}
+        self._timer = None
+    
+    def mark_dirty(self, *controls):
+        """
+        Marca controles para la próxima actualización y programa el frame si hace falta.
+        
+        Args:
+            *controls: Controles modificados
+        """
+        with self._lock:
+            for control in controls:
+                self._dirty[id(control)] = control
+            if self._timer is None and self._dirty:
+                self._timer = self.timer_factory(self.frame_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def flush(self):
+        """Envía ya los controles pendientes (lo llama el temporizador al final del frame)."""
+        with self._lock:
+            controls = list(self._dirty.values())
+            self._dirty.clear()
+            self._timer = None
+        if controls:
+            self.flush_controls(controls)
+    
+    def cancel(self):
+        """Descarta las actualizaciones pendientes (por ejemplo, al cerrar la ventana)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._dirty.clear()
+            self._timer = None
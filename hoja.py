@@ -0,0 +1,393 @@
+"""
+Hoja de cálculo de tiempos con variables
+========================================
+Permite definir tiempos con nombre y fórmulas que dependen de otros nombres,
+por ejemplo:
+
+    turno = 8h
+    semana = turno * 5
+    trimestre = semana * 13
+
+Las fórmulas usan el lenguaje de expresiones de duración (ver expresiones.py)
+y la hoja mantiene un grafo de dependencias. Al cambiar una celda solo se
+recalculan las celdas que dependen de ella, en orden topológico, y la
+propagación se corta en las celdas cuyo valor no cambió. Los ciclos se
+detectan al definir y la hoja queda como estaba.
+
+Una celda cuya fórmula falla (variable no definida, división por cero, ...)
+guarda el error en lugar del valor, y las celdas que dependen de ella también
+quedan con error hasta que se corrija.
+
+Uso:
+    python hoja.py planilla.txt
+    python hoja.py planilla.txt --set "turno = 7h 30min" --formato corto
+"""
+
+import argparse
+import sys
+from collections import deque
+
+from calctime import FORMATOS_TIEMPO, Tiempo, formatear
+from expresiones import ErrorExpresion, Variable, compilar, parsear
+
+
+class ErrorHoja(ValueError):
+    """Definición no válida en la hoja."""
+
+
+class ErrorCiclo(ErrorHoja):
+    """La definición crearía una dependencia circular."""
+    
+    def __init__(self, ciclo):
+        super().__init__("dependencia circular: " + " -> ".join(ciclo))
+        self.ciclo = ciclo
+
+
+def _congelar(valor):
+    # Los valores se comparten entre celdas: se guardan como TiempoInmutable
+    return valor.congelar() if isinstance(valor, Tiempo) else valor
+
+
+def _mismo_valor(a, b):
+    return type(a) is type(b) and a == b
+
+
+class _Constante:
+    """Valor directo de una celda, con la misma interfaz que ExpresionCompilada."""
+    
+    __slots__ = ("valor", "texto")
+    variables = frozenset()
+    
+    def __init__(self, valor):
+        self.valor = _congelar(valor)
+        if isinstance(valor, Tiempo):
+            # Horas con la resolución de los ticks, para que exportar() se pueda volver a cargar
+            horas = Tiempo._ticks_de(valor) / Tiempo.TICKS_POR_HORA
+            self.texto = f"{horas:.10f}".rstrip("0").rstrip(".") + "h"
+        else:
+            self.texto = repr(valor)
+    
+    def __call__(self, valores=None):
+        return self.valor
+
+
+class Hoja:
+    """Celdas con nombre y fórmulas, con recálculo incremental por dependencias."""
+    
+    def __init__(self, definiciones=None):
+        """
+        Inicializa la hoja.
+        
+        Args:
+            definiciones (dict): Fórmulas iniciales por nombre (opcional)
+        """
+        self._formulas = {}
+        self._dependencias = {}
+        self._dependientes = {}
+        self._valores = {}
+        self._errores = {}
+        self.evaluaciones = 0
+        if definiciones:
+            self.definir_muchos(definiciones)
+    
+    # Definición
+    
+    def definir(self, nombre, formula):
+        """
+        Define o reemplaza una celda y recalcula lo que depende de ella.
+        
+        Args:
+            nombre (str): Nombre de la celda
+            formula (str/Tiempo/int/float): Fórmula, o un valor directo
+            
+        Returns:
+            list: Nombres recalculados, en orden topológico
+            
+        Raises:
+            ErrorHoja: Si el nombre no es válido
+            ErrorExpresion: Si la fórmula no es válida
+            ErrorCiclo: Si la fórmula crea una dependencia circular
+        """
+        return self.definir_muchos({nombre: formula})
+    
+    def definir_muchos(self, definiciones):
+        """
+        Define o reemplaza varias celdas con un único recálculo.
+        
+        Si alguna definición no es válida, ninguna se aplica.
+        
+        Args:
+            definiciones (dict): Fórmulas por nombre
+            
+        Returns:
+            list: Nombres recalculados, en orden topológico
+        """
+        nuevas = {}
+        for nombre, formula in definiciones.items():
+            self._validar_nombre(nombre)
+            if isinstance(formula, (Tiempo, int, float)) and not isinstance(formula, bool):
+                nuevas[nombre] = _Constante(formula)
+            elif isinstance(formula, str):
+                nuevas[nombre] = compilar(formula)
+            else:
+                raise ErrorHoja(f"fórmula no válida para '{nombre}': {formula!r}")
+        
+        anteriores = {nombre: self._formulas.get(nombre) for nombre in nuevas}
+        for nombre, expresion in nuevas.items():
+            self._enlazar(nombre, expresion)
+        try:
+            orden = self._ordenar(self._afectados(nuevas))
+        except ErrorCiclo:
+            for nombre, expresion in anteriores.items():
+                if expresion is None:
+                    self._desenlazar(nombre)
+                else:
+                    self._enlazar(nombre, expresion)
+            raise
+        return self._recalcular(orden, set(nuevas))
+    
+    def eliminar(self, nombre):
+        """
+        Elimina una celda; las que dependían de ella quedan con error.
+        
+        Returns:
+            list: Nombres recalculados, en orden topológico
+            
+        Raises:
+            KeyError: Si la celda no existe
+        """
+        if nombre not in self._formulas:
+            raise KeyError(nombre)
+        orden = self._ordenar(self._afectados([nombre]))
+        self._desenlazar(nombre)
+        self._valores.pop(nombre, None)
+        self._errores.pop(nombre, None)
+        orden.remove(nombre)
+        return self._recalcular(orden, set(), {nombre})
+    
+    def cargar(self, lineas):
+        """
+        Define celdas a partir de líneas "nombre = fórmula" (se ignoran las vacías y los comentarios "#").
+        
+        Args:
+            lineas (iterable): Líneas de texto
+            
+        Returns:
+            list: Nombres recalculados, en orden topológico
+            
+        Raises:
+            ErrorHoja: Si una línea no tiene la forma "nombre = fórmula"
+        """
+        definiciones = {}
+        for numero, linea in enumerate(lineas, 1):
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue
+            nombre, separador, formula = linea.partition("=")
+            if not separador:
+                raise ErrorHoja(f"línea {numero}: se esperaba 'nombre = fórmula'")
+            definiciones[nombre.strip()] = formula.strip()
+        return self.definir_muchos(definiciones)
+    
+    @staticmethod
+    def _validar_nombre(nombre):
+        try:
+            valido = isinstance(nombre, str) and isinstance(parsear(nombre), Variable)
+        except ErrorExpresion:
+            valido = False
+        if not valido:
+            raise ErrorHoja(f"nombre de celda no válido: {nombre!r}")
+    
+    # Grafo de dependencias
+    
+    def _enlazar(self, nombre, expresion):
+        # Una celda redefinida conserva su posición en el orden de definición
+        self._quitar_aristas(nombre)
+        self._formulas[nombre] = expresion
+        self._dependencias[nombre] = expresion.variables
+        for dependencia in expresion.variables:
+            self._dependientes.setdefault(dependencia, set()).add(nombre)
+    
+    def _desenlazar(self, nombre):
+        self._quitar_aristas(nombre)
+        self._formulas.pop(nombre, None)
+    
+    def _quitar_aristas(self, nombre):
+        for dependencia in self._dependencias.pop(nombre, ()):
+            dependientes = self._dependientes[dependencia]
+            dependientes.discard(nombre)
+            if not dependientes:
+                del self._dependientes[dependencia]
+    
+    def _afectados(self, origenes):
+        """Celdas definidas alcanzables desde los orígenes siguiendo a sus dependientes."""
+        afectados = set()
+        pendientes = deque(origenes)
+        while pendientes:
+            nombre = pendientes.popleft()
+            if nombre in afectados:
+                continue
+            if nombre in self._formulas:
+                afectados.add(nombre)
+            pendientes.extend(self._dependientes.get(nombre, ()))
+        return afectados
+    
+    def _ordenar(self, afectados):
+        """
+        Ordena topológicamente solo las celdas afectadas (algoritmo de Kahn).
+        
+        Raises:
+            ErrorCiclo: Si las celdas afectadas forman un ciclo
+        """
+        grados = {nombre: sum(1 for d in self._dependencias[nombre] if d in afectados) for nombre in afectados}
+        listos = deque(sorted(nombre for nombre, grado in grados.items() if grado == 0))
+        orden = []
+        while listos:
+            nombre = listos.popleft()
+            orden.append(nombre)
+            for dependiente in self._dependientes.get(nombre, ()):
+                if dependiente in grados:
+                    grados[dependiente] -= 1
+                    if grados[dependiente] == 0:
+                        listos.append(dependiente)
+        if len(orden) < len(afectados):
+            raise ErrorCiclo(self._buscar_ciclo({n for n, g in grados.items() if g > 0}))
+        return orden
+    
+    def _buscar_ciclo(self, restantes):
+        """Recorre dependencias dentro de las celdas sin ordenar hasta repetir una."""
+        nombre = min(restantes)
+        camino = []
+        vistos = {}
+        while nombre not in vistos:
+            vistos[nombre] = len(camino)
+            camino.append(nombre)
+            nombre = min(d for d in self._dependencias[nombre] if d in restantes)
+        return camino[vistos[nombre]:] + [nombre]
+    
+    def _recalcular(self, orden, redefinidos, cambiados=()):
+        """
+        Evalúa las celdas en orden, saltando las que no tienen dependencias con cambios.
+        
+        Args:
+            orden (list): Celdas afectadas en orden topológico
+            redefinidos (set): Celdas que cambiaron de fórmula (se evalúan siempre)
+            cambiados (iterable): Nombres cuyo valor ya cambió (por ejemplo, una celda eliminada)
+            
+        Returns:
+            list: Nombres efectivamente recalculados
+        """
+        cambiados = set(cambiados)
+        recalculados = []
+        for nombre in orden:
+            dependencias = self._dependencias[nombre]
+            if nombre not in redefinidos and cambiados.isdisjoint(dependencias):
+                continue
+            recalculados.append(nombre)
+            anterior = (self._valores.get(nombre), self._errores.get(nombre))
+            valor, error = self._evaluar(nombre, dependencias)
+            if valor is None:
+                self._valores.pop(nombre, None)
+                self._errores[nombre] = error
+            else:
+                self._valores[nombre] = valor
+                self._errores.pop(nombre, None)
+            if not (_mismo_valor(anterior[0], valor) and anterior[1] == error):
+                cambiados.add(nombre)
+        return recalculados
+    
+    def _evaluar(self, nombre, dependencias):
+        for dependencia in dependencias:
+            if dependencia in self._errores:
+                return None, f"depende de '{dependencia}', que tiene un error"
+            if dependencia not in self._valores:
+                return None, f"variable '{dependencia}' no definida"
+        self.evaluaciones += 1
+        try:
+            return _congelar(self._formulas[nombre](self._valores)), None
+        except (ValueError, TypeError, ArithmeticError) as e:
+            return None, str(e) or type(e).__name__
+    
+    # Consulta
+    
+    def __getitem__(self, nombre):
+        """
+        Obtiene el valor de una celda.
+        
+        Raises:
+            KeyError: Si la celda no existe
+            ErrorHoja: Si la celda tiene un error
+        """
+        if nombre in self._errores:
+            raise ErrorHoja(f"'{nombre}': {self._errores[nombre]}")
+        return self._valores[nombre]
+    
+    def __contains__(self, nombre):
+        return nombre in self._formulas
+    
+    def __iter__(self):
+        return iter(self._formulas)
+    
+    def __len__(self):
+        return len(self._formulas)
+    
+    def get(self, nombre, defecto=None):
+        """Valor de una celda, o `defecto` si no existe o tiene un error."""
+        return self._valores.get(nombre, defecto)
+    
+    def error(self, nombre):
+        """str: Error de una celda, o None si no tiene."""
+        return self._errores.get(nombre)
+    
+    def formula(self, nombre):
+        """str: Texto de la fórmula de una celda."""
+        return self._formulas[nombre].texto
+    
+    def dependencias(self, nombre):
+        """frozenset: Nombres que usa la fórmula de una celda."""
+        return self._dependencias[nombre]
+    
+    def dependientes(self, nombre):
+        """frozenset: Celdas cuya fórmula usa un nombre."""
+        return frozenset(self._dependientes.get(nombre, ()))
+    
+    def exportar(self):
+        """
+        Returns:
+            list: Líneas "nombre = fórmula", en orden de definición (ver cargar())
+        """
+        return [f"{nombre} = {expresion.texto}" for nombre, expresion in self._formulas.items()]
+
+
+def main(argv=None):
+    """Punto de entrada de la hoja de tiempos."""
+    parser = argparse.ArgumentParser(description="Hoja de tiempos con variables")
+    parser.add_argument("archivo", help="archivo con una definición 'nombre = fórmula' por línea ('-' para stdin)")
+    parser.add_argument("--set", action="append", default=[], metavar="DEFINICION",
+                        help="definición adicional o que reemplaza a una del archivo")
+    parser.add_argument("--formato", choices=tuple(FORMATOS_TIEMPO), default="texto", help="formato de los tiempos")
+    args = parser.parse_args(argv)
+    
+    hoja = Hoja()
+    entrada = sys.stdin if args.archivo == "-" else open(args.archivo, "r", encoding="utf-8")
+    try:
+        with entrada:
+            hoja.cargar(entrada)
+        hoja.cargar(args.set)
+    except (ErrorHoja, ErrorExpresion) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    
+    errores = 0
+    for nombre in hoja:
+        if hoja.error(nombre):
+            errores += 1
+            print(f"{nombre} = ERROR: {hoja.error(nombre)}")
+        else:
+            valor = hoja[nombre]
+            print(f"{nombre} = {formatear(valor, args.formato) if isinstance(valor, Tiempo) else valor}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
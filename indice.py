@@ -0,0 +1,240 @@
+"""
+Índice ordenado de tiempos
+==========================
+Mantiene una colección de tiempos ordenada por sus ticks enteros para
+responder en O(log n) consultas que de otro modo requieren recorrer toda la
+lista con comparaciones de a pares:
+
+- Rango: "entre 3 meses y 1 año"
+- Vecinos más cercanos: los k tiempos más próximos a uno dado
+- Posición y percentil: cuántos tiempos son menores, o qué valor está en el p95
+
+Las claves son los ticks exactos de `Tiempo`, así que el orden es total y
+coherente con `==`, `<` y `<=`. Cada tiempo puede llevar un dato asociado
+(por ejemplo, la entrada del historial de la que proviene).
+
+Uso:
+    indice = IndiceTiempos(tiempos)
+    indice.rango(Tiempo(meses=3), Tiempo(años=1))
+    indice.cercanos(Tiempo(dias=45), k=5)
+    indice.percentil(95)
+"""
+
+import math
+from bisect import bisect_left, bisect_right
+
+from calctime import Tiempo
+
+
+def _clave(tiempo):
+    """Ticks de un Tiempo en la resolución de `Tiempo`."""
+    if not isinstance(tiempo, Tiempo):
+        raise TypeError("El índice solo admite objetos Tiempo")
+    return Tiempo._ticks_de(tiempo)
+
+
+class IndiceTiempos:
+    """Colección de tiempos ordenada con búsqueda binaria (bisect)."""
+    
+    def __init__(self, tiempos=(), datos=None):
+        """
+        Construye el índice ordenando los tiempos una sola vez.
+        
+        Args:
+            tiempos (iterable): Tiempos iniciales
+            datos (iterable): Datos asociados a cada tiempo, en el mismo orden (opcional)
+        """
+        claves = [_clave(t) for t in tiempos]
+        datos = [None] * len(claves) if datos is None else list(datos)
+        if len(datos) != len(claves):
+            raise ValueError("Debe haber un dato por cada tiempo")
+        orden = sorted(range(len(claves)), key=claves.__getitem__)
+        self._claves = [claves[i] for i in orden]
+        self._datos = [datos[i] for i in orden]
+    
+    def __len__(self):
+        return len(self._claves)
+    
+    def __iter__(self):
+        desde_ticks = Tiempo._desde_ticks
+        for ticks in self._claves:
+            yield desde_ticks(ticks)
+    
+    def __getitem__(self, posicion):
+        """
+        Args:
+            posicion (int): Posición en el orden ascendente
+            
+        Returns:
+            Tiempo: Tiempo en esa posición
+        """
+        return Tiempo._desde_ticks(self._claves[posicion])
+    
+    def __contains__(self, tiempo):
+        ticks = _clave(tiempo)
+        i = bisect_left(self._claves, ticks)
+        return i < len(self._claves) and self._claves[i] == ticks
+    
+    def _resultados(self, inicio, fin, con_datos):
+        desde_ticks = Tiempo._desde_ticks
+        if con_datos:
+            return [(desde_ticks(t), d) for t, d in zip(self._claves[inicio:fin], self._datos[inicio:fin])]
+        return [desde_ticks(t) for t in self._claves[inicio:fin]]
+    
+    # Modificación
+    
+    def insertar(self, tiempo, dato=None):
+        """
+        Inserta un tiempo manteniendo el orden (después de los iguales).
+        
+        Args:
+            tiempo (Tiempo): Tiempo a insertar
+            dato: Dato asociado (opcional)
+        """
+        ticks = _clave(tiempo)
+        i = bisect_right(self._claves, ticks)
+        self._claves.insert(i, ticks)
+        self._datos.insert(i, dato)
+    
+    def eliminar(self, tiempo):
+        """
+        Elimina una aparición de un tiempo.
+        
+        Args:
+            tiempo (Tiempo): Tiempo a eliminar
+            
+        Returns:
+            bool: True si estaba en el índice
+        """
+        ticks = _clave(tiempo)
+        i = bisect_left(self._claves, ticks)
+        if i < len(self._claves) and self._claves[i] == ticks:
+            del self._claves[i]
+            del self._datos[i]
+            return True
+        return False
+    
+    # Consultas
+    
+    def _limites(self, desde, hasta, incluir_hasta):
+        inicio = 0 if desde is None else bisect_left(self._claves, _clave(desde))
+        if hasta is None:
+            fin = len(self._claves)
+        else:
+            buscar = bisect_right if incluir_hasta else bisect_left
+            fin = buscar(self._claves, _clave(hasta))
+        return inicio, max(inicio, fin)
+    
+    def rango(self, desde=None, hasta=None, incluir_hasta=True, con_datos=False):
+        """
+        Tiempos entre dos límites, en orden ascendente.
+        
+        Args:
+            desde (Tiempo): Límite inferior inclusivo (None = sin límite)
+            hasta (Tiempo): Límite superior (None = sin límite)
+            incluir_hasta (bool): Si el límite superior es inclusivo
+            con_datos (bool): Devolver pares (Tiempo, dato)
+            
+        Returns:
+            list: Tiempos (o pares) dentro del rango
+        """
+        inicio, fin = self._limites(desde, hasta, incluir_hasta)
+        return self._resultados(inicio, fin, con_datos)
+    
+    def contar_rango(self, desde=None, hasta=None, incluir_hasta=True):
+        """
+        Cantidad de tiempos entre dos límites, sin materializarlos.
+        
+        Returns:
+            int: Cantidad de tiempos dentro del rango
+        """
+        inicio, fin = self._limites(desde, hasta, incluir_hasta)
+        return fin - inicio
+    
+    def cercanos(self, tiempo, k=1, con_datos=False):
+        """
+        Los k tiempos más próximos a uno dado (ante empates, primero el menor).
+        
+        Args:
+            tiempo (Tiempo): Tiempo de referencia
+            k (int): Cantidad de vecinos
+            con_datos (bool): Devolver pares (Tiempo, dato)
+            
+        Returns:
+            list: Tiempos (o pares) ordenados por distancia
+        """
+        ticks = _clave(tiempo)
+        claves = self._claves
+        derecha = bisect_left(claves, ticks)
+        izquierda = derecha - 1
+        posiciones = []
+        while len(posiciones) < k and (izquierda >= 0 or derecha < len(claves)):
+            if derecha >= len(claves) or (izquierda >= 0 and ticks - claves[izquierda] <= claves[derecha] - ticks):
+                posiciones.append(izquierda)
+                izquierda -= 1
+            else:
+                posiciones.append(derecha)
+                derecha += 1
+        desde_ticks = Tiempo._desde_ticks
+        if con_datos:
+            return [(desde_ticks(claves[i]), self._datos[i]) for i in posiciones]
+        return [desde_ticks(claves[i]) for i in posiciones]
+    
+    def posicion(self, tiempo):
+        """
+        Cantidad de tiempos estrictamente menores que uno dado.
+        
+        Args:
+            tiempo (Tiempo): Tiempo de referencia
+            
+        Returns:
+            int: Posición en la que se insertaría (antes de los iguales)
+        """
+        return bisect_left(self._claves, _clave(tiempo))
+    
+    def percentil_de(self, tiempo):
+        """
+        Porcentaje de tiempos menores o iguales que uno dado.
+        
+        Args:
+            tiempo (Tiempo): Tiempo de referencia
+            
+        Returns:
+            float: Percentil entre 0 y 100 (None si el índice está vacío)
+        """
+        if not self._claves:
+            return None
+        return 100 * bisect_right(self._claves, _clave(tiempo)) / len(self._claves)
+    
+    def percentil(self, p):
+        """
+        Tiempo en el percentil p (método del rango más cercano).
+        
+        Args:
+            p (int/float): Percentil entre 0 y 100
+            
+        Returns:
+            Tiempo: Menor tiempo con al menos p % de los valores por debajo o igual
+            (None si el índice está vacío)
+            
+        Raises:
+            ValueError: Si p está fuera de [0, 100]
+        """
+        if not 0 <= p <= 100:
+            raise ValueError("El percentil debe estar entre 0 y 100")
+        if not self._claves:
+            return None
+        n = len(self._claves)
+        # Rango más cercano: ceil(p/100 * n), sin arrastrar el error de p flotante
+        rango = max(1, math.ceil(round(p * n / 100, 9)))
+        return Tiempo._desde_ticks(self._claves[rango - 1])
+    
+    @property
+    def minimo(self):
+        """Tiempo: Menor tiempo (None si el índice está vacío)."""
+        return Tiempo._desde_ticks(self._claves[0]) if self._claves else None
+    
+    @property
+    def maximo(self):
+        """Tiempo: Mayor tiempo (None si el índice está vacío)."""
+        return Tiempo._desde_ticks(self._claves[-1]) if self._claves else None
@@ -0,0 +1,431 @@
+"""
+Ingesta masiva de tiempos desde CSV, Parquet y Arrow
+====================================================
+Lee archivos con columnas de componentes (por defecto años, meses, dias,
+horas y minutos, o cualquier mapeo de columnas) y los convierte por bloques
+directamente a ticks de `Tiempo`, con las mismas constantes y el mismo
+redondeo que `Tiempo`, pero sin crear un objeto por fila:
+
+    ticks = round((años * HORAS_POR_AÑO + meses * HORAS_POR_MES
+                   + dias * HORAS_POR_DIA + horas) * TICKS_POR_HORA
+                  + minutos * TICKS_POR_HORA / 60)
+
+Los bloques se entregan como arreglos de NumPy (o listas de enteros si NumPy
+no está instalado) y se pueden volcar a un `TiempoArray` o reducir en
+streaming con un `AcumuladorTiempo`, así que la memoria no depende del
+tamaño del archivo. Con NumPy cada bloque se convierte de forma vectorizada.
+Parquet y Arrow/Feather requieren pyarrow; si está instalado, también se usa
+para leer CSV.
+
+Las columnas se reconocen por su encabezado con los mismos nombres de unidad
+que las expresiones (y/año/años, m/mes/meses, d/día/días, h/hora/horas,
+min/minutos). Sin encabezado, las columnas se toman en el orden
+años, meses, días, horas, como en el modo por lotes.
+
+Uso:
+    python ingesta.py export.csv
+    python ingesta.py export.csv --columnas "años=anios,horas=hs" --delimitador ";"
+    python ingesta.py export.parquet --bloque 1000000
+"""
+
+import argparse
+import csv
+import os
+import sys
+from itertools import islice
+
+from calctime import AcumuladorTiempo, Tiempo, TiempoArray, _numpy
+from expresiones import UNIDADES
+
+COMPONENTES = ("años", "meses", "dias", "horas", "minutos")
+FILAS_POR_BLOQUE = 100000
+FORMATOS = ("csv", "parquet", "arrow")
+_EXTENSIONES = {".csv": "csv", ".txt": "csv", ".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow",
+                ".ipc": "arrow"}
+# Ticks representables en int64: los valores NaN, infinitos o mayores no son filas válidas
+_LIMITE_TICKS = 2.0 ** 63
+
+
+class ErrorIngesta(ValueError):
+    """Archivo, columna o fila no válidos."""
+
+
+def _ticks_fila(valores):
+    """Ticks de una fila (años, meses, dias, horas, minutos), como Tiempo._a_ticks."""
+    años, meses, dias, horas, minutos = valores
+    total = (años * Tiempo.HORAS_POR_AÑO + meses * Tiempo.HORAS_POR_MES
+             + dias * Tiempo.HORAS_POR_DIA + horas) * Tiempo.TICKS_POR_HORA
+    if minutos:
+        total += minutos * Tiempo.TICKS_POR_HORA / 60
+    if not abs(total) < _LIMITE_TICKS:
+        raise ValueError("valor no finito o fuera de rango")
+    return round(total)
+
+
+def _total_columnas(np, columnas):
+    """Ticks sin redondear de un bloque (float64), a partir de las columnas en el orden de COMPONENTES."""
+    años, meses, dias, horas, minutos = columnas
+    with np.errstate(over="ignore", invalid="ignore"):
+        total = (años * Tiempo.HORAS_POR_AÑO + meses * Tiempo.HORAS_POR_MES
+                 + dias * Tiempo.HORAS_POR_DIA + horas) * Tiempo.TICKS_POR_HORA
+        total += minutos * (Tiempo.TICKS_POR_HORA / 60)
+    return total
+
+
+def _ticks_columnas(np, columnas):
+    """
+    Ticks de un bloque a partir de las columnas de componentes (float64, en el orden de COMPONENTES).
+    
+    Raises:
+        ValueError: Si algún valor es NaN, infinito o no cabe en int64
+    """
+    total = _total_columnas(np, columnas)
+    if not (np.abs(total) < _LIMITE_TICKS).all():
+        raise ValueError("valores no finitos o fuera de rango")
+    return np.rint(total).astype(np.int64)
+
+
+class Ingesta:
+    """Lector por bloques de archivos de componentes de tiempo."""
+    
+    def __init__(self, origen, columnas=None, formato=None, filas_por_bloque=FILAS_POR_BLOQUE,
+                 delimitador=",", encabezado=True, omitir_errores=False, motor="auto", clave=None):
+        """
+        Args:
+            origen (str/file): Ruta del archivo, o un flujo de texto CSV
+            columnas (dict): Componente -> nombre (o índice) de columna; por
+                defecto se detectan por el encabezado
+            formato (str): "csv", "parquet" o "arrow" (por defecto, según la extensión)
+            filas_por_bloque (int): Filas por bloque
+            delimitador (str): Separador de campos del CSV
+            encabezado (bool): Si la primera fila del CSV es el encabezado
+            omitir_errores (bool): Saltar las filas no válidas en lugar de lanzar ErrorIngesta
+            motor (str): "auto" (pyarrow si está instalado), "python" o "arrow"
+            clave (str/int): Columna (nombre o índice) que se entrega junto a cada
+                tiempo en bloques_con_claves(), por ejemplo un proyecto o un empleado
+        """
+        if columnas:
+            desconocidos = set(columnas) - set(COMPONENTES)
+            if desconocidos:
+                raise ErrorIngesta(f"componentes desconocidos: {', '.join(sorted(desconocidos))}")
+        if formato is None:
+            ruta = origen if isinstance(origen, str) else ""
+            formato = _EXTENSIONES.get(os.path.splitext(ruta)[1].lower(), "csv")
+        if formato not in FORMATOS:
+            raise ErrorIngesta(f"formato '{formato}' no soportado (use {', '.join(FORMATOS)})")
+        if formato != "csv" and not isinstance(origen, str):
+            raise ErrorIngesta(f"el formato '{formato}' requiere una ruta de archivo")
+        self.origen = origen
+        self.columnas = dict(columnas) if columnas else None
+        self.formato = formato
+        self.filas_por_bloque = filas_por_bloque
+        self.delimitador = delimitador
+        self.encabezado = encabezado
+        self.omitir_errores = omitir_errores
+        self.motor = motor
+        self.clave = clave
+        self.filas = 0
+        self.omitidas = 0
+    
+    # Columnas
+    
+    def _resolver(self, nombres):
+        """
+        Índice de la columna de cada componente (None si no está).
+        
+        Args:
+            nombres (list): Nombres de las columnas del archivo (None si no hay encabezado)
+        """
+        if self.columnas:
+            indices = []
+            for componente in COMPONENTES:
+                columna = self.columnas.get(componente)
+                if columna is None or isinstance(columna, int):
+                    indices.append(columna)
+                elif nombres is None:
+                    raise ErrorIngesta("sin encabezado, las columnas deben indicarse por índice")
+                elif columna not in nombres:
+                    raise ErrorIngesta(f"no existe la columna '{columna}'")
+                else:
+                    indices.append(nombres.index(columna))
+            return indices
+        if nombres is None:
+            return [0, 1, 2, 3, None]
+        indices = [None] * len(COMPONENTES)
+        for i, nombre in enumerate(nombres):
+            componente = UNIDADES.get(nombre.strip().lower())
+            if componente is not None and indices[COMPONENTES.index(componente)] is None:
+                indices[COMPONENTES.index(componente)] = i
+        if all(i is None for i in indices):
+            raise ErrorIngesta(f"ninguna columna reconocida como componente en {nombres}")
+        return indices
+    
+    def _resolver_clave(self, nombres):
+        """Índice de la columna de clave (None si no se pidió)."""
+        if self.clave is None or isinstance(self.clave, int):
+            return self.clave
+        if nombres is None:
+            raise ErrorIngesta("sin encabezado, la columna de clave debe indicarse por índice")
+        if self.clave not in nombres:
+            raise ErrorIngesta(f"no existe la columna de clave '{self.clave}'")
+        return nombres.index(self.clave)
+    
+    # Lectura
+    
+    def bloques(self):
+        """
+        Lee el archivo por bloques.
+        
+        Yields:
+            numpy.ndarray/list: Ticks de cada fila del bloque (int64, o int sin NumPy)
+            
+        Raises:
+            ErrorIngesta: Si una fila no es válida (salvo con omitir_errores)
+            ImportError: Si el formato requiere pyarrow y no está instalado
+        """
+        return (ticks for _, ticks in self._leer())
+    
+    def bloques_con_claves(self):
+        """
+        Lee el archivo por bloques junto con la columna de clave.
+        
+        Yields:
+            tuple: (claves, ticks) de cada bloque, alineados fila por fila
+            
+        Raises:
+            ErrorIngesta: Si no se indicó la columna de clave o una fila no es válida
+        """
+        if self.clave is None:
+            raise ErrorIngesta("no se indicó la columna de clave")
+        return self._leer()
+    
+    def _leer(self):
+        if self.formato != "csv" or self.motor == "arrow":
+            return self._bloques_arrow()
+        # pyarrow convierte columnas enteras: para saltar filas sueltas se lee con el módulo csv
+        if self.motor == "auto" and isinstance(self.origen, str) and not self.omitir_errores and _hay_pyarrow():
+            return self._bloques_arrow()
+        return self._bloques_csv()
+    
+    def _bloques_csv(self):
+        try:
+            np = _numpy()
+        except ImportError:
+            np = None
+        if isinstance(self.origen, str):
+            archivo = open(self.origen, "r", encoding="utf-8", newline="")
+        else:
+            archivo = self.origen
+        try:
+            lector = csv.reader(archivo, delimiter=self.delimitador)
+            nombres = next(lector, None) if self.encabezado else None
+            numero = 1 if self.encabezado else 0
+            indices = self._resolver(nombres)
+            indice_clave = self._resolver_clave(nombres)
+            while True:
+                filas = list(islice(lector, self.filas_por_bloque))
+                if not filas:
+                    return
+                ticks, validas = self._convertir_filas(np, filas, indices, numero)
+                numero += len(filas)
+                self.filas += len(ticks)
+                claves = None
+                if indice_clave is not None:
+                    try:
+                        claves = [fila[indice_clave] for fila in (filas if validas is None else validas)]
+                    except IndexError:
+                        raise ErrorIngesta(f"falta la columna de clave en el bloque de la línea {numero - len(filas) + 1}") from None
+                yield claves, ticks
+        finally:
+            if archivo is not self.origen:
+                archivo.close()
+    
+    def _convertir_filas(self, np, filas, indices, primera):
+        """
+        Convierte un bloque de filas de texto a ticks.
+        
+        Returns:
+            tuple: (ticks, filas válidas), con None en lugar de las filas si todas son válidas
+        """
+        if np is not None:
+            try:
+                columnas = [np.zeros(len(filas)) if i is None
+                            else np.array([fila[i] or 0 for fila in filas], dtype=np.float64)
+                            for i in indices]
+                return _ticks_columnas(np, columnas), None
+            except (ValueError, IndexError):
+                pass  # Hay filas no válidas: se convierte fila por fila para ubicarlas
+        ticks = []
+        validas = []
+        for numero, fila in enumerate(filas, primera + 1):
+            try:
+                ticks.append(_ticks_fila([0 if i is None else float(fila[i] or 0) for i in indices]))
+                validas.append(fila)
+            except (ValueError, IndexError):
+                if not self.omitir_errores:
+                    raise ErrorIngesta(f"línea {numero} no válida: {fila}") from None
+                self.omitidas += 1
+        validas = None if len(validas) == len(filas) else validas
+        return (ticks if np is None else np.array(ticks, dtype=np.int64)), validas
+    
+    def _bloques_arrow(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+        except ImportError:
+            raise ImportError(f"Leer {self.formato.upper()} requiere pyarrow (pip install pyarrow)") from None
+        np = _numpy()
+        
+        if self.formato == "parquet":
+            import pyarrow.parquet as pq
+            archivo = pq.ParquetFile(self.origen)
+            esquema = archivo.schema_arrow.names
+            indices = self._resolver(esquema)
+            indice_clave = self._resolver_clave(esquema)
+            pedidas = [esquema[i] for i in indices + [indice_clave] if i is not None]
+            lotes = archivo.iter_batches(batch_size=self.filas_por_bloque, columns=list(dict.fromkeys(pedidas)))
+        elif self.formato == "arrow":
+            import pyarrow.ipc
+            lector = pa.ipc.open_file(self.origen)
+            esquema = lector.schema.names
+            indices = self._resolver(esquema)
+            indice_clave = self._resolver_clave(esquema)
+            lotes = (lector.get_batch(i) for i in range(lector.num_record_batches))
+        else:
+            import pyarrow.csv
+            opciones_lectura = pa.csv.ReadOptions(autogenerate_column_names=not self.encabezado,
+                                                  block_size=max(1 << 20, self.filas_por_bloque * 32))
+            lotes = pa.csv.open_csv(self.origen, read_options=opciones_lectura,
+                                    parse_options=pa.csv.ParseOptions(delimiter=self.delimitador))
+            esquema = lotes.schema.names
+            indices = self._resolver(esquema if self.encabezado else None)
+            indice_clave = self._resolver_clave(esquema if self.encabezado else None)
+        # Las columnas se buscan por nombre: Parquet solo entrega las columnas pedidas
+        nombres = [None if i is None else esquema[i] for i in indices]
+        
+        for lote in lotes:
+            columnas = []
+            for nombre in nombres:
+                if nombre is None:
+                    columnas.append(np.zeros(lote.num_rows))
+                    continue
+                try:
+                    columna = pc.fill_null(lote.column(nombre).cast(pa.float64()), 0.0)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                    raise ErrorIngesta(f"columna '{nombre}' no numérica: {e}") from None
+                columnas.append(columna.to_numpy(zero_copy_only=False))
+            total = _total_columnas(np, columnas)
+            validas = np.abs(total) < _LIMITE_TICKS
+            claves = None if indice_clave is None else lote.column(esquema[indice_clave]).to_pylist()
+            if not validas.all():
+                if not self.omitir_errores:
+                    fila = self.filas + self.omitidas + int(np.argmin(validas)) + 1
+                    raise ErrorIngesta(f"fila {fila} no válida: valor no finito o fuera de rango")
+                self.omitidas += int(len(validas) - np.count_nonzero(validas))
+                total = total[validas]
+                if claves is not None:
+                    claves = [clave for clave, valida in zip(claves, validas.tolist()) if valida]
+            ticks = np.rint(total).astype(np.int64)
+            self.filas += len(ticks)
+            yield claves, ticks
+    
+    # Salidas
+    
+    def a_array(self):
+        """
+        Carga el archivo completo en un TiempoArray.
+        
+        Returns:
+            TiempoArray: Tiempos de todas las filas, en orden
+        """
+        np = _numpy()
+        bloques = [np.asarray(b, dtype=np.int64) for b in self.bloques()]
+        ticks = np.concatenate(bloques) if bloques else np.empty(0, dtype=np.int64)
+        return TiempoArray._desde_ticks(ticks)
+    
+    def reducir(self, acumulador=None):
+        """
+        Reduce el archivo en streaming (conteo, suma, media, mínimo, máximo, ...).
+        
+        Args:
+            acumulador (AcumuladorTiempo): Acumulador donde agregar (por defecto, uno nuevo)
+            
+        Returns:
+            AcumuladorTiempo: El acumulador con todas las filas
+        """
+        acumulador = AcumuladorTiempo() if acumulador is None else acumulador
+        for ticks in self.bloques():
+            acumulador.agregar_ticks(ticks)
+        return acumulador
+
+
+def _hay_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def cargar_array(origen, **opciones):
+    """
+    Carga un archivo de componentes en un TiempoArray (ver Ingesta).
+    
+    Returns:
+        TiempoArray: Tiempos de todas las filas
+    """
+    return Ingesta(origen, **opciones).a_array()
+
+
+def reducir(origen, acumulador=None, **opciones):
+    """
+    Reduce un archivo de componentes en streaming (ver Ingesta).
+    
+    Returns:
+        AcumuladorTiempo: Estadísticas de todas las filas
+    """
+    return Ingesta(origen, **opciones).reducir(acumulador)
+
+
+def _mapeo(texto):
+    """Convierte "años=anios,horas=3" en {"años": "anios", "horas": 3}."""
+    mapeo = {}
+    for par in filter(None, (p.strip() for p in texto.split(","))):
+        componente, separador, columna = par.partition("=")
+        if not separador:
+            raise argparse.ArgumentTypeError(f"se esperaba componente=columna en '{par}'")
+        componente = UNIDADES.get(componente.strip().lower(), componente.strip())
+        mapeo[componente] = int(columna) if columna.strip().isdigit() else columna.strip()
+    return mapeo
+
+
+def main(argv=None):
+    """Punto de entrada de la ingesta."""
+    parser = argparse.ArgumentParser(description="Ingesta masiva de tiempos desde CSV, Parquet o Arrow")
+    parser.add_argument("archivo", help="archivo de entrada ('-' para CSV por stdin)")
+    parser.add_argument("--columnas", type=_mapeo, help="mapeo componente=columna, por ejemplo 'años=anios,horas=hs'")
+    parser.add_argument("--formato", choices=FORMATOS, help="formato del archivo (por defecto, según la extensión)")
+    parser.add_argument("--delimitador", default=",", help="separador de campos del CSV")
+    parser.add_argument("--sin-encabezado", action="store_true", help="el CSV no tiene fila de encabezado")
+    parser.add_argument("--bloque", type=int, default=FILAS_POR_BLOQUE, help="filas por bloque")
+    parser.add_argument("--omitir-errores", action="store_true", help="saltar las filas no válidas")
+    args = parser.parse_args(argv)
+    
+    try:
+        ingesta = Ingesta(sys.stdin if args.archivo == "-" else args.archivo, args.columnas, args.formato,
+                          args.bloque, args.delimitador, not args.sin_encabezado, args.omitir_errores)
+        total = ingesta.reducir()
+    except (ErrorIngesta, ImportError, OSError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    print(f"Conteo: {total.conteo}")
+    print(f"Suma: {total.suma}")
+    print(f"Media: {total.media}")
+    print(f"Mínimo: {total.minimo}")
+    print(f"Máximo: {total.maximo}")
+    print(f"Filas omitidas: {ingesta.omitidas}")
+    return 1 if ingesta.omitidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+"""
+Instrumentación de rutas calientes
+==================================
+Contadores e histogramas de latencia para los métodos de `Tiempo` y los
+manejadores de la app de escritorio, sin costo cuando está desactivada: los
+métodos se envuelven solo al activarla y se restauran al terminar. Cada
+método medido acumula conteo, tiempo total, mínimo, máximo e histograma en
+potencias de dos (en nanosegundos), de donde salen p50, p90 y p99
+aproximados. Opcionalmente se puede perfilar con cProfile o con un
+muestreador de pilas que no modifica el código.
+
+Se activa con variables de entorno (el informe JSON se escribe al salir):
+    CALCTIME_INSTRUMENTAR=stats.json    (o "1" para escribirlo en stderr)
+    CALCTIME_PERFIL=calctime.prof       (cProfile del hilo principal)
+    CALCTIME_MUESTREO=5                 (muestra las pilas cada 5 ms)
+
+O con un gestor de contexto:
+    with medir("stats.json") as metricas:
+        ...
+    print(metricas.estadisticas()["metodos"]["Tiempo.__str__"]["p99_ns"])
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Métodos que se miden por defecto
+METODOS_TIEMPO = ("__init__", "_desde_ticks", "obtener_componentes", "__str__", "formatear",
+                  "__add__", "__sub__", "__mul__", "__truediv__", "__radd__", "__rmul__",
+                  "__eq__", "__lt__", "__le__", "__gt__", "__ge__")
+METODOS_GUI = ("handle_input", "calculate", "update_ui", "save_data", "load_data", "load_history")
+
+CUBETAS = 64
+
+_candado = threading.Lock()
+_metricas = {}
+_originales = {}
+_activa = False
+_sesion = None
+_salida = None
+_registrado = False
+
+
+class Histograma:
+    """Conteo, total, extremos e histograma logarítmico de las latencias de un método."""
+    
+    __slots__ = ("conteo", "total", "minimo", "maximo", "cubetas")
+    
+    def __init__(self):
+        self.conteo = 0
+        self.total = 0
+        self.minimo = None
+        self.maximo = 0
+        self.cubetas = [0] * CUBETAS
+    
+    def registrar(self, ns):
+        """Registra una latencia en nanosegundos (cubeta i: hasta 2**i - 1 ns)."""
+        with _candado:
+            self.conteo += 1
+            self.total += ns
+            if self.minimo is None or ns < self.minimo:
+                self.minimo = ns
+            if ns > self.maximo:
+                self.maximo = ns
+            self.cubetas[min(ns.bit_length(), CUBETAS - 1)] += 1
+    
+    def percentil(self, p):
+        """
+        Percentil aproximado (límite superior de su cubeta, acotado por el máximo).
+        
+        Args:
+            p (float): Percentil entre 0 y 100
+            
+        Returns:
+            int: Latencia en nanosegundos (0 si no hay registros)
+        """
+        if not self.conteo:
+            return 0
+        objetivo = max(1, round(self.conteo * p / 100))
+        acumulado = 0
+        for i, cantidad in enumerate(self.cubetas):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return min((1 << i) - 1, self.maximo)
+        return self.maximo
+    
+    def a_dict(self):
+        """dict: Resumen serializable a JSON."""
+        return {
+            "conteo": self.conteo,
+            "total_ns": self.total,
+            "media_ns": self.total / self.conteo if self.conteo else 0,
+            "minimo_ns": self.minimo or 0,
+            "maximo_ns": self.maximo,
+            "p50_ns": self.percentil(50),
+            "p90_ns": self.percentil(90),
+            "p99_ns": self.percentil(99),
+            "histograma": {f"<{1 << i}": cantidad for i, cantidad in enumerate(self.cubetas) if cantidad},
+        }
+
+
+class Muestreador(threading.Thread):
+    """Hilo que toma la función en ejecución de los demás hilos a intervalos regulares."""
+    
+    def __init__(self, intervalo=0.005):
+        """
+        Args:
+            intervalo (float): Segundos entre muestras
+        """
+        super().__init__(name="calctime-muestreador", daemon=True)
+        self.intervalo = intervalo
+        self.muestras = Counter()
+        self._detener = threading.Event()
+    
+    def run(self):
+        propio = threading.get_ident()
+        while not self._detener.wait(self.intervalo):
+            for hilo, marco in sys._current_frames().items():
+                if hilo != propio:
+                    codigo = marco.f_code
+                    self.muestras[f"{os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno}:{codigo.co_name}"] += 1
+    
+    def detener(self):
+        """Detiene el muestreo y espera al hilo."""
+        self._detener.set()
+        self.join()
+    
+    def a_dict(self, limite=50):
+        """dict: Funciones más muestreadas y su cantidad de muestras."""
+        return dict(self.muestras.most_common(limite))
+
+
+class Metricas:
+    """Sesión de medición: métricas por método y perfiladores opcionales."""
+    
+    def __init__(self, perfil=None, muestreo=None):
+        """
+        Args:
+            perfil (str): Archivo donde guardar el perfil de cProfile (None = sin cProfile)
+            muestreo (float): Segundos entre muestras de pila (None = sin muestreo)
+        """
+        self.ruta_perfil = perfil
+        self._perfil = None
+        self._muestreador = Muestreador(muestreo) if muestreo else None
+        self._inicio = None
+        self._duracion = None
+    
+    def iniciar(self):
+        self._inicio = time.perf_counter_ns()
+        if self.ruta_perfil:
+            import cProfile
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        if self._muestreador:
+            self._muestreador.start()
+    
+    def detener(self):
+        if self._duracion is not None:
+            return
+        self._duracion = time.perf_counter_ns() - self._inicio
+        if self._perfil:
+            self._perfil.disable()
+            self._perfil.dump_stats(self.ruta_perfil)
+        if self._muestreador:
+            self._muestreador.detener()
+    
+    def estadisticas(self):
+        """
+        Resumen de la sesión.
+        
+        Returns:
+            dict: duracion_ns, metodos (nombre -> resumen de Histograma) y, si hubo muestreo, muestras
+        """
+        duracion = self._duracion if self._duracion is not None else time.perf_counter_ns() - self._inicio
+        resultado = {
+            "duracion_ns": duracion,
+            "metodos": {nombre: metrica.a_dict() for nombre, metrica in sorted(_metricas.items()) if metrica.conteo},
+        }
+        if self._muestreador:
+            resultado["muestras"] = self._muestreador.a_dict()
+        if self.ruta_perfil:
+            resultado["perfil"] = self.ruta_perfil
+        return resultado
+    
+    def volcar(self, salida):
+        """
+        Escribe las estadísticas en JSON.
+        
+        Args:
+            salida (str/file): Ruta o flujo; "1" o "-" escriben en stderr
+        """
+        texto = json.dumps(self.estadisticas(), ensure_ascii=False, indent=2) + "\n"
+        if hasattr(salida, "write"):
+            salida.write(texto)
+        elif salida in ("1", "-"):
+            sys.stderr.write(texto)
+        else:
+            with open(salida, "w", encoding="utf-8") as f:
+                f.write(texto)
+
+
+def activa():
+    """bool: Si la instrumentación está activa."""
+    return _activa
+
+
+def _metrica(nombre):
+    metrica = _metricas.get(nombre)
+    if metrica is None:
+        metrica = _metricas.setdefault(nombre, Histograma())
+    return metrica
+
+
+def _envolver(funcion, nombre):
+    metrica = _metrica(nombre)
+    reloj = time.perf_counter_ns
+    
+    @functools.wraps(funcion)
+    def medida(*args, **kwargs):
+        inicio = reloj()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            metrica.registrar(reloj() - inicio)
+    
+    return medida
+
+
+def instrumentar(clase, metodos):
+    """
+    Envuelve métodos de una clase para medirlos (sin efecto si la instrumentación no está activa).
+    
+    Los métodos se registran como "Clase.método"; los que la clase hereda se
+    miden bajo el nombre de la clase que los define. Instrumentar dos veces
+    el mismo método no lo envuelve de nuevo.
+    
+    Args:
+        clase (type): Clase a instrumentar
+        metodos (iterable): Nombres de los métodos
+    """
+    if not _activa:
+        return
+    for nombre in metodos:
+        duenia = next((c for c in clase.__mro__ if nombre in c.__dict__), None)
+        if duenia is None or (duenia, nombre) in _originales:
+            continue
+        original = duenia.__dict__[nombre]
+        etiqueta = f"{duenia.__name__}.{nombre}"
+        if isinstance(original, classmethod):
+            envuelto = classmethod(_envolver(original.__func__, etiqueta))
+        elif isinstance(original, staticmethod):
+            envuelto = staticmethod(_envolver(original.__func__, etiqueta))
+        else:
+            envuelto = _envolver(original, etiqueta)
+        _originales[(duenia, nombre)] = original
+        setattr(duenia, nombre, envuelto)
+
+
+def restaurar():
+    """Restaura los métodos originales de todas las clases instrumentadas."""
+    for (clase, nombre), original in _originales.items():
+        setattr(clase, nombre, original)
+    _originales.clear()
+
+
+def activar(salida=None, perfil=None, muestreo=None):
+    """
+    Inicia una sesión de medición (solo la primera llamada tiene efecto).
+    
+    Args:
+        salida (str/file): Dónde escribir el JSON al salir del programa (None = no escribirlo)
+        perfil (str): Archivo para el perfil de cProfile
+        muestreo (float): Segundos entre muestras de pila
+        
+    Returns:
+        Metricas: La sesión activa
+    """
+    global _activa, _sesion, _salida, _registrado
+    if _activa:
+        return _sesion
+    _metricas.clear()
+    _sesion = Metricas(perfil, muestreo)
+    _sesion.iniciar()
+    _activa, _salida = True, salida
+    # Un solo manejador para todas las sesiones: solo actúa sobre la que siga activa al salir
+    if not _registrado:
+        atexit.register(_al_salir)
+        _registrado = True
+    return _sesion
+
+
+def _al_salir():
+    sesion, salida = _sesion, _salida
+    if sesion is None:
+        return
+    sesion.detener()
+    if salida is not None:
+        sesion.volcar(salida)
+
+
+def desactivar():
+    """
+    Termina la sesión: detiene los perfiladores y restaura los métodos.
+    
+    Returns:
+        Metricas: La sesión terminada (None si no había una activa)
+    """
+    global _activa, _sesion, _salida
+    sesion = _sesion
+    if sesion is not None:
+        sesion.detener()
+    restaurar()
+    _activa, _sesion, _salida = False, None, None
+    return sesion
+
+
+def activar_desde_entorno():
+    """
+    Activa la instrumentación según CALCTIME_INSTRUMENTAR, CALCTIME_PERFIL y CALCTIME_MUESTREO.
+    
+    Returns:
+        bool: Si quedó activa
+    """
+    salida = os.environ.get("CALCTIME_INSTRUMENTAR")
+    perfil = os.environ.get("CALCTIME_PERFIL")
+    muestreo = os.environ.get("CALCTIME_MUESTREO")
+    if muestreo:
+        try:
+            muestreo = float(muestreo) / 1000
+            if not muestreo > 0:
+                raise ValueError(muestreo)
+        except ValueError:
+            print(f"⚠️  CALCTIME_MUESTREO='{os.environ['CALCTIME_MUESTREO']}' no es un intervalo en ms válido: se ignora",
+                  file=sys.stderr)
+            muestreo = None
+    if not (salida or perfil or muestreo):
+        return False
+    activar(salida or None, perfil or None, muestreo or None)
+    return True
+
+
+@contextmanager
+def medir(salida=None, perfil=None, muestreo=None, objetivos=()):
+    """
+    Mide los métodos de `Tiempo` (y de otros objetivos) dentro del bloque.
+    
+    Args:
+        salida (str/file): Dónde escribir el JSON al terminar (None = no escribirlo)
+        perfil (str): Archivo para el perfil de cProfile
+        muestreo (float): Segundos entre muestras de pila
+        objetivos (iterable): Pares (clase, métodos) adicionales a instrumentar
+    
+    Yields:
+        Metricas: La sesión, con `estadisticas()` disponible durante y después del bloque
+    """
+    from calctime import Tiempo
+    # Dentro de una sesión ya activa (por ejemplo, desde el entorno) solo se agregan los objetivos
+    propia = not _activa
+    sesion = activar(perfil=perfil, muestreo=muestreo)
+    instrumentar(Tiempo, METODOS_TIEMPO)
+    for clase, metodos in objetivos:
+        instrumentar(clase, metodos)
+    try:
+        yield sesion
+    finally:
+        if propia:
+            desactivar()
+        if salida is not None:
+            sesion.volcar(salida)
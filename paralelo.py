@@ -0,0 +1,190 @@
+"""
+Evaluación paralela de archivos grandes de tiempos y operaciones
+================================================================
+Divide un archivo del modo por lotes (una operación o un tiempo por línea,
+ver `calctime.evaluar_linea`) en bloques de líneas y los evalúa en un
+`concurrent.futures.ProcessPoolExecutor`, esquivando el GIL. Los resultados
+parciales se combinan siempre en el orden de los bloques, por lo que la
+salida es determinista sin importar qué proceso termine primero:
+
+- Por fila: un resultado por línea, en el mismo orden que la entrada.
+- Reducido: un único AcumuladorTiempo (suma, media, mínimo, máximo, ...).
+
+Solo se mantiene en vuelo una ventana acotada de bloques, así que la memoria
+no depende del tamaño del archivo.
+
+Uso:
+    python paralelo.py operaciones.txt --jobs 8 > resultados.txt
+    python paralelo.py operaciones.txt --jobs 8 --reducir
+"""
+
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from calctime import AcumuladorTiempo, FORMATOS_LOTE, evaluar_linea, procesar_lote
+
+LINEAS_POR_BLOQUE = 20000
+
+
+def leer_bloques(lineas, lineas_por_bloque=LINEAS_POR_BLOQUE):
+    """
+    Agrupa un flujo de líneas en bloques de tamaño fijo.
+    
+    Args:
+        lineas (iterable): Líneas de entrada
+        lineas_por_bloque (int): Líneas por bloque
+    
+    Yields:
+        list: Bloque de líneas
+    """
+    lineas = iter(lineas)
+    while True:
+        bloque = list(islice(lineas, lineas_por_bloque))
+        if not bloque:
+            return
+        yield bloque
+
+
+def evaluar_bloque(lineas, formato="texto"):
+    """
+    Evalúa un bloque de líneas (se ejecuta en un proceso trabajador).
+    
+    Args:
+        lineas (list): Líneas del bloque
+        formato (str): Formato de salida (ver calctime.formatear_resultado_lote)
+        
+    Returns:
+        list: Resultados formateados, en orden
+    """
+    return list(procesar_lote(lineas, formato))
+
+
+def reducir_bloque(lineas):
+    """
+    Evalúa un bloque de líneas y lo reduce a estadísticas (se ejecuta en un proceso trabajador).
+    
+    Args:
+        lineas (list): Líneas del bloque
+        
+    Returns:
+        tuple: (AcumuladorTiempo, cantidad de líneas con error)
+    """
+    acumulador = AcumuladorTiempo()
+    errores = 0
+    for linea in lineas:
+        linea = linea.strip()
+        if not linea or linea.startswith("#"):
+            continue
+        try:
+            acumulador.agregar(evaluar_linea(linea))
+        except (ValueError, ArithmeticError):
+            errores += 1
+    return acumulador, errores
+
+
+def _mapear_en_orden(executor, funcion, bloques, *args, en_vuelo):
+    """
+    Como executor.map, pero con una ventana acotada de bloques pendientes.
+    
+    Args:
+        executor (Executor): Pool de procesos
+        funcion (callable): Función a aplicar a cada bloque
+        bloques (iterable): Bloques de entrada (se consumen de forma perezosa)
+        *args: Argumentos adicionales para la función
+        en_vuelo (int): Máximo de bloques enviados sin recoger
+    
+    Yields:
+        Resultado de cada bloque, en el orden de entrada
+    """
+    pendientes = deque()
+    for bloque in bloques:
+        pendientes.append(executor.submit(funcion, bloque, *args))
+        if len(pendientes) >= en_vuelo:
+            yield pendientes.popleft().result()
+    while pendientes:
+        yield pendientes.popleft().result()
+
+
+def evaluar_paralelo(lineas, salida, trabajadores=None, lineas_por_bloque=LINEAS_POR_BLOQUE, formato="texto"):
+    """
+    Evalúa un flujo de líneas en paralelo y escribe un resultado por línea, en orden.
+    
+    Args:
+        lineas (iterable): Líneas de entrada
+        salida (file): Flujo de salida
+        trabajadores (int): Procesos del pool (por defecto, núcleos disponibles)
+        lineas_por_bloque (int): Líneas por bloque
+        formato (str): Formato de salida
+        
+    Returns:
+        int: Cantidad de líneas con error
+    """
+    trabajadores = trabajadores or os.cpu_count() or 1
+    bloques = leer_bloques(lineas, lineas_por_bloque)
+    errores = 0
+    with ProcessPoolExecutor(max_workers=trabajadores) as executor:
+        for resultados in _mapear_en_orden(executor, evaluar_bloque, bloques, formato, en_vuelo=2 * trabajadores):
+            errores += sum(1 for r in resultados if r.startswith("ERROR:"))
+            salida.write("\n".join(resultados))
+            if resultados:
+                salida.write("\n")
+    return errores
+
+
+def reducir_paralelo(lineas, trabajadores=None, lineas_por_bloque=LINEAS_POR_BLOQUE):
+    """
+    Evalúa un flujo de líneas en paralelo y reduce todos los resultados.
+    
+    Los acumuladores parciales se fusionan en el orden de los bloques, de modo
+    que el resultado es el mismo en cada ejecución.
+    
+    Args:
+        lineas (iterable): Líneas de entrada
+        trabajadores (int): Procesos del pool (por defecto, núcleos disponibles)
+        lineas_por_bloque (int): Líneas por bloque
+        
+    Returns:
+        tuple: (AcumuladorTiempo, cantidad de líneas con error)
+    """
+    trabajadores = trabajadores or os.cpu_count() or 1
+    bloques = leer_bloques(lineas, lineas_por_bloque)
+    total = AcumuladorTiempo()
+    errores = 0
+    with ProcessPoolExecutor(max_workers=trabajadores) as executor:
+        for parcial, errores_bloque in _mapear_en_orden(executor, reducir_bloque, bloques, en_vuelo=2 * trabajadores):
+            total.fusionar(parcial)
+            errores += errores_bloque
+    return total, errores
+
+
+def main(argv=None):
+    """Punto de entrada de la evaluación paralela."""
+    parser = argparse.ArgumentParser(description="Evaluación paralela de archivos del modo por lotes")
+    parser.add_argument("archivo", help="archivo con una operación por línea ('-' para stdin)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="procesos trabajadores")
+    parser.add_argument("--bloque", type=int, default=LINEAS_POR_BLOQUE, help="líneas por bloque")
+    parser.add_argument("--formato", choices=FORMATOS_LOTE, default="texto", help="formato de salida por fila")
+    parser.add_argument("--reducir", action="store_true", help="imprime solo las estadísticas totales")
+    args = parser.parse_args(argv)
+    
+    entrada = sys.stdin if args.archivo == "-" else open(args.archivo, "r", encoding="utf-8")
+    with entrada:
+        if args.reducir:
+            total, errores = reducir_paralelo(entrada, args.jobs, args.bloque)
+            print(f"Conteo: {total.conteo}")
+            print(f"Suma: {total.suma}")
+            print(f"Media: {total.media}")
+            print(f"Mínimo: {total.minimo}")
+            print(f"Máximo: {total.maximo}")
+            print(f"Errores: {errores}")
+        else:
+            errores = evaluar_paralelo(entrada, sys.stdout, args.jobs, args.bloque, args.formato)
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Protocolo JSON de CalcTime
+==========================
+Traduce peticiones JSON a operaciones de `Tiempo` y sus resultados a JSON.
+Lo comparten el demonio local (demonio.py) y la API HTTP, de modo que
+ningún cliente necesita reimplementar las constantes de conversión.
+
+Petición:
+    {"id": 1, "op": "sumar", "a": {"años": 2, "meses": 5}, "b": "1y 3m"}
+
+Respuesta:
+    {"id": 1, "ok": true, "resultado": {"horas": 30960.0,
+     "componentes": [3, 8, 0, 0], "texto": "3 años, 8 meses"}}
+
+Un tiempo puede escribirse como objeto con componentes (años, meses, dias,
+horas, minutos), como número de horas o como expresión de duración
+("2y 5m 10d"). Un error se responde con {"ok": false, "error": "..."}
+sin interrumpir el resto de las peticiones. Una lista de peticiones se
+responde con una lista de respuestas, en el mismo orden.
+
+Operaciones: ping, sumar, restar, multiplicar, dividir, comparar,
+formatear, evaluar (expresiones con variables) y lote (una línea del modo
+por lotes).
+"""
+
+import json
+
+from calctime import FORMATOS_TIEMPO, Tiempo, evaluar_linea, formatear
+from expresiones import evaluar
+
+COMPONENTES = ("años", "meses", "dias", "horas", "minutos")
+
+
+class ErrorProtocolo(ValueError):
+    """Petición mal formada o con valores no válidos."""
+
+
+def tiempo_desde_json(valor):
+    """
+    Convierte un valor JSON a Tiempo.
+    
+    Args:
+        valor (dict/int/float/str): Componentes, horas o expresión de duración
+        
+    Returns:
+        Tiempo: Tiempo equivalente
+        
+    Raises:
+        ErrorProtocolo: Si el valor no representa un tiempo
+    """
+    if isinstance(valor, dict):
+        desconocidos = set(valor) - set(COMPONENTES)
+        if desconocidos:
+            raise ErrorProtocolo(f"componentes desconocidos: {', '.join(sorted(desconocidos))}")
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in valor.values()):
+            raise ErrorProtocolo("los componentes deben ser números")
+        return Tiempo(**valor)
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return Tiempo(horas=valor)
+    if isinstance(valor, str):
+        resultado = evaluar(valor)
+        if isinstance(resultado, Tiempo):
+            return resultado
+        raise ErrorProtocolo(f"'{valor}' no es un tiempo")
+    raise ErrorProtocolo(f"valor no válido para un tiempo: {valor!r}")
+
+
+def resultado_a_json(resultado, formato="texto"):
+    """
+    Convierte un resultado (Tiempo o número) a un valor JSON.
+    
+    Args:
+        resultado (Tiempo/int/float/bool): Resultado de una operación
+        formato (str): Formato del campo "texto" (ver calctime.FORMATOS_TIEMPO)
+        
+    Returns:
+        dict/int/float/bool: Tiempo como {"horas", "componentes", "texto"} o el número tal cual
+    """
+    if isinstance(resultado, Tiempo):
+        return {"horas": resultado._horas_totales, "componentes": list(resultado.obtener_componentes()),
+                "texto": formatear(resultado, formato)}
+    return resultado
+
+
+def _campo(peticion, nombre):
+    try:
+        return peticion[nombre]
+    except KeyError:
+        raise ErrorProtocolo(f"falta el campo '{nombre}'") from None
+
+
+def _escalar(peticion):
+    escalar = _campo(peticion, "escalar")
+    if not isinstance(escalar, (int, float)) or isinstance(escalar, bool):
+        raise ErrorProtocolo("'escalar' debe ser un número")
+    return escalar
+
+
+def _comparar(peticion):
+    a = tiempo_desde_json(_campo(peticion, "a"))
+    b = tiempo_desde_json(_campo(peticion, "b"))
+    return (a > b) - (a < b)
+
+
+def _evaluar(peticion):
+    expresion = _campo(peticion, "expr")
+    if not isinstance(expresion, str):
+        raise ErrorProtocolo("'expr' debe ser un texto")
+    variables = peticion.get("variables") or {}
+    if not isinstance(variables, dict):
+        raise ErrorProtocolo("'variables' debe ser un objeto")
+    valores = {nombre: v if isinstance(v, (int, float)) and not isinstance(v, bool) else tiempo_desde_json(v)
+               for nombre, v in variables.items()}
+    return evaluar(expresion, valores)
+
+
+def _lote(peticion):
+    linea = _campo(peticion, "linea")
+    if not isinstance(linea, str):
+        raise ErrorProtocolo("'linea' debe ser un texto")
+    return evaluar_linea(linea)
+
+
+OPERACIONES = {
+    "ping": lambda p: "pong",
+    "sumar": lambda p: tiempo_desde_json(_campo(p, "a")) + tiempo_desde_json(_campo(p, "b")),
+    "restar": lambda p: tiempo_desde_json(_campo(p, "a")) - tiempo_desde_json(_campo(p, "b")),
+    "multiplicar": lambda p: tiempo_desde_json(_campo(p, "a")) * _escalar(p),
+    "dividir": lambda p: tiempo_desde_json(_campo(p, "a")) / _escalar(p),
+    "comparar": _comparar,
+    "formatear": lambda p: tiempo_desde_json(_campo(p, "tiempo")),
+    "evaluar": _evaluar,
+    "lote": _lote,
+}
+
+
+def atender(peticion):
+    """
+    Atiende una petición ya decodificada. Nunca lanza excepciones.
+    
+    Args:
+        peticion (dict): Petición con "op" y los campos de la operación
+        
+    Returns:
+        dict: Respuesta con "ok" y "resultado" o "error" (y el "id" de la petición)
+    """
+    respuesta = {}
+    try:
+        if not isinstance(peticion, dict):
+            raise ErrorProtocolo("la petición debe ser un objeto JSON")
+        if "id" in peticion:
+            respuesta["id"] = peticion["id"]
+        op = _campo(peticion, "op")
+        try:
+            operacion = OPERACIONES[op]
+        except (KeyError, TypeError):
+            raise ErrorProtocolo(f"operación '{op}' desconocida") from None
+        formato = peticion.get("formato", "texto")
+        if formato not in FORMATOS_TIEMPO:
+            raise ErrorProtocolo(f"formato '{formato}' desconocido")
+        respuesta["ok"] = True
+        respuesta["resultado"] = resultado_a_json(operacion(peticion), formato)
+    except (ValueError, TypeError, ArithmeticError) as e:
+        respuesta.pop("resultado", None)
+        respuesta["ok"] = False
+        respuesta["error"] = str(e)
+    except RecursionError:
+        respuesta.pop("resultado", None)
+        respuesta["ok"] = False
+        respuesta["error"] = "la petición está demasiado anidada"
+    return respuesta
+
+
+def atender_documento(documento):
+    """
+    Atiende un documento JSON ya decodificado: una petición o una lista de peticiones.
+    
+    Args:
+        documento (dict/list): Petición o lista de peticiones
+        
+    Returns:
+        dict/list: Respuesta (lista, en el mismo orden, si la petición era una lista)
+    """
+    if isinstance(documento, list):
+        return [atender(p) for p in documento]
+    return atender(documento)
+
+
+def atender_json(datos):
+    """
+    Atiende un documento JSON: una petición o una lista de peticiones.
+    
+    Args:
+        datos (bytes/str): Documento JSON
+        
+    Returns:
+        str: Respuesta JSON en una sola línea (lista si la petición era una lista)
+    """
+    try:
+        peticion = json.loads(datos)
+    except ValueError as e:
+        return json.dumps({"ok": False, "error": f"JSON no válido: {e}"}, ensure_ascii=False)
+    except RecursionError:
+        return json.dumps({"ok": False, "error": "JSON no válido: demasiado anidado"}, ensure_ascii=False)
+    return json.dumps(atender_documento(peticion), ensure_ascii=False)
@@ -6,7 +6,7 @@ funcionen correctamente.
 """
 
 from unittest.mock import patch
-from calctime import Tiempo, obtener_entrada_numerica, seleccionar_opcion
+from calctime import Tiempo, TiempoArray, obtener_entrada_numerica, seleccionar_opcion
 
 
 def test_conversiones():
@@ -314,6 +314,1318 @@ def test_interfaz_limpieza():
     print("\n✅ La prueba de limpieza de pantalla pasó correctamente")
 
 
+def test_tiempo_array():
+    """Prueba las operaciones vectorizadas de TiempoArray."""
+    print("\n" + "="*60)
+    print("TEST 10: OPERACIONES VECTORIZADAS (TiempoArray)")
+    print("="*60)
+    
+    import calctime
+    try:
+        calctime._numpy()  # NumPy se importa de forma diferida: calctime.np puede seguir en None
+    except ImportError:
+        print("⚠️ NumPy no está instalado, se omite la prueba")
+        return
+    
+    arr = TiempoArray.desde_componentes(años=[2, 0, 3], meses=[5, 6, 8], dias=[10, 0, 20])
+    otros = TiempoArray.desde_tiempos([Tiempo(años=1, meses=3, dias=15), Tiempo(meses=8), Tiempo(años=1, meses=2, dias=5)])
+    assert len(arr) == 3, "Error: el arreglo debería tener 3 elementos"
+    
+    # Suma y resta elemento a elemento
+    suma = arr + otros
+    assert suma[0] == Tiempo(años=3, meses=8, dias=25), f"Error en suma vectorizada: {suma[0]}"
+    assert suma[1] == Tiempo(años=1, meses=2), f"Error en suma vectorizada: {suma[1]}"
+    resta = arr - otros
+    assert resta[2] == Tiempo(años=2, meses=6, dias=15), f"Error en resta vectorizada: {resta[2]}"
+    print("✅ Suma y resta elemento a elemento")
+    
+    # Operaciones con un Tiempo escalar
+    assert (Tiempo(años=1) + arr)[1] == Tiempo(años=1, meses=6), "Error: Tiempo + TiempoArray"
+    assert (arr - Tiempo(meses=6))[1] == Tiempo(), "Error: TiempoArray - Tiempo"
+    print("✅ Difusión con objetos Tiempo")
+    
+    # Multiplicación y división
+    assert (arr * 2)[1] == Tiempo(años=1), "Error en multiplicación vectorizada"
+    assert (2 * arr)[1] == Tiempo(años=1), "Error en multiplicación inversa vectorizada"
+    assert (arr / 2)[1] == Tiempo(meses=3), "Error en división vectorizada"
+    try:
+        arr / 0
+        assert False, "Error: debería lanzar ZeroDivisionError"
+    except ZeroDivisionError:
+        print("✅ Multiplicación, división y división por cero")
+    
+    # Comparaciones devuelven máscaras
+    assert list(arr > otros) == [True, False, True], "Error en comparación vectorizada"
+    assert list(arr <= Tiempo(meses=6)) == [False, True, False], "Error en <= vectorizado"
+    # Con el Tiempo a la izquierda se usa el método reflejado de TiempoArray
+    seis_meses = Tiempo(meses=6)
+    assert list(seis_meses < arr) == [True, False, True], "Error en Tiempo < TiempoArray"
+    assert list(seis_meses >= arr) == [False, True, False], "Error en Tiempo >= TiempoArray"
+    assert list(seis_meses == arr) == [False, True, False], "Error en Tiempo == TiempoArray"
+    assert list(seis_meses != arr) == [True, False, True], "Error en Tiempo != TiempoArray"
+    print("✅ Comparaciones vectorizadas")
+    
+    # Componentes vectorizados, incluidos negativos
+    años, meses, dias, horas = (arr - otros).obtener_componentes()
+    assert list(años) == [1, 0, 2] and list(meses) == [1, -2, 6] and list(dias) == [25, 0, 15], "Error en componentes"
+    for i, t in enumerate(arr - otros):
+        assert t.obtener_componentes() == (años[i], meses[i], dias[i], horas[i]), "Error: componentes distintos a Tiempo"
+    print("✅ obtener_componentes vectorizado coincide con Tiempo")
+    
+    assert arr.total() == Tiempo(años=5, meses=19, dias=30), "Error en total"
+    print("✅ Total del arreglo")
+    
+    print("\n✅ Todas las pruebas de TiempoArray pasaron correctamente")
+
+
+def test_precision_exacta():
+    """Prueba el almacenamiento entero en ticks y la representación compacta."""
+    print("\n" + "="*60)
+    print("TEST 11: PRECISIÓN EXACTA Y REPRESENTACIÓN COMPACTA")
+    print("="*60)
+    
+    # Sin __dict__ por instancia
+    t1 = Tiempo(años=1)
+    assert not hasattr(t1, "__dict__"), "Error: Tiempo debería usar __slots__"
+    assert isinstance(t1._ticks, int), "Error: los ticks deberían ser enteros"
+    print("✅ Tiempo usa __slots__ con ticks enteros")
+    
+    # Acumulación larga sin deriva
+    acumulado = Tiempo()
+    decima = Tiempo(horas=0.1)
+    for _ in range(100000):
+        acumulado = acumulado + decima
+    assert acumulado == Tiempo(horas=10000), f"Error: deriva en la acumulación ({acumulado!r})"
+    print("✅ 100.000 sumas de 0.1 horas = 10.000 horas exactas")
+    
+    # Minutos y compatibilidad con _horas_totales
+    t2 = Tiempo(horas=1, minutos=30)
+    assert t2._horas_totales == 1.5, "Error: 1 hora 30 minutos debería ser 1.5 horas"
+    t2._horas_totales += 0.5
+    assert t2 == Tiempo(horas=2), "Error: asignar _horas_totales debería actualizar los ticks"
+    print("✅ Minutos y asignación de _horas_totales")
+    
+    # Resolución configurable por subclase
+    class TiempoMinutos(Tiempo):
+        __slots__ = ()
+        TICKS_POR_HORA = 60
+    
+    t3 = TiempoMinutos(dias=1, minutos=15)
+    assert t3._ticks == 24 * 60 + 15, f"Error: esperado {24 * 60 + 15} minutos, obtenido {t3._ticks}"
+    assert t3 == Tiempo(dias=1, minutos=15), "Error: igualdad entre resoluciones distintas"
+    assert isinstance(t3 + Tiempo(horas=1), TiempoMinutos), "Error: el resultado debería conservar la clase"
+    assert Tiempo(dias=1) < t3 <= Tiempo(dias=1, minutos=15), "Error en comparación entre resoluciones"
+    print("✅ Resolución configurable (minutos) compatible con la resolución por defecto")
+    
+    # Valores no finitos: ValueError en lugar de OverflowError
+    for crear in (lambda: Tiempo(horas=float("inf")), lambda: Tiempo(dias=float("nan")),
+                  lambda: Tiempo(dias=1) * 1e308, lambda: Tiempo(dias=1) / 1e-320):
+        try:
+            crear()
+            assert False, "Error: un tiempo no finito debería lanzar ValueError"
+        except ValueError:
+            pass
+    print("✅ Tiempos infinitos o NaN se rechazan con ValueError")
+    
+    print("\n✅ Todas las pruebas de precisión pasaron correctamente")
+
+
+def test_modo_lote():
+    """Prueba el modo por lotes no interactivo."""
+    print("\n" + "="*60)
+    print("TEST 12: MODO POR LOTES (--batch)")
+    print("="*60)
+    
+    import io
+    from calctime import evaluar_linea, procesar_lote, cli
+    
+    # Evaluación de izquierda a derecha
+    assert evaluar_linea("2,5,10,0 + 1,3,15,0") == Tiempo(años=3, meses=8, dias=25), "Error en suma por lotes"
+    assert evaluar_linea("1,6 * 2") == Tiempo(años=3), "Error: componentes omitidos o multiplicación"
+    assert evaluar_linea("3,8,20 - 1,2,5 / 2") == Tiempo(años=1, meses=3, dias=7, horas=12), "Error en encadenamiento"
+    print("✅ evaluar_linea encadena operaciones de izquierda a derecha")
+    
+    # Generador perezoso: conserva el orden, omite comentarios y reporta errores
+    entrada = ["# comentario", "4,8 / 2", "", "1,0,0,0 / 0", "1 ^ 2", "1,0,0,0 * 1e400", "0,0,0,36"]
+    resultados = list(procesar_lote(iter(entrada)))
+    assert resultados[0] == "2 años, 4 meses", f"Error: obtenido {resultados[0]}"
+    assert all(r.startswith("ERROR:") for r in resultados[1:4]), "Error: se esperaban errores"
+    assert resultados[4] == "1 día, 12 horas", f"Error: obtenido {resultados[4]}"
+    print("✅ procesar_lote conserva el orden y reporta errores por línea")
+    
+    # Punto de entrada con stdin, sin limpiar pantalla ni pedir input()
+    with patch('sys.stdin', io.StringIO("1,6 * 2\n0,0,20 + 0,0,15\n")), \
+         patch('sys.stdout', new_callable=io.StringIO) as salida, \
+         patch('os.system') as mock_system, patch('builtins.input') as mock_input:
+        codigo = cli(["--batch", "-", "--formato", "componentes"])
+    assert codigo == 0, "Error: el código de salida debería ser 0"
+    assert salida.getvalue() == "3,0,0,0\n0,1,5,0\n", f"Error: salida inesperada {salida.getvalue()!r}"
+    mock_system.assert_not_called()
+    mock_input.assert_not_called()
+    print("✅ cli --batch procesa stdin sin interacción")
+    
+    print("\n✅ Todas las pruebas del modo por lotes pasaron correctamente")
+
+
+def test_expresiones():
+    """Prueba el lenguaje de expresiones de duración y su caché."""
+    print("\n" + "="*60)
+    print("TEST 13: EXPRESIONES DE DURACIÓN")
+    print("="*60)
+    
+    from expresiones import evaluar, compilar, parsear, ErrorExpresion, Binario
+    
+    # Duraciones yuxtapuestas, precedencia y paréntesis
+    assert evaluar("2y 5m 10d + 1y 3m - 36h") == Tiempo(años=3, meses=8, dias=8, horas=12), "Error en suma/resta"
+    assert evaluar("(3d 4h) * 2.5") == Tiempo(dias=7, horas=22), "Error en paréntesis y multiplicación"
+    assert evaluar("1y + 6m * 2") == Tiempo(años=2), "Error: la multiplicación debe tener precedencia"
+    assert evaluar("-(1D 12H) + 2d") == Tiempo(horas=12), "Error en negación y unidades en mayúscula"
+    assert evaluar("90min / 2") == Tiempo(minutos=45), "Error en minutos"
+    assert isinstance(parsear("1y + 2m"), Binario), "Error: parsear debería devolver un AST"
+    print("✅ Sintaxis, precedencia y unidades")
+    
+    # Variables y caché de expresiones compiladas
+    compilar.cache_clear()
+    plantilla = "turno * dias_semana + 30min"
+    for horas in range(1, 6):
+        resultado = evaluar(plantilla, {"turno": Tiempo(horas=horas), "dias_semana": 5})
+    assert resultado == Tiempo(horas=25, minutos=30), f"Error en variables: {resultado}"
+    assert compilar(plantilla).variables == {"turno", "dias_semana"}, "Error en variables detectadas"
+    info = compilar.cache_info()
+    assert info.misses == 1 and info.hits == 5, f"Error: la plantilla debería compilarse una sola vez ({info})"
+    print("✅ Variables y caché LRU por texto de expresión")
+    
+    # Las constantes plegadas no se comparten entre evaluaciones
+    constante = evaluar("3d")
+    constante._horas_totales = 1
+    assert evaluar("3d") == Tiempo(dias=3) and evaluar("3d") is not evaluar("3d"), "Error: el resultado en caché se modificó"
+    print("✅ Cada evaluación de una constante devuelve un Tiempo nuevo")
+    
+    # Errores
+    for invalida in ["", "2y +", "3q", "(1d", "1d * 2d", "1d $", "x + 1d"]:
+        try:
+            evaluar(invalida)
+            assert False, f"Error: '{invalida}' debería ser inválida"
+        except ErrorExpresion:
+            pass
+    try:
+        evaluar("1y / 0")
+        assert False, "Error: debería lanzar ZeroDivisionError"
+    except ZeroDivisionError:
+        pass
+    print("✅ Errores de sintaxis, tipos, variables y división por cero")
+    
+    print("\n✅ Todas las pruebas de expresiones pasaron correctamente")
+
+
+def test_historial_diario():
+    """Prueba el diario de solo-anexado del historial de escritorio."""
+    print("\n" + "="*60)
+    print("TEST 14: HISTORIAL EN DIARIO DE SOLO-ANEXADO")
+    print("="*60)
+    
+    import os
+    import sys
+    import tempfile
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui_windows"))
+    from history_store import JournalHistoryStore
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "history.jsonl")
+        
+        # Migración del history.txt anterior (más reciente primero)
+        legado = os.path.join(carpeta, "history.txt")
+        with open(legado, "w", encoding="utf-8") as f:
+            f.write("[10:05] 2 años + 1 año = 3 años\n[10:00] 5 años + 3 años = 8 años\n")
+        store = JournalHistoryStore(ruta, legacy_path=legado, compact_threshold=3)
+        assert store.load() == 2, "Error: se esperaban 2 entradas migradas"
+        assert [h["timestamp"] for h in store.page(0, 10)] == ["10:05", "10:00"], "Error en la migración"
+        print("✅ Migración del history.txt anterior")
+        
+        # Cada cálculo agrega una sola línea
+        tamaño = os.path.getsize(ruta)
+        store.append({"timestamp": "10:10", "entry": "1 día + 1 día = 2 días"})
+        with open(ruta, "rb") as f:
+            f.seek(tamaño)
+            assert f.read().count(b"\n") == 1, "Error: append debería escribir una sola línea"
+        recargado = JournalHistoryStore(ruta)
+        recargado.load()
+        assert recargado.page(0, 1)[0]["timestamp"] == "10:10", "Error: falta la entrada agregada"
+        print("✅ Anexado de una línea por cálculo")
+        
+        # Recuperación ante una escritura interrumpida
+        with open(ruta, "ab") as f:
+            f.write(b'{"op": "add", "timestamp": "10:1')
+        recuperado = JournalHistoryStore(ruta).load()
+        assert recuperado == 3, f"Error: se esperaban 3 entradas, hay {recuperado}"
+        with open(ruta, "rb") as f:
+            assert f.read().endswith(b"\n"), "Error: la línea incompleta debería truncarse"
+        with open(ruta, "ab") as f:
+            f.write(b'{"op": "add", "timestamp": "10:20", "entry": "1 hora + 1 hora = 2 horas"}')
+        sin_salto = JournalHistoryStore(ruta)
+        assert sin_salto.load() == 4, "Error: un registro válido sin salto de línea debería conservarse"
+        sin_salto.append({"timestamp": "10:30", "entry": "2 horas + 1 hora = 3 horas"})
+        sin_salto.wait()
+        releido = JournalHistoryStore(ruta)
+        assert releido.load() == 5 and releido.page(0, 1)[0]["timestamp"] == "10:30", "Error: el append no debería corromper el registro anterior"
+        print("✅ Recuperación de escrituras interrumpidas")
+        
+        # Clear All + compactación en segundo plano
+        store.clear()
+        store.append({"timestamp": "11:00", "entry": "1 mes + 1 mes = 2 meses"})
+        store.wait()
+        with open(ruta, "rb") as f:
+            lineas = f.read().splitlines()
+        assert len(lineas) == 1 and b"11:00" in lineas[0], f"Error: el diario debería compactarse ({lineas})"
+        compactado = JournalHistoryStore(ruta)
+        compactado.load()
+        assert [h["timestamp"] for h in compactado.page(0, 10)] == ["11:00"], "Error tras compactar"
+        print("✅ Compactación tras limpiar el historial")
+    
+    print("\n✅ Todas las pruebas del diario de historial pasaron correctamente")
+
+
+def test_historial_sqlite():
+    """Prueba el historial estructurado en SQLite con consultas paginadas."""
+    print("\n" + "="*60)
+    print("TEST 15: HISTORIAL EN SQLITE")
+    print("="*60)
+    
+    import os
+    import sys
+    import tempfile
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui_windows"))
+    from history_store import open_history_store, SQLiteHistoryStore
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        # Importa el diario existente al crear la base de datos
+        diario = open_history_store(carpeta)
+        diario.load()
+        diario.append({"timestamp": "2026-01-01 08:00:00", "entry": "1 año + 1 año = 2 años", "operator": "+",
+                       "left_hours": 8640.0, "operand": 8640.0, "result_hours": 17280.0})
+        store = open_history_store(carpeta, "sqlite")
+        assert isinstance(store, SQLiteHistoryStore), "Error: debería abrirse el backend SQLite"
+        assert store.load() == 1, "Error: debería importar el diario existente"
+        
+        for i in range(1, 100):
+            operador = "+" if i % 3 else "×"
+            store.append({"timestamp": f"2026-01-{1 + i // 10:02d} {i % 24:02d}:00:00", "entry": f"cálculo {i}",
+                          "operator": operador, "left_hours": float(i), "operand": 2.0, "result_hours": float(i * 2)})
+        assert store.count() == 100, f"Error: se esperaban 100 entradas, hay {store.count()}"
+        print("✅ Importación del diario y entradas estructuradas")
+        
+        # Páginas de la más reciente a la más antigua
+        pagina = store.page(0, 10)
+        assert [h["entry"] for h in pagina[:2]] == ["cálculo 99", "cálculo 98"], "Error en el orden de la página"
+        assert store.page(95, 10)[-1]["entry"] == "1 año + 1 año = 2 años", "Error en la última página"
+        assert pagina[0]["result_hours"] == 198.0 and pagina[0]["operator"] == "×", "Error en campos estructurados"
+        print("✅ Consultas paginadas")
+        
+        # Filtros por operador y rango de fechas
+        assert store.count(operator="×") == 33, "Error en el filtro por operador"
+        rango = store.page(0, None, since="2026-01-02", until="2026-01-03")
+        assert [h["entry"] for h in rango] == [f"cálculo {i}" for i in range(19, 9, -1)], "Error en el filtro por rango"
+        print("✅ Filtros por operador y rango de fechas")
+        
+        store.clear()
+        assert store.count() == 0 and store.page() == [], "Error: el historial debería quedar vacío"
+        store.close()
+        print("✅ Limpieza del historial")
+    
+    print("\n✅ Todas las pruebas del historial SQLite pasaron correctamente")
+
+
+def test_historial_virtualizado():
+    """Prueba la ventana incremental del panel de historial."""
+    print("\n" + "="*60)
+    print("TEST 16: PANEL DE HISTORIAL VIRTUALIZADO")
+    print("="*60)
+    
+    import os
+    import sys
+    import tempfile
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui_windows"))
+    from history_store import JournalHistoryStore
+    from history_view import HistoryWindow
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        store = JournalHistoryStore(os.path.join(carpeta, "history.jsonl"))
+        store.load()
+        for i in range(10000):
+            store.append({"timestamp": f"{i}", "entry": f"cálculo {i}"})
+        
+        creadas = []
+        def crear_fila():
+            creadas.append({})
+            return creadas[-1]
+        ventana = HistoryWindow(store, crear_fila, lambda fila, item: fila.update(item), page_size=25)
+        
+        # Abrir el panel solo construye la primera página
+        filas = ventana.reset()
+        assert len(filas) == 25 and len(creadas) == 25, "Error: solo debería construirse la primera página"
+        assert filas[0]["entry"] == "cálculo 9999", "Error: la primera fila debería ser la más reciente"
+        print("✅ Abrir el panel construye solo la primera página")
+        
+        # El scroll cerca del final carga la siguiente página
+        assert not ventana.needs_more(pixels=100, max_scroll_extent=2000), "Error: no debería cargar todavía"
+        assert ventana.needs_more(pixels=1900, max_scroll_extent=2000), "Error: debería cargar la siguiente página"
+        nuevas = ventana.load_more()
+        assert len(nuevas) == 25 and nuevas[0]["entry"] == "cálculo 9974", "Error en la segunda página"
+        print("✅ Carga incremental al hacer scroll")
+        
+        # Reabrir reutiliza las filas existentes
+        store.append({"timestamp": "nuevo", "entry": "cálculo nuevo"})
+        filas = ventana.reset()
+        assert len(creadas) == 50, "Error: reabrir no debería crear filas nuevas"
+        assert filas[0]["entry"] == "cálculo nuevo" and ventana.visible_rows() == filas, "Error al reutilizar filas"
+        print("✅ Las filas se reutilizan entre aperturas")
+        
+        # Historial corto: se marca como agotado
+        store.clear()
+        store.append({"timestamp": "0", "entry": "único"})
+        assert len(ventana.reset()) == 1 and ventana.exhausted, "Error: el historial debería quedar agotado"
+        assert ventana.load_more() == [], "Error: no debería haber más páginas"
+        store.wait()
+        print("✅ Fin del historial")
+    
+    print("\n✅ Todas las pruebas del panel virtualizado pasaron correctamente")
+
+
+def test_planificador_ui():
+    """Prueba el agrupamiento de actualizaciones de la UI por frame."""
+    print("\n" + "="*60)
+    print("TEST 17: ACTUALIZACIONES AGRUPADAS DE LA UI")
+    print("="*60)
+    
+    import os
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui_windows"))
+    from ui_scheduler import UpdateScheduler
+    
+    class TemporizadorManual:
+        """Temporizador que solo dispara cuando la prueba lo indica."""
+        creados = []
+        def __init__(self, segundos, funcion):
+            self.funcion = funcion
+            TemporizadorManual.creados.append(self)
+        def start(self):
+            pass
+        def cancel(self):
+            pass
+    
+    enviados = []
+    planificador = UpdateScheduler(enviados.append, timer_factory=TemporizadorManual)
+    expresion, resultado = object(), object()
+    
+    # Una ráfaga de teclas dentro del mismo frame produce una sola actualización
+    for _ in range(50):
+        planificador.mark_dirty(expresion, resultado)
+    planificador.mark_dirty(resultado)
+    assert len(TemporizadorManual.creados) == 1, "Error: debería programarse un solo frame"
+    TemporizadorManual.creados[0].funcion()
+    assert enviados == [[expresion, resultado]], f"Error: se esperaba una sola actualización ({enviados})"
+    print("✅ Ráfaga de 51 marcas = 1 actualización con 2 controles")
+    
+    # Sin cambios no se programa nada; el siguiente cambio abre un frame nuevo
+    planificador.mark_dirty()
+    assert len(TemporizadorManual.creados) == 1, "Error: no debería programarse un frame vacío"
+    planificador.mark_dirty(resultado)
+    TemporizadorManual.creados[1].funcion()
+    assert enviados[-1] == [resultado], "Error: solo debería actualizarse el control modificado"
+    print("✅ Solo se envían los controles modificados")
+    
+    # Cancelar descarta lo pendiente
+    planificador.mark_dirty(expresion)
+    planificador.cancel()
+    planificador.flush()
+    assert len(enviados) == 2, "Error: cancelar debería descartar lo pendiente"
+    print("✅ Cancelación de actualizaciones pendientes")
+    
+    print("\n✅ Todas las pruebas del planificador de UI pasaron correctamente")
+
+
+def test_benchmarks():
+    """Prueba la medición y la detección de regresiones de los benchmarks."""
+    print("\n" + "="*60)
+    print("TEST 18: SUITE DE BENCHMARKS")
+    print("="*60)
+    
+    from bench_calctime import medir, comparar_con_baseline, casos_tiempo
+    
+    # La medición produce métricas legibles como JSON
+    resultado = medir(casos_tiempo()["tiempo.__add__"], duracion_min=0.01)
+    assert resultado["ops_por_seg"] > 0 and resultado["lat_p50_ns"] <= resultado["lat_p99_ns"], "Error en medir"
+    print("✅ medir reporta rendimiento y percentiles de latencia")
+    
+    # Comparación con la línea base y umbrales por caso
+    baseline = {"resultados": {"a": {"ops_por_seg": 1000.0}, "b": {"ops_por_seg": 1000.0}, "c": {"ops_por_seg": 1.0}}}
+    actual = {"resultados": {"a": {"ops_por_seg": 850.0}, "b": {"ops_por_seg": 700.0}}}
+    regresiones = comparar_con_baseline(actual, baseline, umbral=0.2)
+    assert [r["caso"] for r in regresiones] == ["b"], f"Error: solo 'b' debería ser regresión ({regresiones})"
+    regresiones = comparar_con_baseline(actual, baseline, umbral=0.2, umbrales_caso={"a": 0.1, "b": 0.5})
+    assert [r["caso"] for r in regresiones] == ["a"], f"Error en umbrales por caso ({regresiones})"
+    print("✅ Detección de regresiones con umbrales configurables")
+    
+    print("\n✅ Todas las pruebas de la suite de benchmarks pasaron correctamente")
+
+
+def test_reductores():
+    """Prueba los reductores de una pasada sobre flujos de tiempos."""
+    print("\n" + "="*60)
+    print("TEST 19: REDUCTORES EN STREAMING")
+    print("="*60)
+    
+    from calctime import AcumuladorTiempo, sumar_tiempos, media_tiempos, estadisticas_tiempos
+    
+    # sum() nativo ahora funciona
+    tiempos = [Tiempo(meses=6), Tiempo(meses=8), Tiempo(dias=10)]
+    assert sum(tiempos) == Tiempo(años=1, meses=2, dias=10), "Error: sum() debería funcionar con Tiempo"
+    print("✅ sum(lista_de_tiempos) funciona")
+    
+    # Reductores sobre un generador (una sola pasada)
+    generador = (Tiempo(horas=h) for h in range(1, 11))
+    stats = estadisticas_tiempos(generador)
+    assert stats.conteo == 10 and stats.suma == Tiempo(horas=55), "Error en conteo/suma"
+    assert stats.media == Tiempo(horas=5.5), "Error en la media"
+    assert stats.minimo == Tiempo(horas=1) and stats.maximo == Tiempo(horas=10), "Error en mínimo/máximo"
+    assert abs(stats.varianza - 8.25) < 1e-12, f"Error en la varianza: {stats.varianza}"
+    assert media_tiempos([]) is None, "Error: la media de un iterable vacío debería ser None"
+    print("✅ Conteo, suma, media, mínimo, máximo y varianza en una pasada")
+    
+    # Suma compensada de horas crudas
+    assert sumar_tiempos(0.1 for _ in range(1000000)) == Tiempo(horas=100000), "Error: la suma compensada tiene deriva"
+    assert sumar_tiempos([Tiempo(dias=1), 12, 0.5]) == Tiempo(dias=1, horas=12.5), "Error al mezclar Tiempo y horas"
+    print("✅ Suma compensada de Neumaier sobre 1.000.000 de valores")
+    
+    # Fusión de acumuladores parciales
+    parte1 = AcumuladorTiempo(Tiempo(horas=h) for h in range(1, 6))
+    parte2 = AcumuladorTiempo(Tiempo(horas=h) for h in range(6, 11))
+    total = AcumuladorTiempo().fusionar(parte1).fusionar(parte2)
+    assert total.conteo == 10 and total.suma == stats.suma, "Error al fusionar acumuladores"
+    assert abs(total.varianza - stats.varianza) < 1e-12, "Error en la varianza fusionada"
+    assert total.minimo == stats.minimo and total.maximo == stats.maximo, "Error en mínimo/máximo fusionados"
+    print("✅ Fusión de acumuladores parciales")
+    
+    print("\n✅ Todas las pruebas de reductores pasaron correctamente")
+
+
+def test_lote_paralelo():
+    """Prueba la evaluación por lotes en varios procesos."""
+    print("\n" + "="*60)
+    print("TEST 20: MODO POR LOTES EN PARALELO")
+    print("="*60)
+    
+    import io
+    from calctime import procesar_lote, estadisticas_tiempos, evaluar_linea
+    from paralelo import evaluar_paralelo, reducir_paralelo, leer_bloques
+    
+    lineas = [f"{i % 5},{i % 12},{i % 30},{i % 24} + 0,1" for i in range(2000)]
+    lineas[7] = "basura"
+    lineas[1500] = "# comentario"
+    
+    # Bloques de tamaño fijo
+    bloques = list(leer_bloques(lineas, 300))
+    assert len(bloques) == 7 and sum(len(b) for b in bloques) == 2000, "Error al dividir en bloques"
+    print("✅ División en bloques")
+    
+    # Salida por fila idéntica a la secuencial y en el mismo orden
+    salida = io.StringIO()
+    errores = evaluar_paralelo(lineas, salida, trabajadores=3, lineas_por_bloque=128)
+    assert salida.getvalue().splitlines() == list(procesar_lote(lineas)), "Error: el orden o el contenido difiere"
+    assert errores == 1, f"Error: se esperaba 1 línea con error, hubo {errores}"
+    print("✅ Resultados por fila en orden y con errores por línea")
+    
+    # Reducción determinista, igual a la secuencial
+    validas = [l for l in lineas if l != "basura" and not l.startswith("#")]
+    esperado = estadisticas_tiempos(evaluar_linea(l) for l in validas)
+    total, errores = reducir_paralelo(lineas, trabajadores=3, lineas_por_bloque=128)
+    assert errores == 1 and total.conteo == esperado.conteo, "Error en el conteo reducido"
+    assert total.suma == esperado.suma, "Error en la suma reducida"
+    assert total.minimo == esperado.minimo and total.maximo == esperado.maximo, "Error en mínimo/máximo reducidos"
+    otra, _ = reducir_paralelo(lineas, trabajadores=2, lineas_por_bloque=128)
+    assert otra.media == total.media and otra.varianza == total.varianza, "Error: la reducción no es determinista"
+    print("✅ Reducción determinista fusionada en orden")
+    
+    from paralelo import reducir_bloque
+    acumulador, errores = reducir_bloque(["1,0,0,0 * 1e400", "1,0,0,0 * 10", "0,0,1,0 / 0"])
+    assert acumulador.conteo == 1 and errores == 2, "Error: un desborde debería contarse como línea con error"
+    print("✅ Desbordes y divisiones por cero cuentan como líneas con error")
+    
+    print("\n✅ Todas las pruebas del modo paralelo pasaron correctamente")
+
+
+def test_formato_binario():
+    """Prueba el formato binario mapeado en memoria."""
+    print("\n" + "="*60)
+    print("TEST 21: FORMATO BINARIO CON MMAP")
+    print("="*60)
+    
+    import os
+    import tempfile
+    from binario import escribir_binario, ArchivoTiempos, TIPO_HORAS
+    from calctime import estadisticas_tiempos
+    
+    tiempos = [Tiempo(años=i % 3, dias=i, horas=0.25) for i in range(5000)]
+    esperado = estadisticas_tiempos(tiempos)
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "tiempos.ctb")
+        assert escribir_binario(ruta, iter(tiempos)) == 5000, "Error en la cantidad escrita"
+        assert os.path.getsize(ruta) == 32 + 8 * 5000, "Error: el archivo no es compacto"
+        print("✅ Escritura en streaming (cabecera de 32 bytes + 8 bytes por valor)")
+        
+        with ArchivoTiempos(ruta) as archivo:
+            assert len(archivo) == 5000 and archivo.valores.format == "q", "Error en la vista de ticks"
+            assert archivo[0] == tiempos[0] and archivo[-1] == tiempos[-1], "Error al indexar"
+            assert archivo[10:12] == tiempos[10:12], "Error al indexar un rango"
+            assert archivo[100] + Tiempo(dias=1) == tiempos[100] + Tiempo(dias=1), "Error en la aritmética"
+            total = archivo.acumular()
+            assert total.suma == esperado.suma and total.conteo == 5000, "Error en la reducción"
+            assert total.minimo == esperado.minimo and total.maximo == esperado.maximo, "Error en mínimo/máximo"
+        print("✅ Vista sin copia: indexación, aritmética y reducción exacta")
+        
+        ruta_horas = os.path.join(carpeta, "horas.ctb")
+        escribir_binario(ruta_horas, tiempos, tipo=TIPO_HORAS)
+        with ArchivoTiempos(ruta_horas) as archivo:
+            assert archivo.valores.format == "d" and archivo.acumular().suma == esperado.suma, "Error con float64"
+        print("✅ Variante float64 (horas)")
+        
+        # Archivos inválidos o truncados
+        ruta_mala = os.path.join(carpeta, "malo.ctb")
+        with open(ruta_mala, "wb") as f:
+            f.write(b"no es un archivo binario de tiempos")
+        with open(ruta, "rb") as f, open(ruta + ".trunc", "wb") as g:
+            g.write(f.read(1000))
+        for invalido in (ruta_mala, ruta + ".trunc"):
+            try:
+                ArchivoTiempos(invalido)
+                assert False, f"Error: '{invalido}' debería rechazarse"
+            except ValueError:
+                pass
+        print("✅ Archivos inválidos o truncados se rechazan")
+        
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            print("⚠️  NumPy no está instalado: se omite como_array()")
+        else:
+            with ArchivoTiempos(ruta) as archivo:
+                arr = archivo.como_array()
+                assert (arr * 2).total() == esperado.suma * 2, "Error en la aritmética vectorizada"
+                del arr
+            print("✅ como_array() expone un TiempoArray sobre el mapa")
+    
+    print("\n✅ Todas las pruebas del formato binario pasaron correctamente")
+
+
+def test_tiempo_inmutable():
+    """Prueba la variante inmutable y hashable de Tiempo."""
+    print("\n" + "="*60)
+    print("TEST 22: TIEMPO INMUTABLE E INTERNADO")
+    print("="*60)
+    
+    import functools
+    import pickle
+    from calctime import TiempoInmutable
+    
+    class TiempoInmutableMinutos(TiempoInmutable):
+        TICKS_POR_HORA = 60
+    
+    a = TiempoInmutable(dias=1)
+    b = Tiempo(horas=24).congelar()
+    c = TiempoInmutableMinutos(minutos=1440)
+    assert a == b == c and hash(a) == hash(b) == hash(c), "Error: el hash debe ser coherente con la igualdad"
+    assert len({a, b, c, TiempoInmutable(dias=2)}) == 2, "Error al deduplicar en un conjunto"
+    assert {a: "un día"}[c] == "un día", "Error al usar como clave de diccionario"
+    print("✅ Hash coherente con la igualdad (incluso entre resoluciones)")
+    
+    try:
+        a._horas_totales = 48
+        assert False, "Error: no debería poder modificarse"
+    except AttributeError:
+        pass
+    assert isinstance(a + Tiempo(horas=1), TiempoInmutable) and a == Tiempo(dias=1), "Error en la aritmética"
+    assert pickle.loads(pickle.dumps(a)) == a, "Error al serializar con pickle"
+    mutable = a.mutable()
+    mutable._horas_totales = 1
+    assert a == Tiempo(dias=1), "Error: la copia mutable no debe afectar al original"
+    print("✅ Inmutable; la aritmética devuelve objetos inmutables")
+    
+    @functools.lru_cache(maxsize=None)
+    def doble(t):
+        return t * 2
+    doble(a)
+    doble(b)
+    assert doble.cache_info().hits == 1, "Error: lru_cache debería reutilizar el resultado"
+    print("✅ Funciona como argumento de lru_cache")
+    
+    TiempoInmutable.limpiar_internados()
+    mes = TiempoInmutable.internar(Tiempo(meses=1))
+    assert TiempoInmutable.internar(Tiempo(dias=30)) is mes, "Error: valores iguales deberían compartir instancia"
+    assert TiempoInmutableMinutos.internar(mes) is not mes, "Error: cada clase tiene sus propias instancias"
+    assert TiempoInmutableMinutos.internar(mes).TICKS_POR_HORA == 60, "Error en la resolución del internado"
+    TiempoInmutable.limpiar_internados()
+    print("✅ Internado de valores frecuentes (flyweight)")
+    
+    print("\n✅ Todas las pruebas de Tiempo inmutable pasaron correctamente")
+
+
+def test_formatos():
+    """Prueba la caché de componentes y el registro de formatos."""
+    print("\n" + "="*60)
+    print("TEST 23: FORMATOS Y CACHÉ DE COMPONENTES")
+    print("="*60)
+    
+    from calctime import formatear, formatear_muchos, registrar_formato, FORMATOS_TIEMPO, TiempoInmutable
+    
+    t = Tiempo(años=1, meses=2, dias=3, horas=4.5)
+    assert t.obtener_componentes() is t.obtener_componentes(), "Error: los componentes deberían quedar en caché"
+    t._horas_totales = 48
+    assert str(t) == "2 días", f"Error: la caché no se invalidó al cambiar el valor ({t})"
+    inmutable = TiempoInmutable(dias=1)
+    assert inmutable.obtener_componentes() == (0, 0, 1, 0), "Error en la caché de TiempoInmutable"
+    print("✅ Componentes en caché, invalidados al cambiar el valor")
+    
+    t = Tiempo(años=1, meses=2, dias=3, horas=4.5)
+    assert formatear(t) == str(t) == "1 año, 2 meses, 3 días, 4.50 horas", "Error en la forma larga"
+    assert t.formatear("corto") == "1Y 2M 3D 4.50H", "Error en la forma corta"
+    assert formatear(t, "iso") == "P1Y2M3DT4.5H", "Error en ISO-8601"
+    assert formatear(Tiempo(), "iso") == "PT0H" and formatear(Tiempo(dias=-2), "iso") == "-P2D", "Error en ISO-8601"
+    assert formatear(t, "componentes") == "1,2,3,4.5", "Error en el formato de componentes"
+    try:
+        formatear(t, "inexistente")
+        assert False, "Error: un formato desconocido debería rechazarse"
+    except ValueError:
+        pass
+    print("✅ Formatos texto, corto, ISO-8601 y componentes")
+    
+    registrar_formato("horas", lambda años, meses, dias, horas: f"{años * 8640 + meses * 720 + dias * 24 + horas}h")
+    assert formatear(Tiempo(dias=1, horas=2), "horas") == "26h", "Error en un formato registrado"
+    del FORMATOS_TIEMPO["horas"]
+    print("✅ Registro de formatos propios")
+    
+    tiempos = [Tiempo(dias=i % 3) for i in range(1000)]
+    assert formatear_muchos(tiempos, "iso") == [formatear(x, "iso") for x in tiempos], "Error en formatear_muchos"
+    assert formatear_muchos(TiempoArray.desde_tiempos(tiempos)) == [str(x) for x in tiempos], "Error con TiempoArray"
+    print("✅ formatear_muchos() con listas y TiempoArray")
+    
+    print("\n✅ Todas las pruebas de formatos pasaron correctamente")
+
+
+def test_indice_tiempos():
+    """Prueba el índice ordenado de tiempos."""
+    print("\n" + "="*60)
+    print("TEST 24: ÍNDICE ORDENADO DE TIEMPOS")
+    print("="*60)
+    
+    import random
+    from indice import IndiceTiempos
+    
+    generador = random.Random(7)
+    tiempos = [Tiempo(dias=generador.randint(0, 800), horas=generador.choice([0, 0.5])) for _ in range(3000)]
+    ordenados = sorted(tiempos, key=lambda t: t._horas_totales)
+    indice = IndiceTiempos(tiempos, datos=range(len(tiempos)))
+    assert list(indice) == ordenados and len(indice) == 3000, "Error al construir el índice"
+    
+    desde, hasta = Tiempo(meses=3), Tiempo(años=1)
+    esperado = [t for t in ordenados if desde <= t <= hasta]
+    assert indice.rango(desde, hasta) == esperado, "Error en la consulta de rango"
+    assert indice.contar_rango(desde, hasta) == len(esperado), "Error al contar el rango"
+    assert indice.rango(desde, hasta, incluir_hasta=False) == [t for t in esperado if t < hasta], "Error en el rango semiabierto"
+    assert all(tiempos[i] == t for t, i in indice.rango(desde, hasta, con_datos=True)), "Error en los datos asociados"
+    print("✅ Consultas de rango (\"entre 3 meses y 1 año\")")
+    
+    referencia = Tiempo(dias=45, horas=3)
+    distancia = lambda t: (abs(t._horas_totales - referencia._horas_totales), t._horas_totales)
+    assert indice.cercanos(referencia, k=5) == sorted(tiempos, key=distancia)[:5], "Error en los vecinos más cercanos"
+    assert len(indice.cercanos(referencia, k=5000)) == 3000, "Error: k mayor que el índice"
+    print("✅ k vecinos más cercanos")
+    
+    assert indice.posicion(Tiempo(dias=400)) == sum(1 for t in tiempos if t < Tiempo(dias=400)), "Error en la posición"
+    assert indice.percentil(50) == ordenados[1499] and indice.percentil(100) == ordenados[-1], "Error en el percentil"
+    assert indice.percentil(0) == indice.minimo == ordenados[0], "Error en el percentil 0"
+    assert indice.percentil_de(indice.maximo) == 100, "Error en percentil_de"
+    print("✅ Posición y percentiles")
+    
+    nuevo = Tiempo(minutos=7)
+    indice.insertar(nuevo, "nuevo")
+    assert nuevo in indice and indice.cercanos(nuevo, con_datos=True)[0] == (nuevo, "nuevo"), "Error al insertar"
+    assert indice.eliminar(nuevo) and nuevo not in indice and not indice.eliminar(nuevo), "Error al eliminar"
+    vacio = IndiceTiempos()
+    assert vacio.percentil(50) is None and vacio.cercanos(nuevo) == [] and vacio.rango() == [], "Error con índice vacío"
+    print("✅ Inserciones y eliminaciones incrementales")
+    
+    print("\n✅ Todas las pruebas del índice pasaron correctamente")
+
+
+def test_resumen_cuantiles():
+    """Prueba el resumen de cuantiles en streaming."""
+    print("\n" + "="*60)
+    print("TEST 25: RESUMEN DE CUANTILES (KLL)")
+    print("="*60)
+    
+    import json
+    import random
+    from bisect import bisect_right
+    from cuantiles import ResumenCuantiles
+    
+    generador = random.Random(11)
+    horas = [round(generador.lognormvariate(3, 1), 2) for _ in range(200000)]
+    ordenadas = sorted(horas)
+    
+    def rango_real(tiempo):
+        return bisect_right(ordenadas, tiempo._horas_totales + 1e-9) / len(ordenadas)
+    
+    resumen = ResumenCuantiles(Tiempo(horas=h) for h in horas)
+    assert resumen.conteo == 200000 and resumen.memoria < 1000, f"Error: memoria no acotada ({resumen.memoria})"
+    for p, estimado in zip((50, 95, 99), resumen.percentiles()):
+        assert abs(rango_real(estimado) - p / 100) < 0.01, f"Error: p{p} fuera de tolerancia"
+    assert resumen.minimo == Tiempo(horas=ordenadas[0]) and resumen.maximo == Tiempo(horas=ordenadas[-1]), "Error en los extremos"
+    print(f"✅ p50/p95/p99 con error de rango < 1 % reteniendo {resumen.memoria} de 200.000 valores")
+    
+    # Resúmenes parciales de distintos "procesos" fusionados
+    partes = [ResumenCuantiles(horas[i::4], semilla=i) for i in range(4)]
+    fusionado = ResumenCuantiles()
+    for parte in partes:
+        fusionado.fusionar(parte)
+    assert fusionado.conteo == 200000, "Error en el conteo fusionado"
+    for p, estimado in zip((50, 95, 99), fusionado.percentiles()):
+        assert abs(rango_real(estimado) - p / 100) < 0.01, f"Error: p{p} fusionado fuera de tolerancia"
+    assert abs(fusionado.contar_hasta(Tiempo(horas=ordenadas[100000])) / 200000 - 0.5) < 0.01, "Error en contar_hasta"
+    print("✅ Fusión de resúmenes parciales")
+    
+    assert ResumenCuantiles(horas[:5000]).percentiles() == ResumenCuantiles(horas[:5000]).percentiles(), "Error: no es determinista"
+    copia = ResumenCuantiles.importar(json.loads(json.dumps(resumen.exportar())))
+    assert copia.percentiles(10, 90) == resumen.percentiles(10, 90), "Error al exportar/importar"
+    assert ResumenCuantiles().cuantil(0.5) is None, "Error con resumen vacío"
+    print("✅ Determinista con semilla y serializable a JSON")
+    
+    for valor in (float("inf"), float("nan")):
+        try:
+            ResumenCuantiles().agregar(valor)
+            assert False, "Error: un valor no finito debería lanzar ValueError"
+        except ValueError:
+            pass
+    print("✅ Valores infinitos o NaN se rechazan con ValueError")
+    
+    print("\n✅ Todas las pruebas del resumen de cuantiles pasaron correctamente")
+
+
+def test_demonio():
+    """Prueba el demonio local sobre un socket Unix."""
+    print("\n" + "="*60)
+    print("TEST 26: DEMONIO LOCAL (NDJSON SOBRE SOCKET UNIX)")
+    print("="*60)
+    
+    import io
+    import os
+    import socket
+    import tempfile
+    import threading
+    from protocolo import atender, atender_json
+    from demonio import Cliente, servir
+    
+    # Protocolo (sin red)
+    respuesta = atender({"id": 3, "op": "sumar", "a": {"años": 2, "meses": 5}, "b": "1y 3m"})
+    assert respuesta == {"id": 3, "ok": True, "resultado": {"horas": 31680.0, "componentes": [3, 8, 0, 0],
+                                                             "texto": "3 años, 8 meses"}}, f"Error: {respuesta}"
+    assert atender({"op": "dividir", "a": 24, "escalar": 0})["ok"] is False, "Error: dividir por cero debería fallar"
+    assert atender({"op": "multiplicar", "a": "1d", "escalar": 1e308})["ok"] is False, "Error: un desborde debería fallar"
+    assert atender({"op": "comparar", "a": "1m", "b": "30d"})["resultado"] == 0, "Error al comparar"
+    assert atender({"op": "formatear", "tiempo": 36, "formato": "iso"})["resultado"]["texto"] == "P1DT12H", "Error al formatear"
+    assert atender({"op": "evaluar", "expr": "turno * 5", "variables": {"turno": {"horas": 8}}})["resultado"]["horas"] == 40, "Error en variables"
+    assert atender({"op": "desconocida"})["ok"] is False and atender([])["ok"] is False, "Error con peticiones inválidas"
+    assert '"ok": false' in atender_json("{roto"), "Error con JSON inválido"
+    assert atender({"op": "evaluar", "expr": "(" * 100000 + "1h" + ")" * 100000})["ok"] is False, "Error con una expresión muy anidada"
+    assert '"ok": false' in atender_json("[" * 100000 + "]" * 100000), "Error con JSON muy anidado"
+    print("✅ Protocolo JSON: operaciones, formatos y errores por petición")
+    
+    if not hasattr(socket, "AF_UNIX"):
+        print("⚠️  Este sistema no admite sockets Unix: se omite el demonio")
+        return
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "calctime.sock")
+        iniciado = threading.Event()
+        control = {}
+        
+        def al_iniciar(detener):
+            control["detener"] = detener
+            iniciado.set()
+        
+        hilo = threading.Thread(target=servir, args=(ruta, al_iniciar), daemon=True)
+        hilo.start()
+        assert iniciado.wait(10), "Error: el demonio no inició"
+        try:
+            assert os.stat(ruta).st_mode & 0o777 == 0o600, "Error: el socket debería crearse con permisos 0600"
+            with Cliente(ruta, timeout=10) as cliente:
+                assert cliente.enviar({"op": "ping"})["resultado"] == "pong", "Error en ping"
+                peticiones = [{"id": i, "op": "lote", "linea": f"{i},0,0,0 + 0,6"} for i in range(2500)]
+                respuestas = cliente.enviar_muchos(peticiones)
+                assert [r["id"] for r in respuestas] == list(range(2500)), "Error: las respuestas no llegaron en orden"
+                assert respuestas[2]["resultado"]["texto"] == "2 años, 6 meses", "Error en el resultado"
+                lote = cliente.enviar([{"op": "ping"}, {"op": "sumar", "a": 1, "b": "x"}])
+                assert lote[0]["ok"] and not lote[1]["ok"], "Error en una petición agrupada"
+            print("✅ Pipelining de 2.500 peticiones en orden y peticiones agrupadas")
+            
+            with Cliente(ruta, timeout=10) as cliente:
+                salida = io.StringIO()
+                errores = cliente.canalizar(io.StringIO('{"op":"ping"}\n\n{"op":"nada"}\n'), salida)
+                assert errores == 1 and len(salida.getvalue().splitlines()) == 2, "Error al canalizar"
+            print("✅ Cliente en modo canal (stdin -> stdout)")
+            
+            try:
+                servir(ruta)
+                assert False, "Error: no debería iniciar dos demonios en el mismo socket"
+            except OSError:
+                pass
+        finally:
+            control["detener"]()
+            hilo.join(10)
+        assert not hilo.is_alive() and not os.path.exists(ruta), "Error: el demonio no se detuvo limpiamente"
+        print("✅ Inicio único por socket y detención limpia")
+    
+    print("\n✅ Todas las pruebas del demonio pasaron correctamente")
+
+
+def test_api_http():
+    """Prueba la API HTTP/JSON con conexiones persistentes."""
+    print("\n" + "="*60)
+    print("TEST 27: API HTTP/JSON")
+    print("="*60)
+    
+    import http.client
+    import json
+    import socket
+    import threading
+    from api_http import servir
+    
+    iniciado = threading.Event()
+    control = {}
+    
+    def al_iniciar(puerto, detener):
+        control.update(puerto=puerto, detener=detener)
+        iniciado.set()
+    
+    hilo = threading.Thread(target=servir, args=("127.0.0.1", 0, al_iniciar), daemon=True)
+    hilo.start()
+    assert iniciado.wait(10), "Error: la API no inició"
+    try:
+        conexion = http.client.HTTPConnection("127.0.0.1", control["puerto"], timeout=10)
+        
+        def pedir(metodo, ruta, cuerpo=None):
+            conexion.request(metodo, ruta, body=None if cuerpo is None else json.dumps(cuerpo))
+            respuesta = conexion.getresponse()
+            return respuesta.status, json.loads(respuesta.read())
+        
+        estado, datos = pedir("POST", "/v1/calcular", {"op": "sumar", "a": {"años": 1}, "b": "6m"})
+        assert estado == 200 and datos["resultado"]["texto"] == "1 año, 6 meses", f"Error en una operación: {datos}"
+        lote = [{"op": "multiplicar", "a": "1d", "escalar": i} for i in range(500)] + [{"op": "dividir", "a": 1, "escalar": 0}]
+        estado, datos = pedir("POST", "/v1/calcular", lote)
+        assert estado == 200 and len(datos) == 501, "Error en un lote"
+        assert datos[3]["resultado"]["horas"] == 72 and datos[-1]["ok"] is False, "Error en los resultados del lote"
+        print("✅ Operaciones individuales y en lote")
+        
+        # Todas las peticiones anteriores usaron la misma conexión
+        socket_inicial = conexion.sock
+        assert pedir("GET", "/v1/salud") == (200, {"ok": True}), "Error en /v1/salud"
+        assert conexion.sock is socket_inicial, "Error: la conexión no se mantuvo abierta"
+        print("✅ Conexión persistente (keep-alive)")
+        
+        assert pedir("GET", "/v1/calcular")[0] == 405, "Error: GET en /v1/calcular debería ser 405"
+        assert pedir("GET", "/no-existe")[0] == 404, "Error: una ruta desconocida debería ser 404"
+        estado, datos = pedir("POST", "/v1/calcular", {"op": "multiplicar", "a": "1d", "escalar": 1e308})
+        assert estado == 200 and datos["ok"] is False, "Error: un desborde debería responderse como error"
+        conexion.request("POST", "/v1/calcular", body="{roto")
+        assert conexion.getresponse().status == 400, "Error: un JSON inválido debería ser 400"
+        conexion.close()
+        
+        with socket.create_connection(("127.0.0.1", control["puerto"]), timeout=10) as crudo:
+            crudo.sendall(b"POST /v1/calcular HTTP/1.1\r\nHost: x\r\n\r\n")
+            assert crudo.recv(100).startswith(b"HTTP/1.1 411"), "Error: POST sin Content-Length debería ser 411"
+        with patch("api_http.ESPERA_INACTIVA", 0.2), \
+                socket.create_connection(("127.0.0.1", control["puerto"]), timeout=10) as crudo:
+            crudo.sendall(b"POST /v1/calcular HTTP/1.1\r\nHost: x\r\nContent-Length: 10\r\n\r\n{")
+            assert crudo.recv(100).startswith(b"HTTP/1.1 408"), "Error: un cuerpo incompleto debería agotar la espera (408)"
+        print("✅ Errores HTTP (404, 405, 400, 408, 411)")
+        
+        with socket.create_connection(("127.0.0.1", control["puerto"]), timeout=10) as crudo:
+            cuerpo = json.dumps({"op": "ping"}).encode()
+            crudo.sendall(b"POST /v1/calcular HTTP/1.1\r\nHost: x\r\nExpect: 100-continue\r\n"
+                          b"Connection: close\r\nContent-Length: %d\r\n\r\n" % len(cuerpo))
+            assert crudo.recv(100) == b"HTTP/1.1 100 Continue\r\n\r\n", "Error: falta la respuesta 100 Continue"
+            crudo.sendall(cuerpo)
+            with crudo.makefile("rb") as lector:
+                respuesta = lector.read()  # Connection: close, se lee hasta el cierre
+            assert respuesta.startswith(b"HTTP/1.1 200") and b'"pong"' in respuesta, "Error: el cuerpo tras 100 Continue"
+        print("✅ Expect: 100-continue")
+    finally:
+        control["detener"]()
+        hilo.join(10)
+    assert not hilo.is_alive(), "Error: la API no se detuvo"
+    
+    print("\n✅ Todas las pruebas de la API HTTP pasaron correctamente")
+
+
+def test_arranque():
+    """Prueba la importación diferida y el informe de arranque."""
+    print("\n" + "="*60)
+    print("TEST 28: Arranque rápido e informe de importaciones")
+    print("="*60)
+    
+    import os
+    import subprocess
+    import sys
+    
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    
+    def ejecutar(codigo, **entorno):
+        return subprocess.run([sys.executable, "-c", codigo], cwd=carpeta, capture_output=True, text=True,
+                              env={**os.environ, **entorno}, timeout=60)
+    
+    salida = ejecutar("import sys, calctime; print('numpy' in sys.modules, 'argparse' in sys.modules); "
+                      "calctime.TiempoArray([1.0]); print('numpy' in sys.modules)")
+    assert salida.returncode == 0, salida.stderr
+    assert salida.stdout.split() == ["False", "False", "True"], f"Error en la importación diferida: {salida.stdout}"
+    print("✅ NumPy y argparse se importan solo cuando se necesitan")
+    
+    salida = ejecutar("import calctime, json, arranque; arranque.marcar('listo')", CALCTIME_IMPORTTIME="1")
+    assert salida.returncode == 0, salida.stderr
+    lineas = salida.stderr.splitlines()
+    assert lineas[0] == "import time: self [us] | cumulative | imported package", "Error en la cabecera del informe"
+    assert any(linea.endswith("| json") for linea in lineas), "Error: falta json en el informe"
+    assert lineas[-1].endswith("listo"), "Error: falta el hito en el informe"
+    assert ejecutar("import calctime").stderr == "", "Error: el informe no debería activarse sin la variable"
+    print("✅ Informe de importaciones e hitos con CALCTIME_IMPORTTIME")
+    
+    print("\n✅ Todas las pruebas de arranque pasaron correctamente")
+
+
+def test_portapapeles():
+    """Prueba el portapapeles en segundo plano y la elección de backend."""
+    print("\n" + "="*60)
+    print("TEST 29: Portapapeles sin bloqueo")
+    print("="*60)
+    
+    import os
+    import sys
+    import threading
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui_windows"))
+    from clipboard import Clipboard, StubBackend, open_clipboard
+    
+    class BackendLento(StubBackend):
+        """Backend que no termina de copiar hasta que la prueba lo libera."""
+        name = "lento"
+        def __init__(self):
+            super().__init__()
+            self.liberar = threading.Event()
+            self.consultas = 0
+        def available(self):
+            self.consultas += 1
+            return True
+        def copy(self, text):
+            assert self.liberar.wait(10), "Error: el backend nunca fue liberado"
+            super().copy(text)
+    
+    class BackendRoto(StubBackend):
+        name = "roto"
+        def copy(self, text):
+            raise OSError("sin portapapeles")
+    
+    lento = BackendLento()
+    portapapeles = Clipboard([lento, StubBackend()])
+    avisos = []
+    futuros = [portapapeles.copy(texto, on_done=avisos.append) for texto in ("1 año", "2 años", "3 años")]
+    assert not futuros[0].done(), "Error: copy() no debería esperar al backend"
+    lento.liberar.set()
+    assert [f.result(10) for f in futuros] == ["lento"] * 3, "Error en el backend usado"
+    assert lento.copied == ["1 año", "2 años", "3 años"] and avisos == ["lento"] * 3, "Error en el orden de las copias"
+    assert lento.consultas == 1, "Error: el backend debería detectarse una sola vez"
+    portapapeles.close()
+    print("✅ Copias en segundo plano, en orden y con detección única")
+    
+    respaldo = StubBackend()
+    portapapeles = Clipboard([BackendRoto(), respaldo])
+    assert portapapeles.copy_now("5 días") == "stub" and respaldo.text == "5 días", "Error en el respaldo"
+    assert portapapeles.backend is respaldo, "Error: el backend roto debería descartarse"
+    assert Clipboard([BackendRoto()]).copy_now("x") is None, "Error: sin backends la copia debería fallar"
+    assert open_clipboard(backend="stub").copy_now("1h") == "stub", "Error en el backend stub"
+    print("✅ Respaldo cuando un backend falla")
+    
+    print("\n✅ Todas las pruebas del portapapeles pasaron correctamente")
+
+
+def test_hoja():
+    """Prueba la hoja de tiempos con recálculo incremental."""
+    print("\n" + "="*60)
+    print("TEST 30: Hoja de tiempos con variables")
+    print("="*60)
+    
+    from hoja import ErrorCiclo, ErrorHoja, Hoja
+    
+    hoja = Hoja()
+    hoja.cargar(["turno = 8h", "semana = turno * 5", "# comentario", "trimestre = semana * 13", "otro = 2d"])
+    assert hoja["trimestre"] == Tiempo(horas=8 * 5 * 13), "Error en el valor derivado"
+    assert hoja.dependientes("turno") == {"semana"}, "Error en el grafo de dependencias"
+    print("✅ Definiciones y fórmulas derivadas")
+    
+    evaluaciones = hoja.evaluaciones
+    assert hoja.definir("turno", "7h 30min") == ["turno", "semana", "trimestre"], "Error en el orden de recálculo"
+    assert hoja.evaluaciones - evaluaciones == 3, "Error: solo deberían recalcularse las celdas afectadas"
+    assert hoja["trimestre"] == Tiempo(horas=7.5 * 5 * 13), "Error en el valor recalculado"
+    assert hoja.definir("turno", "7.5h") == ["turno"], "Error: sin cambio de valor no debería propagarse"
+    print("✅ Recálculo incremental solo de las celdas afectadas")
+    
+    try:
+        hoja.definir("turno", "trimestre / 65")
+        assert False, "Error: debería detectar el ciclo"
+    except ErrorCiclo as e:
+        assert e.ciclo[0] == e.ciclo[-1] and set(e.ciclo) == {"turno", "semana", "trimestre"}, f"Error en el ciclo: {e.ciclo}"
+    assert hoja.formula("turno") == "7.5h" and hoja["trimestre"] == Tiempo(horas=487.5), "Error: el ciclo no debería aplicarse"
+    print("✅ Detección de ciclos sin modificar la hoja")
+    
+    hoja.definir("extra", "trimestre + horas_extra")
+    assert "no definida" in hoja.error("extra"), "Error: falta el error de variable no definida"
+    hoja.definir("horas_extra", Tiempo(horas=1 / 3))
+    assert hoja["extra"] == Tiempo(horas=487.5 + 1 / 3), "Error al definir la variable faltante"
+    hoja.eliminar("horas_extra")
+    try:
+        hoja["extra"]
+        assert False, "Error: la celda dependiente debería quedar con error"
+    except ErrorHoja:
+        pass
+    hoja.definir("horas_extra", "1h / 0")
+    assert "depende de 'horas_extra'" in hoja.error("extra"), "Error en la propagación de errores"
+    desborde = Hoja({"base": "1h", "mucho": f"base * (1{'0' * 400} * 1.5)", "despues": "base * 2"})
+    assert desborde.error("mucho") and desborde["despues"] == Tiempo(horas=2), "Error: un desborde debería quedar en su celda"
+    print("✅ Errores por celda y su propagación")
+    
+    copia = Hoja()
+    copia.cargar(hoja.exportar())
+    assert all(copia.get(n) == hoja.get(n) for n in hoja), "Error al exportar y volver a cargar"
+    
+    cadena = Hoja({"c0": "1h", **{f"c{i}": f"c{i - 1} + 1h" for i in range(1, 5000)}})
+    evaluaciones = cadena.evaluaciones
+    cadena.definir("c4990", "1h")
+    assert cadena.evaluaciones - evaluaciones == 10 and cadena["c4999"] == Tiempo(horas=10), "Error en una cadena larga"
+    print("✅ Exportación y cadenas de miles de celdas")
+    
+    print("\n✅ Todas las pruebas de la hoja pasaron correctamente")
+
+
+def test_ingesta():
+    """Prueba la ingesta por bloques desde CSV."""
+    print("\n" + "="*60)
+    print("TEST 31: Ingesta masiva desde CSV")
+    print("="*60)
+    
+    import io
+    import os
+    import random
+    import tempfile
+    from calctime import AcumuladorTiempo
+    from ingesta import ErrorIngesta, Ingesta, cargar_array, reducir
+    
+    azar = random.Random(7)
+    filas = [(azar.randint(0, 5), azar.randint(0, 11), round(azar.uniform(0, 29), 2), round(azar.uniform(0, 23.9), 3))
+             for _ in range(5000)]
+    texto = "años,meses,días,horas\n" + "\n".join(",".join(map(str, f)) for f in filas) + "\n"
+    esperados = [Tiempo(*f) for f in filas]
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "export.csv")
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(texto)
+        arreglo = cargar_array(ruta, filas_por_bloque=700)
+    assert len(arreglo) == len(filas) and all(a == b for a, b in zip(arreglo, esperados)), "Error: ticks distintos a Tiempo"
+    print("✅ Conversión por bloques idéntica a Tiempo fila por fila")
+    
+    total = reducir(io.StringIO(texto), filas_por_bloque=700)
+    referencia = AcumuladorTiempo(esperados)
+    assert total.conteo == 5000 and total.suma == referencia.suma, "Error en la reducción"
+    assert total.minimo == referencia.minimo and total.maximo == referencia.maximo, "Error en mínimo/máximo"
+    assert abs(total.varianza - referencia.varianza) < 1e-6, "Error en la varianza"
+    print("✅ Reducción en streaming con AcumuladorTiempo")
+    
+    datos = "hs;anios;nota\n3;1;a\n;2;b\nmal;1;c\n"
+    ingesta = Ingesta(io.StringIO(datos), columnas={"años": "anios", "horas": "hs"}, delimitador=";", omitir_errores=True)
+    assert list(ingesta.a_array()) == [Tiempo(años=1, horas=3), Tiempo(años=2)], "Error con mapeo de columnas"
+    assert ingesta.filas == 2 and ingesta.omitidas == 1, "Error en el conteo de filas omitidas"
+    try:
+        Ingesta(io.StringIO(datos), columnas={"años": "anios", "horas": "hs"}, delimitador=";").reducir()
+        assert False, "Error: una fila inválida debería lanzar ErrorIngesta"
+    except ErrorIngesta as e:
+        assert "línea 4" in str(e), f"Error en el mensaje: {e}"
+    sin_encabezado = Ingesta(io.StringIO("1,2,3,4\n0,0,1,0.5\n"), encabezado=False).a_array()
+    assert list(sin_encabezado) == [Tiempo(1, 2, 3, 4), Tiempo(dias=1, horas=0.5)], "Error sin encabezado"
+    assert list(cargar_array(io.StringIO("d,min\n1,90\n"))) == [Tiempo(dias=1, minutos=90)], "Error con minutos"
+    print("✅ Mapeo de columnas, filas inválidas y archivos sin encabezado")
+    
+    no_finitos = Ingesta(io.StringIO("años\n1\nnan\ninf\n"), omitir_errores=True)
+    assert list(no_finitos.a_array()) == [Tiempo(años=1)] and no_finitos.omitidas == 2, "Error con NaN/inf"
+    try:
+        reducir(io.StringIO("años\n1\n1e300\n"))
+        assert False, "Error: un valor fuera de rango debería lanzar ErrorIngesta"
+    except ErrorIngesta as e:
+        assert "línea 3" in str(e), f"Error en el mensaje: {e}"
+    print("✅ Valores no finitos o fuera de rango")
+    
+    try:
+        import numpy as np
+    except ImportError:
+        print("⚠️  NumPy no está instalado: se omite la suma de arreglos de ticks")
+    else:
+        grande = AcumuladorTiempo().agregar_ticks(np.array([2 ** 62, 2 ** 62], dtype=np.int64))
+        assert grande.suma == Tiempo._desde_ticks(2 ** 63), "Error: la suma de ticks de NumPy desbordó"
+        print("✅ Sumas de arreglos de ticks que no caben en int64")
+    
+    print("\n✅ Todas las pruebas de ingesta pasaron correctamente")
+
+
+def test_agrupacion():
+    """Prueba la agrupación por clave en streaming."""
+    print("\n" + "="*60)
+    print("TEST 32: Agrupación de tiempos por clave")
+    print("="*60)
+    
+    import io
+    import os
+    import random
+    import tempfile
+    from calctime import AcumuladorTiempo
+    from agrupacion import AgrupadorTiempos
+    
+    azar = random.Random(11)
+    pares = [(f"p{azar.randint(0, 300)}", Tiempo(dias=azar.randint(0, 3), horas=round(azar.uniform(0, 23), 2)))
+             for _ in range(4000)]
+    referencia = {}
+    for clave, t in pares:
+        referencia.setdefault(clave, AcumuladorTiempo()).agregar(t)
+    
+    with AgrupadorTiempos() as agrupador:
+        agrupador.agregar_pares(pares)
+        assert agrupador.volcados == 0, "Error: no debería volcar a disco"
+        en_memoria = dict(agrupador.resultados())
+    assert en_memoria.keys() == referencia.keys(), "Error en las claves"
+    for clave, grupo in en_memoria.items():
+        acumulado = referencia[clave]
+        assert grupo.conteo == acumulado.conteo and grupo.suma == acumulado.suma, f"Error en la suma de {clave}"
+        assert grupo.minimo == acumulado.minimo and grupo.maximo == acumulado.maximo, f"Error en mín/máx de {clave}"
+        assert grupo.media == acumulado.media, f"Error en la media de {clave}"
+    print("✅ Conteo, suma, mínimo, máximo y media por clave iguales a AcumuladorTiempo")
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        with AgrupadorTiempos(limite_claves=50, particiones=4, carpeta=carpeta) as agrupador:
+            agrupador.agregar_pares(pares)
+            assert agrupador.volcados > 0 and len(agrupador) <= 50, "Error: debería volcar a disco"
+            assert dict(agrupador.resultados()) == en_memoria, "Error: el volcado cambia los resultados"
+            assert agrupador.grupo("p7") == en_memoria.get("p7"), "Error al consultar una clave volcada"
+            assert agrupador.grupo("no existe") is None, "Error con una clave inexistente"
+        assert os.listdir(carpeta) == [], "Error: quedaron archivos de volcado"
+    print("✅ Volcado a disco con memoria acotada y mismos resultados")
+    
+    mitad = len(pares) // 2
+    parcial = AgrupadorTiempos().agregar_pares(pares[mitad:])
+    fusionado = AgrupadorTiempos().agregar_pares(pares[:mitad]).fusionar(parcial)
+    assert dict(fusionado.resultados()) == en_memoria, "Error al fusionar agrupadores"
+    print("✅ Fusión de agrupadores parciales")
+    
+    datos = "proyecto,días,horas\nalfa,1,2\nbeta,0,5\nalfa,0,4.5\nbeta,,x\n"
+    agrupador = AgrupadorTiempos()
+    ingesta = agrupador.agregar_archivo(io.StringIO(datos), "proyecto", omitir_errores=True)
+    resultados = dict(agrupador.resultados(ordenar=True))
+    assert list(resultados) == ["alfa", "beta"] and ingesta.omitidas == 1, "Error con la columna de clave"
+    assert resultados["alfa"].suma == Tiempo(dias=1, horas=6.5), "Error en la suma desde CSV"
+    assert resultados["alfa"].minimo == Tiempo(horas=4.5) and resultados["beta"].conteo == 1, "Error en mínimo/conteo desde CSV"
+    print("✅ Filas con columna de clave desde CSV")
+    
+    for valor in (float("inf"), float("nan")):
+        try:
+            AgrupadorTiempos().agregar("alfa", valor)
+            assert False, "Error: un valor no finito debería lanzar ValueError"
+        except ValueError:
+            pass
+    from agrupacion import main as main_agrupacion
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "horas.csv")
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write("proyecto,horas\nalfa,1e400\n")
+        assert main_agrupacion([ruta, "--clave", "proyecto"]) == 2, "Error: la CLI debería fallar con código 2"
+    print("✅ Valores no finitos se rechazan con ValueError y la CLI termina con código 2")
+    
+    print("\n✅ Todas las pruebas de agrupación pasaron correctamente")
+
+
+def test_instrumentacion():
+    """Prueba la instrumentación opcional de métodos."""
+    print("\n" + "="*60)
+    print("TEST 33: Instrumentación de rutas calientes")
+    print("="*60)
+    
+    import io
+    import json
+    import os
+    import tempfile
+    import instrumentacion
+    from instrumentacion import Histograma, medir
+    
+    original = Tiempo.__add__
+    salida = io.StringIO()
+    with medir(salida) as metricas:
+        assert Tiempo.__add__ is not original, "Error: Tiempo.__add__ no se instrumentó"
+        total = Tiempo()
+        for i in range(100):
+            total = total + Tiempo(horas=i)
+        texto = str(total)
+        parcial = metricas.estadisticas()["metodos"]
+    assert Tiempo.__add__ is original and not instrumentacion.activa(), "Error: no se restauraron los métodos"
+    assert texto == str(Tiempo(horas=4950)), "Error: la instrumentación cambió el resultado"
+    assert parcial["Tiempo.__add__"]["conteo"] == 100, "Error en el conteo de __add__"
+    assert parcial["Tiempo.__init__"]["conteo"] == 101 and parcial["Tiempo.__str__"]["conteo"] == 1, "Error en los contadores"
+    informe = json.loads(salida.getvalue())
+    suma = informe["metodos"]["Tiempo.__add__"]
+    assert sum(suma["histograma"].values()) == 100, "Error en el histograma"
+    assert suma["minimo_ns"] <= suma["p50_ns"] <= suma["p99_ns"] <= suma["maximo_ns"], "Error en los percentiles"
+    print("✅ Contadores, histogramas y JSON; métodos restaurados al salir")
+    
+    histograma = Histograma()
+    for ns in [100] * 90 + [5000] * 10:
+        histograma.registrar(ns)
+    assert histograma.percentil(50) == 127 and histograma.percentil(99) == 5000, "Error en los percentiles del histograma"
+    print("✅ Percentiles aproximados por cubetas logarítmicas")
+    
+    class Ventana:
+        def update_ui(self):
+            return "ok"
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        perfil = os.path.join(carpeta, "calctime.prof")
+        with medir(perfil=perfil, muestreo=0.001, objetivos=[(Ventana, ["update_ui"])]) as metricas:
+            assert Ventana().update_ui() == "ok", "Error en el método instrumentado"
+            Tiempo(1, 2, 3).obtener_componentes()
+        estadisticas = metricas.estadisticas()
+        assert estadisticas["metodos"]["Ventana.update_ui"]["conteo"] == 1, "Error con objetivos adicionales"
+        assert "Tiempo.obtener_componentes" in estadisticas["metodos"], "Error: falta obtener_componentes"
+        assert os.path.getsize(perfil) > 0 and "muestras" in estadisticas, "Error en los perfiladores"
+    instrumentacion.instrumentar(Ventana, ["update_ui"])
+    assert Ventana.__dict__["update_ui"].__name__ == "update_ui" and not hasattr(Ventana.update_ui, "__wrapped__"), \
+        "Error: sin sesión activa no se debe instrumentar"
+    print("✅ Objetivos adicionales, cProfile y muestreo de pilas")
+    
+    import atexit
+    manejadores = atexit._ncallbacks()
+    for _ in range(3):
+        with medir():
+            Tiempo(horas=1)
+    assert atexit._ncallbacks() == manejadores, "Error: cada sesión no debería registrar otro manejador atexit"
+    with patch.dict(os.environ, {"CALCTIME_MUESTREO": "abc"}), patch("sys.stderr", new_callable=io.StringIO) as errores:
+        assert not instrumentacion.activar_desde_entorno(), "Error: un intervalo inválido no debería activar el muestreo"
+    assert "CALCTIME_MUESTREO" in errores.getvalue(), "Error: falta el aviso del intervalo inválido"
+    print("✅ Sesiones repetidas y variables de entorno inválidas")
+    
+    print("\n✅ Todas las pruebas de instrumentación pasaron correctamente")
+
+
 def ejecutar_todas_las_pruebas():
     """Ejecuta todas las pruebas."""
     print("\n" + "="*60)
@@ -330,6 +1642,30 @@ def ejecutar_todas_las_pruebas():
         test_casos_especiales()
         test_validacion_y_entrada()
         test_interfaz_limpieza()
+        test_tiempo_array()
+        test_precision_exacta()
+        test_modo_lote()
+        test_expresiones()
+        test_historial_diario()
+        test_historial_sqlite()
+        test_historial_virtualizado()
+        test_planificador_ui()
+        test_benchmarks()
+        test_reductores()
+        test_lote_paralelo()
+        test_formato_binario()
+        test_tiempo_inmutable()
+        test_formatos()
+        test_indice_tiempos()
+        test_resumen_cuantiles()
+        test_demonio()
+        test_api_http()
+        test_arranque()
+        test_portapapeles()
+        test_hoja()
+        test_ingesta()
+        test_agrupacion()
+        test_instrumentacion()
         
         print("\n" + "="*60)
         print("  ✅ TODAS LAS PRUEBAS PASARON EXITOSAMENTE")